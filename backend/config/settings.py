@@ -114,6 +114,40 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # LLM Providers
 LLM_DEFAULT_PROVIDER = os.getenv('LLM_DEFAULT_PROVIDER', 'openai')
+# 每进程对单个 provider 的并发请求上限（AsyncLLMClient），可在 provider 中用 max_concurrency 覆盖
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+
+# 知府游戏下辖县并行结算进程数（默认 1 = 串行；0 = CPU 核数）
+# 每个 Web 进程各持一个进程池，开启前按 Web 进程数 × 本值估算总进程数
+PREFECTURE_SETTLEMENT_WORKERS = int(os.getenv('PREFECTURE_SETTLEMENT_WORKERS', '1'))
+
+# 推进完成后自动为下个月排队 AI 决策预计算；推进时若预计算仍在进行，最多等待的秒数
+PRECOMPUTE_SPECULATIVE = os.getenv('PRECOMPUTE_SPECULATIVE', 'true').lower() in ('1', 'true', 'yes')
+PRECOMPUTE_ADVANCE_WAIT_SECONDS = float(os.getenv('PRECOMPUTE_ADVANCE_WAIT_SECONDS', '10'))
+
+# 预计算进度推送：'redis'（Celery worker 与 Web 进程分离时）或 'memory'（单进程 / Celery eager）
+# 未配置 REDIS_URL（如本地裸跑 runserver）时默认 memory
+PRECOMPUTE_EVENTS_BROKER = os.getenv(
+    'PRECOMPUTE_EVENTS_BROKER', 'redis' if os.getenv('REDIS_URL') else 'memory',
+)
+PRECOMPUTE_EVENTS_REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+PRECOMPUTE_STREAM_TIMEOUT_SECONDS = float(os.getenv('PRECOMPUTE_STREAM_TIMEOUT_SECONDS', '120'))
+
+# 月度结算完整月报存入 settlement_reports 旁表时是否 zlib 压缩
+SETTLEMENT_REPORT_COMPRESSION = os.getenv('SETTLEMENT_REPORT_COMPRESSION', 'true').lower() in ('1', 'true', 'yes')
+SETTLEMENT_REPORT_ZLIB_LEVEL = int(os.getenv('SETTLEMENT_REPORT_ZLIB_LEVEL', '6'))
+
+# LLM 响应缓存（按请求内容寻址，调用方 cache=True 时启用）
+LLM_RESPONSE_CACHE = {
+    'BACKEND': 'llm.cache.DjangoCacheResponseCache',
+    'OPTIONS': {'alias': 'default', 'ttl': int(os.getenv('LLM_RESPONSE_CACHE_TTL', '86400'))},
+}
+
+# LLM 调用统计：各进程每隔 N 秒把本进程汇总写入缓存（llm_metrics 命令 / /api/llm/metrics/ 读取）
+LLM_METRICS_PUBLISH_INTERVAL = float(os.getenv('LLM_METRICS_PUBLISH_INTERVAL', '10'))
+
+# PromptRegistry 静态前缀缓存条目上限（按模板 + 人设字段取值）
+LLM_PROMPT_PREFIX_CACHE_SIZE = int(os.getenv('LLM_PROMPT_PREFIX_CACHE_SIZE', '512'))
 
 LLM_PROVIDERS = {
     'openai': {
@@ -35,3 +35,22 @@ LLM_PROVIDERS = {
     name: {**cfg, "api_key": ""}
     for name, cfg in LLM_PROVIDERS.items()
 }
+
+
+# In-process LLM response cache for tests.
+LLM_RESPONSE_CACHE = {
+    "BACKEND": "llm.cache.LocMemResponseCache",
+    "OPTIONS": {"ttl": 3600, "max_entries": 256},
+}
+
+
+# Run Celery tasks inline; no broker or worker in tests.
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BROKER_URL = "memory://"
+CELERY_RESULT_BACKEND = "cache+memory://"
+PRECOMPUTE_EVENTS_BROKER = "memory"
+
+
+# Settle prefecture subordinates serially unless a test opts into the process pool.
+PREFECTURE_SETTLEMENT_WORKERS = 1
@@ -6,6 +6,7 @@ from django.views.generic import TemplateView
 urlpatterns = [
     path('', ensure_csrf_cookie(TemplateView.as_view(template_name='game/index.html')), name='home'),
     path('admin/', admin.site.urls),
+    path('api/llm/', include('llm.urls')),
     path('api/', include('game.urls')),
     path('api/auth/', include('rest_framework.urls')),
 ]
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from game.services.constants import COUNTY_TYPES, MAX_MONTH
+from game.services.simulation import POLICIES, BatchSimulationService
+
+
+class Command(BaseCommand):
+    help = 'Run a headless batch simulation of N counties x M months (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--counties', type=int, default=100,
+                            help='Number of counties to simulate (default 100)')
+        parser.add_argument('--months', type=int, default=MAX_MONTH,
+                            help=f'Months per county (default {MAX_MONTH})')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: CPU count; 1 runs inline)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Base seed; county i uses seed + i')
+        parser.add_argument('--county-type', choices=sorted(COUNTY_TYPES), default=None,
+                            help='Fix the county type (default: random per county)')
+        parser.add_argument('--policy', choices=POLICIES, default='rule',
+                            help='AI governor policy: rule engine or no decisions')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Counties per worker task')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Write monthly snapshots to a .jsonl or .parquet file')
+
+    def handle(self, *args, **options):
+        if options['counties'] < 1 or options['months'] < 1:
+            raise CommandError("--counties and --months must be positive")
+
+        try:
+            stats = BatchSimulationService.run(
+                counties=options['counties'],
+                months=options['months'],
+                workers=options['workers'],
+                base_seed=options['seed'],
+                county_type=options['county_type'],
+                policy=options['policy'],
+                output=options['output'],
+                chunk_size=options['chunk_size'],
+            )
+        except ImportError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Simulated {stats['counties']} counties x {stats['months']} months "
+            f"on {stats['workers']} worker(s)"
+        )
+        self.stdout.write(
+            f"  county-months: {stats['county_months']}  "
+            f"elapsed: {stats['elapsed_seconds']:.2f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"  throughput: {stats['county_months_per_second']} county-months/s"
+        ))
+        if stats['output']:
+            self.stdout.write(f"  snapshots written to {stats['output']}")
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+
+
+def move_county_data_to_units(apps, schema_editor):
+    """知县存档的县域数据只保留在玩家 AdminUnit.unit_data，清空 game_states 副本"""
+    GameState = apps.get_model('game', 'GameState')
+    AdminUnit = apps.get_model('game', 'AdminUnit')
+
+    # 尚无 player_unit 的知县存档：先补建县级 AdminUnit
+    orphans = list(
+        GameState.objects.filter(player_unit__isnull=True)
+        .exclude(player_role='PREFECT')
+        .exclude(legacy_county_data={})
+    )
+    for gs in orphans:
+        gs.player_unit = AdminUnit.objects.create(
+            game=gs,
+            unit_type='COUNTY',
+            unit_data=gs.legacy_county_data,
+            is_player_controlled=True,
+        )
+    GameState.objects.bulk_update(orphans, ['player_unit'])
+
+    games = GameState.objects.filter(player_unit__unit_type='COUNTY').select_related('player_unit')
+    for gs in games.iterator():
+        unit = gs.player_unit
+        if not unit.unit_data and gs.legacy_county_data:
+            unit.unit_data = gs.legacy_county_data
+            unit.save(update_fields=['unit_data'])
+    games.update(legacy_county_data={})
+
+
+def restore_county_data_mirror(apps, schema_editor):
+    GameState = apps.get_model('game', 'GameState')
+    games = list(
+        GameState.objects.filter(player_unit__unit_type='COUNTY').select_related('player_unit')
+    )
+    for gs in games:
+        gs.legacy_county_data = gs.player_unit.unit_data
+    GameState.objects.bulk_update(games, ['legacy_county_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0016_populate_admin_units'),
+    ]
+
+    operations = [
+        # 仅改 Python 字段名，数据库列仍为 county_data
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='gamestate',
+                    old_name='county_data',
+                    new_name='legacy_county_data',
+                ),
+                migrations.AlterField(
+                    model_name='gamestate',
+                    name='legacy_county_data',
+                    field=models.JSONField(
+                        db_column='county_data',
+                        default=dict,
+                        help_text='旧版县域数据（仅无 player_unit 的旧存档使用，知县游戏以 AdminUnit.unit_data 为准）',
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(move_county_data_to_units, reverse_code=restore_county_data_mirror),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0017_gamestate_legacy_county_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='neighborprecompute',
+            name='task_key',
+            field=models.CharField(blank=True, default='', help_text='幂等键 kind:game:season，同键任务不重复认领', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='neighborprecompute',
+            name='expected_count',
+            field=models.IntegerField(default=0, help_text='本次需预计算的县数'),
+        ),
+        migrations.AddField(
+            model_name='neighborprecompute',
+            name='failed',
+            field=models.JSONField(blank=True, default=list, help_text='预计算失败的县 id 列表'),
+        ),
+    ]
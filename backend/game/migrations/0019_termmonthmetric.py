@@ -0,0 +1,33 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0018_neighborprecompute_task_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermMonthMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.IntegerField(help_text='结算月份')),
+                ('snapshot', models.JSONField(default=dict, help_text='月度指标快照（monthly_snapshot）')),
+                ('autumn', models.JSONField(blank=True, help_text='九月秋收摘要', null=True)),
+                ('winter_snapshot', models.JSONField(blank=True, help_text='腊月年终快照', null=True)),
+                ('disaster', models.JSONField(blank=True, help_text='结算前灾害（邻县受灾暴露度）', null=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_metrics', to='game.gamestate')),
+                ('neighbor_county', models.ForeignKey(blank=True, help_text='为空表示玩家本县', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='term_metrics', to='game.neighborcounty')),
+            ],
+            options={
+                'db_table': 'term_month_metrics',
+                'indexes': [models.Index(fields=['game', 'season'], name='term_month__game_id_7c74eb_idx')],
+                'constraints': [
+                    models.UniqueConstraint(condition=models.Q(('neighbor_county__isnull', True)), fields=('game', 'season'), name='uniq_term_metric_player_season'),
+                    models.UniqueConstraint(fields=('neighbor_county', 'season'), name='uniq_term_metric_neighbor_season'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_inline_reports(apps, schema_editor):
+    """把旧存档内嵌在 EventLog.data 中的月报迁入旁表"""
+    EventLog = apps.get_model('game', 'EventLog')
+    SettlementReport = apps.get_model('game', 'SettlementReport')
+    qs = EventLog.objects.filter(event_type='season_settlement', category='SETTLEMENT')
+    batch = []
+    for log in qs.iterator(chunk_size=500):
+        data = log.data or {}
+        report = data.pop('settlement_report', None)
+        if report is None:
+            continue
+        raw = json.dumps(report, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        SettlementReport.objects.update_or_create(
+            event_log_id=log.pk,
+            defaults={'encoding': 'zlib', 'payload': zlib.compress(raw), 'size': len(raw)},
+        )
+        data['has_settlement_report'] = True
+        log.data = data
+        batch.append(log)
+        if len(batch) >= 500:
+            EventLog.objects.bulk_update(batch, ['data'])
+            batch = []
+    if batch:
+        EventLog.objects.bulk_update(batch, ['data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0019_termmonthmetric'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettlementReport',
+            fields=[
+                ('event_log', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='settlement_report', serialize=False, to='game.eventlog')),
+                ('encoding', models.CharField(choices=[('json', '未压缩'), ('zlib', 'zlib 压缩')], default='zlib', max_length=8)),
+                ('payload', models.BinaryField(help_text='JSON 编码（可压缩）的完整月报')),
+                ('size', models.IntegerField(default=0, help_text='未压缩 JSON 字节数')),
+            ],
+            options={
+                'db_table': 'settlement_reports',
+            },
+        ),
+        migrations.RunPython(move_inline_reports, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0020_settlementreport'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventlog',
+            index=models.Index(fields=['game', '-created_at', '-id'], name='event_logs_game_id_3d20a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='neighboreventlog',
+            index=models.Index(fields=['neighbor_county', '-created_at', '-id'], name='neighbor_ev_neighbo_6d40ff_idx'),
+        ),
+    ]
@@ -0,0 +1,133 @@
+from django.db import migrations, models
+
+
+# 冗余列提取逻辑按本迁移时的模型冻结于此；此后 models 中的改动不影响本迁移
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _admin_unit_values(data):
+    reviews = [r for r in data.get('annual_reviews') or [] if isinstance(r, dict)]
+    latest = max(reviews, key=lambda r: r.get('year', 0), default=None)
+    return {
+        'name': str(data.get('county_name') or data.get('prefecture_name') or '')[:100],
+        'governor_archetype': str((data.get('governor_profile') or {}).get('archetype') or '')[:10],
+        'has_disaster': bool(data.get('disaster_this_year')),
+        'treasury': _as_float(data.get('treasury')),
+        'morale': _as_float(data.get('morale')),
+        'review_year': latest.get('year') if latest else None,
+        'review_state': str(latest.get('state') or '')[:20] if latest else '',
+    }
+
+
+def _neighbor_county_values(data):
+    return {
+        'has_disaster': bool(data.get('disaster_this_year')),
+        'treasury': _as_float(data.get('treasury')),
+        'morale': _as_float(data.get('morale')),
+    }
+
+
+BACKFILLS = (
+    ('AdminUnit', 'unit_data', _admin_unit_values),
+    ('NeighborCounty', 'county_data', _neighbor_county_values),
+)
+
+
+def backfill_denormalized(apps, schema_editor):
+    """按当前 unit_data / county_data 回填冗余列"""
+    for model_name, source_field, extract in BACKFILLS:
+        model = apps.get_model('game', model_name)
+        fields = None
+        batch = []
+        for obj in model.objects.all().iterator(chunk_size=200):
+            values = extract(getattr(obj, source_field) or {})
+            fields = list(values)
+            for name, value in values.items():
+                setattr(obj, name, value)
+            batch.append(obj)
+            if len(batch) >= 200:
+                model.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0021_event_log_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminunit',
+            name='name',
+            field=models.CharField(blank=True, default='', help_text='县名/府名', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='adminunit',
+            name='governor_archetype',
+            field=models.CharField(blank=True, default='', help_text='主官施政类型', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='adminunit',
+            name='has_disaster',
+            field=models.BooleanField(default=False, help_text='本年是否有灾'),
+        ),
+        migrations.AddField(
+            model_name='adminunit',
+            name='treasury',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='adminunit',
+            name='morale',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='adminunit',
+            name='review_year',
+            field=models.IntegerField(blank=True, help_text='最近一轮年度评议的年份', null=True),
+        ),
+        migrations.AddField(
+            model_name='adminunit',
+            name='review_state',
+            field=models.CharField(blank=True, default='', help_text='最近一轮年度评议的状态', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='neighborcounty',
+            name='has_disaster',
+            field=models.BooleanField(default=False, help_text='本年是否有灾'),
+        ),
+        migrations.AddField(
+            model_name='neighborcounty',
+            name='treasury',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='neighborcounty',
+            name='morale',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='adminunit',
+            index=models.Index(fields=['parent', 'name'], name='admin_units_parent__6cf049_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminunit',
+            index=models.Index(fields=['parent', 'review_year', 'review_state'], name='admin_units_parent__5b4971_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminunit',
+            index=models.Index(fields=['game', 'has_disaster'], name='admin_units_game_id_ba36d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='neighborcounty',
+            index=models.Index(fields=['game', 'has_disaster'], name='neighbor_co_game_id_280ece_idx'),
+        ),
+        migrations.RunPython(backfill_denormalized, migrations.RunPython.noop),
+    ]
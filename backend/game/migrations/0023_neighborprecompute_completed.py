@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0022_denormalized_unit_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='neighborprecompute',
+            name='completed',
+            field=models.JSONField(blank=True, default=list, help_text='已完成县的 {id, county_name, governor_name} 摘要（进度查询只读此列，不读 results）'),
+        ),
+    ]
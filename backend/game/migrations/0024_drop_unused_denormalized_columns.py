@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0023_neighborprecompute_completed'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='neighborcounty',
+            name='neighbor_co_game_id_280ece_idx',
+        ),
+        migrations.RemoveField(
+            model_name='adminunit',
+            name='treasury',
+        ),
+        migrations.RemoveField(
+            model_name='adminunit',
+            name='morale',
+        ),
+        migrations.RemoveField(
+            model_name='neighborcounty',
+            name='has_disaster',
+        ),
+        migrations.RemoveField(
+            model_name='neighborcounty',
+            name='treasury',
+        ),
+        migrations.RemoveField(
+            model_name='neighborcounty',
+            name='morale',
+        ),
+    ]
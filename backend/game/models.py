@@ -2,6 +2,51 @@ from django.db import models
 from django.contrib.auth.models import User
 
 
+class DenormalizedJSONMixin:
+    """把 JSON 状态里的热点字段同步到普通列，供 SQL 过滤 / 排序 / 建索引
+
+    子类声明 ``JSON_SOURCE_FIELD`` 与 ``DENORMALIZED_FIELDS``，并实现
+    ``denormalized_values(data)``。``save()`` 时自动同步；写入 JSON 字段的
+    ``update_fields`` 会补上冗余列。``bulk_update`` / ``QuerySet.update``
+    不经过 ``save()``，调用方须先用 ``prepare_bulk_update`` 同步。
+    """
+
+    JSON_SOURCE_FIELD = ''
+    DENORMALIZED_FIELDS = ()
+
+    @classmethod
+    def denormalized_values(cls, data):
+        raise NotImplementedError
+
+    def sync_denormalized(self):
+        values = self.denormalized_values(getattr(self, self.JSON_SOURCE_FIELD) or {})
+        for name, value in values.items():
+            setattr(self, name, value)
+        return values
+
+    @classmethod
+    def with_denormalized_fields(cls, fields):
+        fields = list(fields)
+        if cls.JSON_SOURCE_FIELD in fields:
+            fields.extend(f for f in cls.DENORMALIZED_FIELDS if f not in fields)
+        return fields
+
+    @classmethod
+    def prepare_bulk_update(cls, objs, fields):
+        """bulk_update 前同步冗余列，返回补全后的字段列表"""
+        fields = cls.with_denormalized_fields(fields)
+        if cls.JSON_SOURCE_FIELD in fields:
+            for obj in objs:
+                obj.sync_denormalized()
+        return fields
+
+    def save(self, *args, **kwargs):
+        self.sync_denormalized()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = self.with_denormalized_fields(kwargs['update_fields'])
+        super().save(*args, **kwargs)
+
+
 class GameState(models.Model):
     """游戏存档 - 核心表"""
     ROLE_CHOICES = [
@@ -13,7 +58,10 @@ class GameState(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='games')
     current_season = models.IntegerField(default=1, help_text='当前月份 (1-36)')
-    county_data = models.JSONField(default=dict, help_text='所有县域数据（知县游戏用）')
+    legacy_county_data = models.JSONField(
+        default=dict, db_column='county_data',
+        help_text='旧版县域数据（仅无 player_unit 的旧存档使用，知县游戏以 AdminUnit.unit_data 为准）',
+    )
     pending_events = models.JSONField(default=list, help_text='待处理事件')
     player_role = models.CharField(
         max_length=20, choices=ROLE_CHOICES, default='COUNTY_MAGISTRATE',
@@ -39,10 +87,32 @@ class GameState(models.Model):
         """返回玩家单位的数据（县级游戏兼容 county_data）"""
         if self.player_unit_id is not None:
             return self.player_unit.unit_data
-        return self.county_data
-
-
-class AdminUnit(models.Model):
+        return self.legacy_county_data
+
+    def _county_player_unit(self):
+        if self.player_unit_id is None:
+            return None
+        unit = self.player_unit
+        return unit if unit.unit_type == 'COUNTY' else None
+
+    @property
+    def county_data(self):
+        """县域数据兼容视图：知县游戏直通 player_unit.unit_data，旧存档回退到 legacy_county_data"""
+        unit = self._county_player_unit()
+        if unit is not None:
+            return unit.unit_data
+        return self.legacy_county_data
+
+    @county_data.setter
+    def county_data(self, value):
+        unit = self._county_player_unit()
+        if unit is not None:
+            unit.unit_data = value
+        else:
+            self.legacy_county_data = value
+
+
+class AdminUnit(DenormalizedJSONMixin, models.Model):
     """行政单位 — 支持县/府/省/朝廷各层级，构成可扩展的治理层级树"""
     UNIT_TYPE_CHOICES = [
         ('COUNTY', '县/州'),
@@ -65,16 +135,40 @@ class AdminUnit(models.Model):
         related_name='governed_units', help_text='AI治理官员（非玩家控制时）',
     )
 
+    # ── 由 unit_data 同步的冗余列（见 DenormalizedJSONMixin）──
+    name = models.CharField(max_length=100, blank=True, default='', help_text='县名/府名')
+    governor_archetype = models.CharField(max_length=10, blank=True, default='', help_text='主官施政类型')
+    has_disaster = models.BooleanField(default=False, help_text='本年是否有灾')
+    review_year = models.IntegerField(null=True, blank=True, help_text='最近一轮年度评议的年份')
+    review_state = models.CharField(max_length=20, blank=True, default='', help_text='最近一轮年度评议的状态')
+
+    JSON_SOURCE_FIELD = 'unit_data'
+    DENORMALIZED_FIELDS = ('name', 'governor_archetype', 'has_disaster', 'review_year', 'review_state')
+
     class Meta:
         db_table = 'admin_units'
         indexes = [
             models.Index(fields=['game', 'unit_type']),
             models.Index(fields=['parent']),
+            models.Index(fields=['parent', 'name']),
+            models.Index(fields=['parent', 'review_year', 'review_state']),
+            models.Index(fields=['game', 'has_disaster']),
         ]
 
+    @classmethod
+    def denormalized_values(cls, data):
+        reviews = [r for r in data.get('annual_reviews') or [] if isinstance(r, dict)]
+        latest = max(reviews, key=lambda r: r.get('year', 0), default=None)
+        return {
+            'name': str(data.get('county_name') or data.get('prefecture_name') or '')[:100],
+            'governor_archetype': str((data.get('governor_profile') or {}).get('archetype') or '')[:10],
+            'has_disaster': bool(data.get('disaster_this_year')),
+            'review_year': latest.get('year') if latest else None,
+            'review_state': str(latest.get('state') or '')[:20] if latest else '',
+        }
+
     def __str__(self):
-        name = self.unit_data.get('county_name') or self.unit_data.get('prefecture_name', '')
-        return f"AdminUnit({self.get_unit_type_display()}) {name} - Game#{self.game_id}"
+        return f"AdminUnit({self.get_unit_type_display()}) {self.name} - Game#{self.game_id}"
 
 
 class PlayerProfile(models.Model):
@@ -213,12 +307,40 @@ class EventLog(models.Model):
         indexes = [
             models.Index(fields=['game', 'season']),
             models.Index(fields=['game', 'category']),
+            # 县志列表按 (-created_at, -id) 键集分页
+            models.Index(fields=['game', '-created_at', '-id']),
         ]
 
     def __str__(self):
         return f"Game#{self.game_id} S{self.season}: [{self.category}] {self.event_type}"
 
 
+class SettlementReport(models.Model):
+    """月度结算完整月报 — 从 EventLog.data 拆出的旁表，县志展开时按需读取
+
+    payload 为 JSON 编码后的字节串，encoding='zlib' 时经 zlib 压缩。
+    列表查询只读 event_logs，不再随每行搬运整份月报。
+    """
+    ENCODING_CHOICES = [
+        ('json', '未压缩'),
+        ('zlib', 'zlib 压缩'),
+    ]
+
+    event_log = models.OneToOneField(
+        EventLog, on_delete=models.CASCADE, primary_key=True,
+        related_name='settlement_report',
+    )
+    encoding = models.CharField(max_length=8, choices=ENCODING_CHOICES, default='zlib')
+    payload = models.BinaryField(help_text='JSON 编码（可压缩）的完整月报')
+    size = models.IntegerField(default=0, help_text='未压缩 JSON 字节数')
+
+    class Meta:
+        db_table = 'settlement_reports'
+
+    def __str__(self):
+        return f"SettlementReport EventLog#{self.event_log_id} ({self.encoding})"
+
+
 class NegotiationSession(models.Model):
     """谈判会话 — 地主兼并 / 兴建水利 多轮谈判状态机"""
     EVENT_TYPES = [
@@ -395,12 +517,52 @@ class NeighborEventLog(models.Model):
         db_table = 'neighbor_event_logs'
         indexes = [
             models.Index(fields=['neighbor_county', 'season']),
+            models.Index(fields=['neighbor_county', '-created_at', '-id']),
         ]
 
     def __str__(self):
         return f"Neighbor#{self.neighbor_county_id} S{self.season}: [{self.category}] {self.event_type}"
 
 
+class TermMonthMetric(models.Model):
+    """任期月度指标窄表 — 述职报告专用，结算时逐月增量写入
+
+    每县每月一行：neighbor_county 为空表示玩家本县。只存月度快照、秋收/年终摘要与
+    结算前灾害，述职报告无需再扫描 EventLog / NeighborEventLog 的完整结算 JSON。
+    """
+    game = models.ForeignKey(GameState, on_delete=models.CASCADE, related_name='term_metrics')
+    neighbor_county = models.ForeignKey(
+        NeighborCounty, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='term_metrics', help_text='为空表示玩家本县',
+    )
+    season = models.IntegerField(help_text='结算月份')
+    snapshot = models.JSONField(default=dict, help_text='月度指标快照（monthly_snapshot）')
+    autumn = models.JSONField(null=True, blank=True, help_text='九月秋收摘要')
+    winter_snapshot = models.JSONField(null=True, blank=True, help_text='腊月年终快照')
+    disaster = models.JSONField(null=True, blank=True, help_text='结算前灾害（邻县受灾暴露度）')
+
+    class Meta:
+        db_table = 'term_month_metrics'
+        indexes = [
+            models.Index(fields=['game', 'season']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['game', 'season'],
+                condition=models.Q(neighbor_county__isnull=True),
+                name='uniq_term_metric_player_season',
+            ),
+            models.UniqueConstraint(
+                fields=['neighbor_county', 'season'],
+                name='uniq_term_metric_neighbor_season',
+            ),
+        ]
+
+    def __str__(self):
+        owner = f"Neighbor#{self.neighbor_county_id}" if self.neighbor_county_id else "Player"
+        return f"TermMetric Game#{self.game_id} {owner} S{self.season}"
+
+
 class NeighborPrecompute(models.Model):
     """邻县AI决策预计算结果（持久化到DB，替代Redis缓存）"""
     STATUS_CHOICES = [
@@ -413,6 +575,14 @@ class NeighborPrecompute(models.Model):
     season = models.IntegerField(help_text='预计算对应的月份')
     results = models.JSONField(default=dict, help_text='各邻县AI决策结果')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='computing')
+    task_key = models.CharField(max_length=64, blank=True, default='',
+                                help_text='幂等键 kind:game:season，同键任务不重复认领')
+    expected_count = models.IntegerField(default=0, help_text='本次需预计算的县数')
+    failed = models.JSONField(default=list, blank=True, help_text='预计算失败的县 id 列表')
+    completed = models.JSONField(
+        default=list, blank=True,
+        help_text='已完成县的 {id, county_name, governor_name} 摘要（进度查询只读此列，不读 results）',
+    )
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -0,0 +1,48 @@
+"""事件日志键集（keyset）分页
+
+按 (-created_at, -id) 倒序翻页，游标记录上一页最后一行的 (created_at, id)，
+下一页只需 WHERE (created_at, id) < 游标 + LIMIT，配合同序索引每页代价恒定，
+不随县志翻到多深而增长（OFFSET 分页需要扫描并丢弃前面所有行）。
+"""
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+KEYSET_ORDERING = ('-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode('ascii').split('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def keyset_page(qs, cursor=None, limit=50):
+    """返回 (rows, next_cursor)；next_cursor 为 None 表示已到末页
+
+    多取一行判断是否还有下一页，不额外发 COUNT 查询。
+    """
+    qs = qs.order_by(*KEYSET_ORDERING)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    rows = list(qs[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.pk)
@@ -1,3 +1,5 @@
+import copy
+
 from rest_framework import serializers
 from .models import (
     Agent, EventLog, Faction, GameState, MonarchProfile,
@@ -146,9 +148,16 @@ class GameDetailSerializer(serializers.ModelSerializer):
             "created_at", "updated_at",
         ]
 
+    def to_representation(self, instance):
+        from .services.state import shared_player_state
+        # county_data / investments / relief advice / review all read the same state
+        with shared_player_state(instance):
+            return super().to_representation(instance)
+
     def get_county_data(self, obj):
         from .services.state import load_county_state
-        return load_county_state(obj)
+        # 快照：后续字段的计算（如救灾建议补齐账本）会修改共享状态
+        return copy.deepcopy(load_county_state(obj))
 
     def get_available_investments(self, obj):
         from .services import InvestmentService
@@ -220,7 +229,34 @@ class EmergencyDebugToggleSerializer(serializers.Serializer):
     enabled = serializers.BooleanField(help_text="是否显式展示隐藏触发")
 
 
-class EventLogSerializer(serializers.ModelSerializer):
+class ProjectedFieldsMixin:
+    """按 fields 参数裁剪输出字段（列表接口的 fields= 投影）
+
+    DEFAULT_EXCLUDED 中的重字段（如 data）只在显式请求时输出。
+    """
+    DEFAULT_EXCLUDED = ('data',)
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = set(self.resolve_fields(fields))
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+    @classmethod
+    def resolve_fields(cls, requested=None):
+        """解析 fields= 参数：空为默认（排除重字段），'all' 为全部，未知字段忽略"""
+        available = list(cls.Meta.fields)
+        if not requested:
+            return [f for f in available if f not in cls.DEFAULT_EXCLUDED]
+        names = {f.strip() for f in requested.split(',') if f.strip()}
+        if 'all' in names:
+            return available
+        names.add('id')
+        return [f for f in available if f in names]
+
+
+class EventLogSerializer(ProjectedFieldsMixin, serializers.ModelSerializer):
     category_display = serializers.CharField(
         source='get_category_display', read_only=True,
     )
@@ -274,7 +310,7 @@ class NeighborCountySummarySerializer(serializers.ModelSerializer):
         return obj.county_data.get('county_type_name', '')
 
 
-class NeighborEventLogSerializer(serializers.ModelSerializer):
+class NeighborEventLogSerializer(ProjectedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = NeighborEventLog
         fields = [
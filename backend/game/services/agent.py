@@ -5,10 +5,11 @@ import random
 from ..agent_defs import MVP_AGENTS, MVP_RELATIONSHIPS
 from ..models import Agent, DialogueMessage, Relationship
 from .local_npc import build_county_local_agent_definitions, ensure_county_local_cast
-from .state import load_county_state, save_player_state
+from .state import load_county_state, save_player_state, shared_player_state
 
 from llm.client import LLMClient
 from llm.prompts import PromptRegistry
+from llm.streaming import chat_deltas, chat_json_deltas, drain
 
 logger = logging.getLogger('game')
 
@@ -329,6 +330,12 @@ class AgentService:
     @classmethod
     def build_system_context(cls, agent, game):
         """构建模板渲染所需的全部 kwargs"""
+        # 要略、县情、村情共用同一份县域状态
+        with shared_player_state(game):
+            return cls._build_system_context(agent, game)
+
+    @classmethod
+    def _build_system_context(cls, agent, game):
         attrs = agent.attributes
         village_name = attrs.get('village_name', '')
         village_summary = ''
@@ -474,6 +481,14 @@ class AgentService:
     @classmethod
     def chat_with_agent(cls, game, agent, player_message):
         """与NPC对话的完整流程"""
+        return drain(cls.iter_chat_with_agent(game, agent, player_message, stream=False))
+
+    @classmethod
+    def iter_chat_with_agent(cls, game, agent, player_message, stream=True):
+        """对话流程的生成器形式：stream=True 时逐段 yield NPC 台词增量，
+
+        结束时 return 与 chat_with_agent 相同的结果字典（回复在生成结束时落库）。
+        """
         # 0. 师爷问策次数限制
         if agent.role == 'ADVISOR':
             county = load_county_state(game)
@@ -501,9 +516,9 @@ class AgentService:
 
         # 3. 根据tier选择不同处理方式
         if agent.tier == 'FULL':
-            result = cls._chat_full(ctx, game, agent)
+            result = yield from cls._chat_full(ctx, game, agent, stream)
         else:
-            result = cls._chat_light(ctx, game, agent)
+            result = yield from cls._chat_light(ctx, game, agent, stream)
 
         # 4. 师爷问策次数计数
         if agent.role == 'ADVISOR' and 'error' not in result:
@@ -514,8 +529,8 @@ class AgentService:
         return result
 
     @classmethod
-    def _chat_full(cls, ctx, game, agent):
-        """FULL agent: LLM JSON对话"""
+    def _chat_full(cls, ctx, game, agent, stream=False):
+        """FULL agent: LLM JSON对话（生成器，stream 时 yield dialogue 增量）"""
         template_name = 'advisor_chat_json' if agent.role == 'ADVISOR' else 'agent_full_chat_json'
         system_prompt, user_prompt = PromptRegistry.render(
             template_name, **ctx,
@@ -542,7 +557,10 @@ class AgentService:
         # 调用LLM
         try:
             client = LLMClient()
-            result = client.chat_json(messages, temperature=0.8, max_tokens=512)
+            result = yield from chat_json_deltas(
+                client, messages, stream, temperature=0.8, max_tokens=512,
+                tag='agent_chat', template=template_name,
+            )
         except Exception as e:
             logger.error("LLM chat failed for agent %s: %s", agent.name, e)
             result = {
@@ -575,8 +593,8 @@ class AgentService:
         return result
 
     @classmethod
-    def _chat_light(cls, ctx, game, agent):
-        """LIGHT agent: LLM简短对话"""
+    def _chat_light(cls, ctx, game, agent, stream=False):
+        """LIGHT agent: LLM简短对话（生成器，stream 时 yield 文本增量）"""
         system_prompt, user_prompt = PromptRegistry.render(
             'agent_light_chat', **ctx,
         )
@@ -588,7 +606,10 @@ class AgentService:
 
         try:
             client = LLMClient()
-            dialogue = client.chat(messages, temperature=0.8, max_tokens=256)
+            dialogue = yield from chat_deltas(
+                client, messages, stream, temperature=0.8, max_tokens=256,
+                tag='agent_chat', template='agent_light_chat',
+            )
         except Exception as e:
             logger.error("LLM chat failed for light agent %s: %s", agent.name, e)
             dialogue = f'{agent.name}憨厚一笑，不知如何作答。'
@@ -1,9 +1,10 @@
 """AI知县决策服务 — LLM为主 + 规则引擎兜底"""
 
+import asyncio
 import logging
 import random
 
-from llm.client import LLMClient
+from llm.client import AsyncLLMClient, LLMClient, run_sync
 from llm.prompts import PromptRegistry
 from .constants import (
     GOVERNOR_STYLES,
@@ -76,13 +77,65 @@ class AIGovernorService:
     @classmethod
     def make_decisions(cls, neighbor, season):
         """AI知县施政决策：LLM为主，规则引擎兜底。返回事件描述列表"""
-        county = neighbor.county_data
+        profile, messages = cls._prepare_decision(neighbor, season)
+        llm_result = cls._try_llm_decisions(neighbor, messages)
+        return cls._finish_decisions(neighbor, season, profile, llm_result)
+
+    @classmethod
+    def make_decisions_many(cls, units, season, timeout=None):
+        """批量施政决策：所有 LLM 请求经 AsyncLLMClient 并发发出。
+
+        units 为 NeighborCounty 或同接口的适配器；timeout 为单个请求的总时限，
+        超时或失败的县走规则引擎兜底。返回 {unit.id: [event_str, ...]}。
+        """
+        prepared = []
+        results = {}
+        for unit in units:
+            try:
+                profile, messages = cls._prepare_decision(unit, season)
+            except Exception as e:
+                logger.warning("AI governor decision failed for %s: %s",
+                               getattr(unit, 'county_name', unit.id), e)
+                results[unit.id] = []
+                continue
+            prepared.append((unit, profile, messages))
+
+        llm_results = run_sync(cls._gather_llm_decisions(
+            [(unit, messages) for unit, _profile, messages in prepared], timeout,
+        ))
+
+        for (unit, profile, _messages), llm_result in zip(prepared, llm_results):
+            try:
+                results[unit.id] = cls._finish_decisions(unit, season, profile, llm_result)
+            except Exception as e:
+                logger.warning("AI governor decision failed for %s: %s",
+                               unit.county_name, e)
+                results[unit.id] = []
+        return results
 
-        # 懒初始化 governor_profile
+    @classmethod
+    def _prepare_decision(cls, neighbor, season):
+        """懒初始化 profile 并渲染决策 prompt；渲染失败时 messages 为 None"""
+        county = neighbor.county_data
         profile = cls._ensure_profile(neighbor)
+        try:
+            ctx = cls._build_context(neighbor, county, season, profile)
+            system_prompt, user_prompt = PromptRegistry.render(
+                'ai_governor_decision', **ctx)
+        except Exception as e:
+            logger.warning(
+                "AI governor prompt failed for %s (non-fatal): %s",
+                neighbor.county_name, e,
+            )
+            return profile, None
+        messages = [{'role': 'system', 'content': system_prompt},
+                    {'role': 'user', 'content': user_prompt}]
+        return profile, messages
 
-        # 尝试 LLM 决策
-        llm_result = cls._try_llm_decisions(neighbor, county, season, profile)
+    @classmethod
+    def _finish_decisions(cls, neighbor, season, profile, llm_result):
+        """执行 LLM 决策（不合法部分由规则引擎补充），LLM 结果为 None 时全部走规则引擎"""
+        county = neighbor.county_data
 
         if llm_result is not None:
             # LLM 成功 — 验证并执行合法部分，不合法部分由规则引擎补充
@@ -144,20 +197,18 @@ class AIGovernorService:
 
     # ==================== LLM 决策 ====================
 
+    _LLM_TIMEOUT = 20.0
+    _LLM_MAX_RETRIES = 2
+
     @classmethod
-    def _try_llm_decisions(cls, neighbor, county, season, profile):
+    def _try_llm_decisions(cls, neighbor, messages):
         """尝试调用 LLM 获取决策，失败返回 None"""
-        ctx = cls._build_context(neighbor, county, season, profile)
+        if messages is None:
+            return None
         try:
-            system_prompt, user_prompt = PromptRegistry.render(
-                'ai_governor_decision', **ctx)
-            client = LLMClient(timeout=20.0, max_retries=2)
-            result = client.chat_json(
-                [{'role': 'system', 'content': system_prompt},
-                 {'role': 'user', 'content': user_prompt}],
-                temperature=0.7,
-                max_tokens=1024,
-            )
+            client = LLMClient(timeout=cls._LLM_TIMEOUT, max_retries=cls._LLM_MAX_RETRIES)
+            result = client.chat_json(messages, temperature=0.7, max_tokens=1024,
+                                      tag='ai_governor', template='ai_governor_decision')
             if not isinstance(result, dict):
                 return None
             return result
@@ -168,6 +219,37 @@ class AIGovernorService:
             )
             return None
 
+    @classmethod
+    async def _gather_llm_decisions(cls, requests, timeout=None):
+        """并发请求多个县的 LLM 决策，返回与 requests 同序的 dict 或 None"""
+        if not requests:
+            return []
+        try:
+            client = AsyncLLMClient(timeout=cls._LLM_TIMEOUT, max_retries=cls._LLM_MAX_RETRIES)
+        except Exception as e:
+            logger.warning("AI governor LLM unavailable (non-fatal): %s", e)
+            return [None] * len(requests)
+
+        async def _one(neighbor, messages):
+            if messages is None:
+                return None
+            try:
+                call = client.chat_json(messages, temperature=0.7, max_tokens=1024,
+                                        tag='ai_governor', template='ai_governor_decision')
+                result = await (asyncio.wait_for(call, timeout) if timeout else call)
+            except Exception as e:
+                logger.warning(
+                    "AI governor LLM failed for %s (non-fatal): %s",
+                    neighbor.county_name, e,
+                )
+                return None
+            return result if isinstance(result, dict) else None
+
+        try:
+            return await asyncio.gather(*(_one(n, m) for n, m in requests))
+        finally:
+            await client.aclose()
+
     # ==================== Prompt 构建 ====================
 
     @classmethod
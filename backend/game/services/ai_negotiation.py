@@ -1,27 +1,50 @@
 """AI知县交涉服务 — 模拟AI知县与地方乡绅的谈判过程
 
 启用条件：settings.AI_NEGOTIATION_ENABLED = True
-每次兼并/隐田事件触发时，最多调用 MAX_NEG_ROUNDS 次 LLM（知县一侧），
+结算前由 plan_negotiations_many 为各县掷定本月兼并/隐田是否触发、落在哪个村，
+只为真正触发的事件批量（并发）调用 LLM 预定知县每轮策略，写入
+county[NEGOTIATION_PLAN_KEY]；结算沿用掷定的结果并只读取预定策略，
+缺失时回退规则引擎，结算本身不发起任何 LLM 调用。
 乡绅反应通过确定性规则推算，不调用 LLM。
 """
 
+import asyncio
 import logging
 import random
 
 from django.conf import settings
 
-from llm.client import LLMClient
+from llm.client import AsyncLLMClient, run_sync
 from llm.prompts import PromptRegistry
 
 logger = logging.getLogger('game')
 
 MAX_NEG_ROUNDS = 2
 
+# 本月预定的交涉：{event_type: {'village': 触发村名或 None, 'stances': [round1, round2]}}，
+# settle_county 结束时清除
+NEGOTIATION_PLAN_KEY = '_ai_negotiation_plan'
+
+_ANNEXATION_WILLINGNESS = 0.25  # 乡绅顺从意愿初始值
+_HIDDEN_LAND_WILLINGNESS = 0.30
+_ANNEXATION_SURPLUS_THRESHOLD = 3  # 与 SettlementService._check_annexation 一致
+
 
 def is_ai_negotiation_enabled():
     return getattr(settings, 'AI_NEGOTIATION_ENABLED', False)
 
 
+def planned_trigger(county, event_type):
+    """结算前已掷定的触发结果：(是否已掷定, 触发村名或 None)
+
+    未经 plan_negotiations_many（如未启用 AI 交涉）时返回 (False, None)，结算自行掷骰。
+    """
+    plan = (county.get(NEGOTIATION_PLAN_KEY) or {}).get(event_type)
+    if plan is None:
+        return False, None
+    return True, plan.get('village')
+
+
 class AIGovernorNegotiationService:
 
     # ==================== 兼并事件 ====================
@@ -42,15 +65,12 @@ class AIGovernorNegotiationService:
         gentry_name = _gentry_display_name(village)
         gov_name = governor_meta.get('name', '知县')
 
-        willingness = 0.25  # 乡绅顺从意愿初始值
+        willingness = _ANNEXATION_WILLINGNESS
         event_log = []
+        planned = cls._planned_stances(county, 'annexation', village_name)
 
         for round_num in range(1, MAX_NEG_ROUNDS + 1):
-            stance = cls._governor_turn(
-                governor_meta, profile, village, 'annexation',
-                willingness, leverage, round_num,
-                event_desc=f'{gentry_name}趁民心低迷大肆收购村民田地，图谋进一步扩充田产。',
-            )
+            stance = cls._next_stance(planned, round_num, profile, leverage, 'annexation')
             willingness = cls._update_willingness_annexation(willingness, stance, leverage)
             gentry_reply = _gentry_response_annexation(willingness, gentry_name)
             event_log.append(
@@ -81,18 +101,12 @@ class AIGovernorNegotiationService:
         gentry_name = _gentry_display_name(village)
         gov_name = governor_meta.get('name', '知县')
 
-        willingness = 0.30
+        willingness = _HIDDEN_LAND_WILLINGNESS
         event_log = []
+        planned = cls._planned_stances(county, 'hidden_land', village_name)
 
         for round_num in range(1, MAX_NEG_ROUNDS + 1):
-            stance = cls._governor_turn(
-                governor_meta, profile, village, 'hidden_land',
-                willingness, leverage, round_num,
-                event_desc=(
-                    f'修建水利时发现{gentry_name}隐匿田产{hidden_land}亩，'
-                    f'要求其主动申报，否则强制清丈。'
-                ),
-            )
+            stance = cls._next_stance(planned, round_num, profile, leverage, 'hidden_land')
             willingness = cls._update_willingness_hidden(willingness, stance, leverage)
             gentry_reply = _gentry_response_hidden(willingness, gentry_name)
             event_log.append(
@@ -104,22 +118,146 @@ class AIGovernorNegotiationService:
         declared_ratio = cls._calc_declared_ratio(willingness, county, village)
         return declared_ratio, event_log
 
+    # ==================== 结算前批量预定策略 ====================
+
+    @classmethod
+    def plan_negotiations_many(cls, counties, month):
+        """结算前掷定各县本月兼并/隐田是否触发，并为触发的事件并发预定知县策略。
+
+        触发概率与结算相同（SettlementService._annexation_probability /
+        _hidden_land_probability），按结算前的县情逐村掷骰，首个命中的村即本月
+        触发村；未触发也记入计划（village=None），结算据此不再重复掷骰。
+        只有触发的事件才按与结算相同的回合规则推演并调用 LLM。
+        未启用 AI 交涉时直接返回。
+        """
+        if not is_ai_negotiation_enabled():
+            return
+        jobs = []
+        for county in counties:
+            county.pop(NEGOTIATION_PLAN_KEY, None)
+            plan = county[NEGOTIATION_PLAN_KEY] = {}
+            for event_type, village, hidden in cls._roll_triggers(county, month):
+                plan[event_type] = {'village': village['name'] if village else None, 'stances': []}
+                if village is not None:
+                    jobs.append((county, event_type, village, hidden))
+        if not jobs:
+            return
+
+        plans = run_sync(cls._plan_all(jobs))
+        for (county, event_type, _village, _hidden), stances in zip(jobs, plans):
+            county[NEGOTIATION_PLAN_KEY][event_type]['stances'] = stances
+
+    @classmethod
+    def _roll_triggers(cls, county, month):
+        """按结算前的县情掷定本月事件，返回 [(event_type, 触发村或 None, hidden_land)]
+
+        只返回前置条件成立（本月会进入结算掷骰）的事件类型。
+        """
+        from .settlement import SettlementService
+
+        villages = county.get('villages') or []
+        rolled = []
+
+        surplus = SettlementService._estimate_monthly_surplus_per_capita(county, month)
+        if villages and surplus < _ANNEXATION_SURPLUS_THRESHOLD:
+            has_disaster = county.get('disaster_this_year') is not None
+            village = next((
+                v for v in villages
+                if random.random() < SettlementService._annexation_probability(v, surplus, has_disaster)
+            ), None)
+            rolled.append(('annexation', village, 0))
+
+        has_irrigation = any(
+            inv.get('action') == 'build_irrigation'
+            for inv in county.get('active_investments', [])
+        )
+        if county.get('bailiff_level', 0) >= 1 and has_irrigation:
+            hidden = [
+                (v, _hidden_farmland(v)) for v in villages
+                if not v.get('hidden_land_discovered', False)
+            ]
+            hidden = [(v, h) for v, h in hidden if h > 0]
+            if hidden:
+                village, amount = next((
+                    (v, h) for v, h in hidden
+                    if random.random() < SettlementService._hidden_land_probability(v)
+                ), (None, 0))
+                rolled.append(('hidden_land', village, amount))
+        return rolled
+
+    @classmethod
+    async def _plan_all(cls, jobs):
+        try:
+            client = AsyncLLMClient(timeout=15.0, max_retries=1)
+        except Exception as e:
+            logger.warning('AI negotiation LLM unavailable (non-fatal): %s', e)
+            client = None
+        try:
+            return await asyncio.gather(*(cls._plan_one(client, *job) for job in jobs))
+        finally:
+            if client is not None:
+                await client.aclose()
+
+    @classmethod
+    async def _plan_one(cls, client, county, event_type, village, hidden_land):
+        """按结算同样的回合规则推演一次，返回各回合知县策略"""
+        meta = county.get('governor_meta', {})
+        profile = county.get('governor_profile', {})
+        leverage = cls._calc_leverage(county, village)
+        if event_type == 'annexation':
+            willingness, update, early_stop = (
+                _ANNEXATION_WILLINGNESS, cls._update_willingness_annexation, 0.60)
+        else:
+            willingness, update, early_stop = (
+                _HIDDEN_LAND_WILLINGNESS, cls._update_willingness_hidden, 0.65)
+        event_desc = _event_desc(event_type, village, hidden_land)
+
+        stances = []
+        for round_num in range(1, MAX_NEG_ROUNDS + 1):
+            stance = await cls._governor_turn(
+                client, meta, profile, village, event_type,
+                willingness, leverage, round_num, event_desc,
+            )
+            stances.append(stance)
+            willingness = update(willingness, stance, leverage)
+            if willingness >= early_stop and round_num == 1:
+                break
+        return stances
+
+    @classmethod
+    def _planned_stances(cls, county, event_type, village_name):
+        """取为该村预定的策略；计划针对的是别的村时不套用"""
+        plan = (county.get(NEGOTIATION_PLAN_KEY) or {}).get(event_type) or {}
+        if plan.get('village') != village_name:
+            return []
+        return list(plan.get('stances') or [])
+
+    @classmethod
+    def _next_stance(cls, planned, round_num, profile, leverage, event_type):
+        """取预定策略；未预定（如本月未预料到的触发）时回退规则引擎"""
+        if round_num <= len(planned):
+            return planned[round_num - 1]
+        return cls._fallback_stance(profile, leverage, event_type)
+
     # ==================== LLM调用 ====================
 
     @classmethod
-    def _governor_turn(cls, meta, profile, village, event_type,
-                       willingness, leverage, round_num, event_desc):
+    async def _governor_turn(cls, client, meta, profile, village, event_type,
+                             willingness, leverage, round_num, event_desc):
         """调用 LLM 决定知县本轮策略，失败时回退到规则引擎。"""
+        if client is None:
+            return cls._fallback_stance(profile, leverage, event_type)
         try:
             ctx = cls._build_ctx(meta, profile, village, event_type,
                                  willingness, leverage, round_num, event_desc)
             system_prompt, user_prompt = PromptRegistry.render('ai_governor_negotiation', **ctx)
-            client = LLMClient(timeout=15.0, max_retries=1)
-            result = client.chat_json(
+            result = await client.chat_json(
                 [{'role': 'system', 'content': system_prompt},
                  {'role': 'user', 'content': user_prompt}],
                 temperature=0.7,
                 max_tokens=256,
+                tag='ai_negotiation',
+                template='ai_governor_negotiation',
             )
             stance = result.get('stance', 'persuade')
             if stance not in ('press_hard', 'persuade', 'offer_leniency', 'back_down'):
@@ -233,6 +371,21 @@ def _gentry_display_name(village):
     return village.get('gentry_name', f"{village['name']}地主")
 
 
+def _hidden_farmland(village):
+    gentry_ledger = village.get('gentry_ledger', {})
+    return max(0, int(gentry_ledger.get('hidden_farmland', village.get('hidden_land', 0))))
+
+
+def _event_desc(event_type, village, hidden_land=0):
+    gentry_name = _gentry_display_name(village)
+    if event_type == 'annexation':
+        return f'{gentry_name}趁民心低迷大肆收购村民田地，图谋进一步扩充田产。'
+    return (
+        f'修建水利时发现{gentry_name}隐匿田产{hidden_land}亩，'
+        f'要求其主动申报，否则强制清丈。'
+    )
+
+
 def _stance_zh(stance):
     return {
         'press_hard': '强硬施压',
@@ -18,6 +18,13 @@ from .constants import (
 )
 from .emergency import EmergencyService
 from .state import load_county_state, save_player_state
+from .unit_projection import project_units
+
+# 人事面板只读取的下辖县 unit_data 顶层键
+PERSONNEL_UNIT_KEYS = ("county_name", "governor_profile", "annual_reviews")
+
+# 已完成知府评议的评议状态（对应 AdminUnit.review_state 冗余列）
+PREFECT_REVIEWED_STATES = ("prefect_reviewed", "finalized")
 
 
 class AnnualReviewService:
@@ -290,10 +297,11 @@ class AnnualReviewService:
         season = game.current_season
         moy = month_of_year(season)
         display_year = cls.display_year_for_season(season)
-        subordinates = list(
+        subordinates = project_units(
             AdminUnit.objects.filter(
                 game=game, unit_type="COUNTY", parent=game.player_unit,
-            ).order_by("id")
+            ).order_by("id"),
+            keys=PERSONNEL_UNIT_KEYS,
         )
         has_previous_cycle = any(
             cls._find_cycle(unit.unit_data, display_year) is not None for unit in subordinates
@@ -350,14 +358,14 @@ class AnnualReviewService:
 
         cls.ensure_prefecture_self_reviews(game)
         review_year = year_of(game.current_season)
-        pending = []
-        subordinates = AdminUnit.objects.filter(
-            game=game, unit_type="COUNTY", parent=game.player_unit,
-        ).order_by("id")
-        for unit in subordinates:
-            cycle = cls._find_cycle(unit.unit_data, review_year)
-            if not cycle or not cycle.get("prefect_review"):
-                pending.append(unit.unit_data.get("county_name", f"州县#{unit.id}"))
+        pending = [
+            name or f"州县#{unit_id}"
+            for unit_id, name in AdminUnit.objects.filter(
+                game=game, unit_type="COUNTY", parent=game.player_unit,
+            ).exclude(
+                review_year=review_year, review_state__in=PREFECT_REVIEWED_STATES,
+            ).order_by("id").values_list("id", "name")
+        ]
         if not pending:
             return None
         names = "、".join(pending[:3])
@@ -438,6 +446,7 @@ class AnnualReviewService:
         subordinates = list(
             AdminUnit.objects.filter(
                 game=game, unit_type="COUNTY", parent=game.player_unit,
+                review_year=review_year, review_state__in=PREFECT_REVIEWED_STATES,
             ).order_by("id")
         )
         summary = {
@@ -492,7 +501,7 @@ class AnnualReviewService:
             unit.save(update_fields=["unit_data"])
 
         if summary["finalized"] > 0:
-            pdata = game.player_unit.unit_data
+            pdata = game.get_unit_data()
             pdata["personnel_last_result"] = summary
             game.player_unit.unit_data = pdata
             game.player_unit.save(update_fields=["unit_data"])
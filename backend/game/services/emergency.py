@@ -8,6 +8,7 @@ from typing import Dict, List, Optional, Tuple
 from ..models import Agent, EventLog, NeighborCounty
 from .constants import ANNUAL_CONSUMPTION, GRAIN_PER_LIANG
 from .ledger import ensure_county_ledgers, refresh_village_grain_ledgers
+from .peers import PeerSummary
 from .state import load_county_state, save_player_state
 
 
@@ -107,7 +108,7 @@ class EmergencyService:
         month: int,
         report: Dict,
         game=None,
-        peer_counties: Optional[List[Dict]] = None,
+        peer_counties: Optional[List[PeerSummary]] = None,
     ) -> Dict:
         """Month-start processing before normal settlement flow."""
         cls.ensure_state(county)
@@ -752,7 +753,7 @@ class EmergencyService:
         county: Dict,
         month: int,
         report: Dict,
-        peer_counties: Optional[List[Dict]],
+        peer_counties: Optional[List[PeerSummary]],
     ) -> None:
         cls.ensure_state(county)
         riot = county["emergency"].get("riot", {})
@@ -771,14 +772,13 @@ class EmergencyService:
         cls._trigger_riot(county, month, report, source="chain")
 
     @classmethod
-    def _is_riot_exposed_to_peer_wave(cls, month: int, peer_counties: Optional[List[Dict]]) -> bool:
+    def _is_riot_exposed_to_peer_wave(cls, month: int, peer_counties: Optional[List[PeerSummary]]) -> bool:
         if not peer_counties:
             return False
         prev_month = int(month) - 1
         for peer in peer_counties:
-            emergency = (peer or {}).get("emergency") or {}
-            riot = emergency.get("riot") or {}
-            if riot.get("active") and int(riot.get("start_season") or -999) == prev_month:
+            peer = PeerSummary.coerce(peer or {})
+            if peer is not None and peer.riot_started_in(prev_month):
                 return True
         return False
 
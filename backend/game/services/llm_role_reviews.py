@@ -554,6 +554,11 @@ class LLMRoleReviewService:
                     messages,
                     temperature=0.55 if attempt == 1 else 0.2,
                     max_tokens=420,
+                    # 同一份事实包重复渲染（如刷新页面）直接复用；只缓存通过校验的评语
+                    cache=True,
+                    validate=lambda review: cls._is_valid_review(review, visible_fact_ids),
+                    tag='role_review',
+                    template='term_peer_review_json',
                 )
             except Exception as exc:
                 logger.warning("Role review LLM failed (%s): %s", spec["role_key"], exc)
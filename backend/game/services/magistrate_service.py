@@ -108,6 +108,8 @@ class MagistrateService:
                  {'role': 'user', 'content': user_msg}],
                 temperature=0.85,
                 max_tokens=120,
+                cache=True,
+                tag='bio',
             ).strip()
             if bio:
                 return bio
@@ -151,6 +153,7 @@ class MagistrateService:
                  {'role': 'user', 'content': user_msg}],
                 temperature=0.85,
                 max_tokens=150,
+                tag='player_flavor',
             )
             if isinstance(result, dict) and 'core_belief' in result and 'governing_style' in result:
                 return result
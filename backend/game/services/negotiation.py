@@ -17,6 +17,7 @@ from .state import load_county_state, save_player_state
 
 from llm.client import LLMClient
 from llm.prompts import PromptRegistry
+from llm.streaming import chat_json_deltas, drain
 
 logger = logging.getLogger('game')
 NEGOTIATION_INACTIVE_SEASONS = 3
@@ -121,6 +122,19 @@ class NegotiationService:
 
         Returns a result dict with dialogue, round info, and status.
         """
+        return drain(cls.iter_negotiate_round(
+            game, session, player_message, speaker_role=speaker_role, stream=False,
+        ))
+
+    @classmethod
+    def iter_negotiate_round(cls, game, session, player_message, speaker_role='PLAYER',
+                             stream=True):
+        """Generator form of negotiate_round.
+
+        With ``stream`` the agent's dialogue is yielded as it arrives from the
+        LLM; the return value is the same dict negotiate_round returns, and the
+        agent message is persisted once the reply is complete.
+        """
         cls.expire_stale_negotiations(game, current_season=game.current_season)
         session.refresh_from_db()
         if session.status != 'active':
@@ -174,11 +188,11 @@ class NegotiationService:
         ctx['village_name'] = agent.attributes.get('village_name', '')
 
         if session.event_type == 'ANNEXATION':
-            result = cls._negotiate_annexation(ctx, game, session)
+            result = yield from cls._negotiate_annexation(ctx, game, session, stream)
         elif session.event_type == 'HIDDEN_LAND':
-            result = cls._negotiate_hidden_land(ctx, game, session)
+            result = yield from cls._negotiate_hidden_land(ctx, game, session, stream)
         else:
-            result = cls._negotiate_irrigation(ctx, game, session)
+            result = yield from cls._negotiate_irrigation(ctx, game, session, stream)
 
         handoff_to_player = False
         handoff_message = ''
@@ -321,8 +335,8 @@ class NegotiationService:
     # ------------------------------------------------------------------
 
     @classmethod
-    def _negotiate_annexation(cls, ctx, game, session):
-        """Process one annexation negotiation round via LLM."""
+    def _negotiate_annexation(cls, ctx, game, session, stream=False):
+        """Process one annexation negotiation round via LLM (generator; yields dialogue deltas when streaming)."""
         cd = session.context_data
         ctx['current_pct'] = cd.get('current_pct', 0.35)
         proposed_increase = cd.get('proposed_pct_increase', 0.05)
@@ -338,7 +352,10 @@ class NegotiationService:
 
         try:
             client = LLMClient()
-            result = client.chat_json(messages, temperature=0.8, max_tokens=512)
+            result = yield from chat_json_deltas(
+                client, messages, stream, temperature=0.8, max_tokens=512,
+                tag='negotiation', template=template_name,
+            )
         except Exception as e:
             logger.warning("Negotiation LLM failed for %s: %s", session.agent.name, e)
             raw = getattr(e, 'raw_content', '') or ''
@@ -391,8 +408,8 @@ class NegotiationService:
     # ------------------------------------------------------------------
 
     @classmethod
-    def _negotiate_irrigation(cls, ctx, game, session):
-        """Process one irrigation negotiation round via LLM."""
+    def _negotiate_irrigation(cls, ctx, game, session, stream=False):
+        """Process one irrigation negotiation round via LLM (generator; yields dialogue deltas when streaming)."""
         cd = session.context_data
         ctx['max_contribution'] = cd.get('max_contribution', 20)
 
@@ -405,7 +422,10 @@ class NegotiationService:
 
         try:
             client = LLMClient()
-            result = client.chat_json(messages, temperature=0.8, max_tokens=512)
+            result = yield from chat_json_deltas(
+                client, messages, stream, temperature=0.8, max_tokens=512,
+                tag='negotiation', template=template_name,
+            )
         except Exception as e:
             logger.warning("Negotiation LLM failed for %s: %s", session.agent.name, e)
             raw = getattr(e, 'raw_content', '') or ''
@@ -457,8 +477,8 @@ class NegotiationService:
     # ------------------------------------------------------------------
 
     @classmethod
-    def _negotiate_hidden_land(cls, ctx, game, session):
-        """Process one hidden land negotiation round via LLM."""
+    def _negotiate_hidden_land(cls, ctx, game, session, stream=False):
+        """Process one hidden land negotiation round via LLM (generator; yields dialogue deltas when streaming)."""
         cd = session.context_data
         ctx['hidden_land'] = cd.get('hidden_land', 0)
         ctx['current_farmland'] = cd.get('current_farmland', 0)
@@ -473,7 +493,10 @@ class NegotiationService:
 
         try:
             client = LLMClient()
-            result = client.chat_json(messages, temperature=0.8, max_tokens=512)
+            result = yield from chat_json_deltas(
+                client, messages, stream, temperature=0.8, max_tokens=512,
+                tag='negotiation', template=template_name,
+            )
         except Exception as e:
             logger.warning("Negotiation LLM failed for %s: %s", session.agent.name, e)
             raw = getattr(e, 'raw_content', '') or ''
@@ -5,7 +5,9 @@ import logging
 import random
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
 
-from ..models import NeighborCounty, NeighborEventLog, NeighborPrecompute
+from django.db import transaction
+
+from ..models import NeighborCounty, NeighborEventLog, NeighborPrecompute, TermMonthMetric
 from .constants import (
     COUNTY_TYPES,
     GOVERNOR_STYLES,
@@ -16,12 +18,16 @@ from .constants import (
     ARCHETYPE_COUNTY_TYPE_WEIGHTS,
     generate_governor_profile,
     month_name,
+    MAX_MONTH,
 )
 from .magistrate_service import MagistrateService
 from .county import CountyService
 from .settlement import SettlementService
 from .ai_governor import AIGovernorService
+from .ai_negotiation import AIGovernorNegotiationService
 from .emergency import EmergencyService
+from .peers import PeerSummary
+from .precompute import PrecomputeStore
 from .state import load_county_state
 
 logger = logging.getLogger('game')
@@ -207,20 +213,22 @@ class NeighborService:
         if not neighbors:
             return
 
-        # 检查DB预计算状态
-        precompute = NeighborPrecompute.objects.filter(
-            game=game, season=season, status='done',
-        ).first()
-
-        if precompute:
+        # 检查DB预计算状态（仍在算时短暂等待）；输入已变的邻县单独重算
+        precomputed = PrecomputeStore.ready(game.id, season, cls.PRECOMPUTE_KIND)
+        cached = PrecomputeStore.fresh_entries(
+            precomputed,
+            {neighbor.id: neighbor.county_data for neighbor in neighbors},
+        )
+        if cached:
             logger.info("Using precomputed results for game %s season %s (%d neighbors)",
-                        game.id, season, len(precompute.results))
-            decision_results = cls._apply_cached_results(neighbors, precompute.results)
-        else:
-            # 无预计算或仍在计算中 — 并行同步计算（~10s）
-            logger.info("No precompute ready for game %s season %s, computing in parallel",
-                        game.id, season)
-            decision_results = cls._compute_decisions_sync(neighbors, season)
+                        game.id, season, len(cached))
+        decision_results = cls._apply_cached_results(neighbors, cached)
+        misses = [neighbor for neighbor in neighbors if str(neighbor.id) not in cached]
+        if misses:
+            # 无预计算或未命中 — 并行同步计算（~10s）
+            logger.info("No precompute ready for game %s season %s (%d neighbors), computing in parallel",
+                        game.id, season, len(misses))
+            decision_results.update(cls._compute_decisions_sync(misses, season))
 
         # 清除已消费的预计算记录
         NeighborPrecompute.objects.filter(game=game).delete()
@@ -240,69 +248,52 @@ class NeighborService:
         for neighbor in neighbors:
             entry = cached.get(str(neighbor.id))
             if entry:
-                neighbor.county_data = entry["county_data"]
+                neighbor.county_data = PrecomputeStore.carry_volatile(entry["county_data"], neighbor.county_data)
                 neighbor.last_reasoning = entry.get("last_reasoning", "")
                 decision_results[neighbor.id] = entry.get("events", [])
             else:
                 decision_results[neighbor.id] = []
         return decision_results
 
-    @classmethod
-    def _compute_single_decision(cls, neighbor, season):
-        """单个邻县LLM决策（在线程中调用，结束后关闭DB连接）"""
-        from django.db import connection
-        try:
-            events = AIGovernorService.make_decisions(neighbor, season)
-            return neighbor.id, events
-        except Exception as e:
-            logger.warning(
-                "AI governor decision failed for %s: %s",
-                neighbor.county_name, e,
-            )
-            return neighbor.id, []
-        finally:
-            connection.close()
-
     @classmethod
     def _compute_decisions_sync(cls, neighbors, season):
-        """并行调用LLM做决策（ThreadPoolExecutor，~10s代替~50s）"""
-        decision_results = {}
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {
-                executor.submit(cls._compute_single_decision, n, season): n
-                for n in neighbors
-            }
-            for future in as_completed(futures):
-                nid, events = future.result()
-                decision_results[nid] = events
-        return decision_results
+        """并发调用LLM做决策（AsyncLLMClient 一次性发出全部请求）"""
+        return AIGovernorService.make_decisions_many(neighbors, season)
 
     @classmethod
     def _settle_and_save(cls, neighbors, season, decision_results, player_county_data=None):
-        """物理结算 + 保存 + 写事件日志"""
+        """物理结算 + 保存 + 写事件日志
+
+        先完成全部邻县的纯计算（不访问数据库），再在一个事务中统一写入：
+        邻县一次 bulk_update、日志与任期月度指标各一次 bulk_create，查询数与邻县数量无关。
+        """
         all_logs = []
-        county_snapshots = {}
+        term_metrics = []
+        # 结算前为每县生成一次不可变对比摘要，所有邻县共享（不再深拷贝 county_data）
+        peer_summaries = {}
         for n in neighbors:
             EmergencyService.ensure_state(n.county_data)
-            snapshot = copy.deepcopy(n.county_data)
-            snapshot["_peer_name"] = n.county_name
-            county_snapshots[n.id] = snapshot
-        player_snapshot = copy.deepcopy(player_county_data) if isinstance(player_county_data, dict) else None
-        if player_snapshot is not None:
-            EmergencyService.ensure_state(player_snapshot)
-            player_snapshot["_peer_name"] = "玩家本县"
+            peer_summaries[n.id] = PeerSummary.from_county(n.county_data, name=n.county_name)
+        player_summary = None
+        if isinstance(player_county_data, dict):
+            player_summary = PeerSummary.from_county(player_county_data, name="玩家本县")
+
+        # 交涉 LLM 调用在结算前并发完成，settle_county 只做纯计算
+        AIGovernorNegotiationService.plan_negotiations_many(
+            [n.county_data for n in neighbors], season,
+        )
 
         for neighbor in neighbors:
             report = {"season": season, "events": []}
             decision_events = decision_results.get(neighbor.id, [])
             cls._ensure_initial_baseline(neighbor.county_data)
             peer_counties = [
-                county_data
-                for nid, county_data in county_snapshots.items()
+                summary
+                for nid, summary in peer_summaries.items()
                 if nid != neighbor.id
             ]
-            if player_snapshot is not None:
-                peer_counties.append(player_snapshot)
+            if player_summary is not None:
+                peer_counties.append(player_summary)
 
             pre_disaster = copy.deepcopy(neighbor.county_data.get("disaster_this_year"))
             SettlementService.settle_county(
@@ -311,7 +302,6 @@ class NeighborService:
                 report,
                 peer_counties=peer_counties,
             )
-            neighbor.save(update_fields=['county_data', 'last_reasoning'])
 
             snapshot_payload = {
                 "monthly_snapshot": cls._build_monthly_snapshot(neighbor.county_data, season),
@@ -323,6 +313,15 @@ class NeighborService:
                     neighbor.county_data.get("disaster_this_year")
                 ),
             }
+            term_metrics.append(TermMonthMetric(
+                game_id=neighbor.game_id,
+                neighbor_county=neighbor,
+                season=season,
+                snapshot=snapshot_payload["monthly_snapshot"],
+                autumn=snapshot_payload["autumn"] or None,
+                winter_snapshot=snapshot_payload["winter_snapshot"] or None,
+                disaster=pre_disaster or None,
+            ))
             all_logs.append(NeighborEventLog(
                 neighbor_county=neighbor,
                 season=season,
@@ -349,123 +348,106 @@ class NeighborService:
                     description=evt,
                 ))
 
-        if all_logs:
-            NeighborEventLog.objects.bulk_create(all_logs)
+        with transaction.atomic():
+            NeighborCounty.objects.bulk_update(neighbors, ['county_data', 'last_reasoning'])
+            if all_logs:
+                NeighborEventLog.objects.bulk_create(all_logs)
+            if term_metrics:
+                TermMonthMetric.objects.bulk_create(
+                    term_metrics,
+                    update_conflicts=True,
+                    unique_fields=['neighbor_county', 'season'],
+                    update_fields=['snapshot', 'autumn', 'winter_snapshot', 'disaster'],
+                )
 
     # ==================== 后台预计算 ====================
 
+    PRECOMPUTE_KIND = 'neighbor'
+
     @classmethod
-    def precompute_decisions(cls, game_id, season):
-        """后台预计算邻县AI决策，并行完成后存入DB。在独立线程中运行。"""
-        from django.db import connection
+    def schedule_precompute(cls, game):
+        """投机预计算：为玩家即将推进的当前月排队（事务提交后派发）"""
+        if game.current_season > MAX_MONTH:
+            return
+        from ..tasks import precompute_neighbor_decisions
+        PrecomputeStore.schedule(precompute_neighbor_decisions, game.id, game.current_season)
 
-        try:
-            # 使用 update_or_create 作为锁：如果已有 computing 状态的记录则跳过
-            precompute, created = NeighborPrecompute.objects.update_or_create(
-                game_id=game_id,
-                defaults={'season': season, 'status': 'computing', 'results': {}},
-            )
-            if not created and precompute.status == 'computing':
-                logger.info("Precompute already running for game %s season %s, skipping",
-                            game_id, season)
-                return
-            if not created and precompute.status == 'done' and precompute.season == season:
-                logger.info("Precompute already done for game %s season %s, skipping",
-                            game_id, season)
-                return
-            # 确保状态为 computing（对于已有 done 记录但 season 不同的情况）
-            if not created:
-                NeighborPrecompute.objects.filter(pk=precompute.pk).update(
-                    season=season, status='computing', results={},
-                )
+    @classmethod
+    def invalidate_precompute(cls, game, reschedule=True):
+        """玩家操作改动了邻县状态：丢弃本月预计算，并按新状态重新排队
+
+        改动邻县的视图（借粮、续任调任）须显式调用；input_digest 比对只是兜底，
+        它只能在推进时识别陈旧条目，此前 ready() 仍会为其等待。
+        """
+        PrecomputeStore.discard(game.id, cls.PRECOMPUTE_KIND)
+        if reschedule:
+            cls.schedule_precompute(game)
 
-            from ..models import GameState
-            game = GameState.objects.get(id=game_id)
-            neighbors = list(game.neighbors.all())
-            if not neighbors:
-                NeighborPrecompute.objects.filter(pk=precompute.pk).update(status='done')
-                return
-
-            # 深拷贝避免线程间数据冲突
-            neighbor_copies = []
-            for n in neighbors:
-                n_copy = copy.copy(n)
-                n_copy.county_data = copy.deepcopy(n.county_data)
-                neighbor_copies.append((n.id, n_copy))
-
-            logger.info("Starting precompute for game %s season %s (%d neighbors)",
-                        game_id, season, len(neighbor_copies))
-
-            # 并行计算所有邻县
-            results = {}
-
-            def _compute_one(nid, n_copy):
-                from django.db import connection as thread_conn
-                try:
-                    events = AIGovernorService.make_decisions(n_copy, season)
-                    return nid, {
-                        "events": events,
-                        "county_data": n_copy.county_data,
-                        "last_reasoning": getattr(n_copy, 'last_reasoning', ''),
-                        "county_name": n_copy.county_name,
-                        "governor_name": n_copy.governor_name,
-                    }
-                except Exception as e:
-                    logger.warning(
-                        "Precompute failed for neighbor %s (%s): %s",
-                        n_copy.county_name, nid, e)
-                    return nid, None
-                finally:
-                    thread_conn.close()
-
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = {
-                    executor.submit(_compute_one, nid, n_copy): nid
-                    for nid, n_copy in neighbor_copies
+    @classmethod
+    def start_precompute(cls, game_id, season):
+        """认领 (game, season) 预计算，返回需逐县计算的邻县 id；已在算或已算完返回 []"""
+        neighbor_ids = list(
+            NeighborCounty.objects.filter(game_id=game_id).order_by('id').values_list('id', flat=True)
+        )
+        key = PrecomputeStore.task_key(cls.PRECOMPUTE_KIND, game_id, season)
+        if not PrecomputeStore.claim(game_id, season, key, len(neighbor_ids)):
+            logger.info("Precompute already claimed for game %s season %s, skipping",
+                        game_id, season)
+            return []
+        logger.info("Starting precompute for game %s season %s (%d neighbors)",
+                    game_id, season, len(neighbor_ids))
+        return neighbor_ids
+
+    @classmethod
+    def precompute_single(cls, game_id, season, neighbor_id):
+        """预计算单个邻县的AI决策并写入结果表（Celery 子任务入口）"""
+        key = PrecomputeStore.task_key(cls.PRECOMPUTE_KIND, game_id, season)
+        entry = None
+        if not PrecomputeStore.is_claimed(game_id, key):
+            # 推进已消费（或玩家操作已作废）本轮预计算，不再为其调用 LLM
+            return
+        neighbor = NeighborCounty.objects.filter(id=neighbor_id, game_id=game_id).first()
+        if neighbor is not None:
+            try:
+                digest = PrecomputeStore.input_digest(neighbor.county_data)
+                # 新读出的实例即为私有副本，make_decisions 只改内存不落库
+                events = AIGovernorService.make_decisions(neighbor, season)
+                entry = {
+                    "events": events,
+                    "input_digest": digest,
+                    "county_data": neighbor.county_data,
+                    "last_reasoning": neighbor.last_reasoning,
+                    "county_name": neighbor.county_name,
+                    "governor_name": neighbor.governor_name,
                 }
-                for future in as_completed(futures):
-                    nid, result = future.result()
-                    if result is not None:
-                        results[str(nid)] = result
-                    # 每完成一个就更新DB（供前端轮询状态）
-                    # 用 queryset update 避免游戏被删除后 CASCADE 导致行消失时抛异常
-                    NeighborPrecompute.objects.filter(pk=precompute.pk).update(results=results)
-                    logger.info("Precomputed neighbor %s for game %s season %s [%d/%d]",
-                                nid, game_id, season,
-                                len(results), len(neighbor_copies))
-
-            # 标记完成
-            NeighborPrecompute.objects.filter(pk=precompute.pk).update(status='done')
-            logger.info("Precompute done for game %s season %s: %d/%d succeeded",
-                        game_id, season, len(results), len(neighbor_copies))
+            except Exception as e:
+                logger.warning("Precompute failed for neighbor %s (%s): %s",
+                               neighbor.county_name, neighbor_id, e)
+
+        row = PrecomputeStore.record(game_id, key, neighbor_id, entry)
+        if row is not None:
+            logger.info("Precomputed neighbor %s for game %s season %s [%d/%d]",
+                        neighbor_id, game_id, season,
+                        len(row.results) + len(row.failed), row.expected_count)
+
+    @classmethod
+    def precompute_decisions(cls, game_id, season):
+        """在当前进程内同步完成整轮预计算（测试及无 worker 时使用）。
 
+        线上路径由 game.tasks.precompute_neighbor_decisions 按县拆分为子任务。
+        """
+        key = PrecomputeStore.task_key(cls.PRECOMPUTE_KIND, game_id, season)
+        try:
+            for neighbor_id in cls.start_precompute(game_id, season):
+                cls.precompute_single(game_id, season, neighbor_id)
         except Exception:
             logger.warning("Neighbor precompute failed", exc_info=True)
             # 标记完成以免 advance 永远等
-            NeighborPrecompute.objects.filter(game_id=game_id).update(status='done')
-        finally:
-            connection.close()
+            PrecomputeStore.abandon(game_id, key)
 
     # ==================== 状态查询（供前端轮询） ====================
 
     @classmethod
     def get_precompute_status(cls, game_id, season):
-        """获取预计算进度，返回 {status, completed, completed_count}"""
-        precompute = NeighborPrecompute.objects.filter(game_id=game_id).first()
-
-        if not precompute or precompute.season != season:
-            return {"status": "idle", "completed": [], "completed_count": 0}
-
-        completed = []
-        for nid, entry in precompute.results.items():
-            completed.append({
-                "neighbor_id": int(nid),
-                "county_name": entry.get("county_name", ""),
-                "governor_name": entry.get("governor_name", ""),
-            })
-
-        return {
-            "status": precompute.status if precompute.status in ('computing', 'done') else 'idle',
-            "completed": completed,
-            "completed_count": len(completed),
-        }
+        """获取预计算进度，返回 {status, completed, completed_count, ...}（不读取 results）"""
+        return PrecomputeStore.status(game_id, season, 'neighbor_id')
@@ -12,7 +12,7 @@ import copy
 import logging
 from typing import Optional
 
-from ..models import GameState, NeighborCounty
+from ..models import GameState, NeighborCounty, TermMonthMetric
 from .career_track import CareerTrackService
 from .constants import (
     ADMIN_COST_DETAIL,
@@ -115,6 +115,8 @@ class NewTermService:
 
         county["career_track"] = track
         save_player_state(game, county)
+        # 任期月度指标按任期统计，新任期从空表重新累积
+        TermMonthMetric.objects.filter(game=game).delete()
         game.current_season = 1
         game.save(update_fields=["current_season", "updated_at"])
 
@@ -0,0 +1,60 @@
+"""邻县对比摘要 — 结算中跨县逻辑只读的精简快照
+
+竞争性迁徙只比较四项指标与在册人口，连锁民变只看对方上月是否爆发民变。
+每月为每县计算一次 PeerSummary（不可变、不含村庄明细），
+所有县共享同一批摘要，取代逐县深拷贝整份 county_data。
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from .constants import MIGRATION_COMPETITION_DIMS
+
+
+def _registered_population(county):
+    return sum(
+        v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
+        for v in county.get("villages") or []
+    )
+
+
+@dataclass(frozen=True)
+class PeerSummary:
+    name: str
+    morale: float
+    security: float
+    commercial: float
+    education: float
+    registered_population: int
+    riot_start_season: Optional[int] = None  # 民变进行中时的爆发月份
+
+    @classmethod
+    def from_county(cls, county, name=None):
+        riot = ((county.get("emergency") or {}).get("riot")) or {}
+        riot_start = None
+        if riot.get("active"):
+            riot_start = int(riot.get("start_season") or -999)
+        return cls(
+            name=str(
+                name or county.get("_peer_name") or county.get("county_name")
+                or county.get("county_type_name") or ""
+            ),
+            registered_population=_registered_population(county),
+            riot_start_season=riot_start,
+            **{dim: float(county.get(dim, 50)) for dim in MIGRATION_COMPETITION_DIMS},
+        )
+
+    @classmethod
+    def coerce(cls, peer):
+        """兼容旧调用方传入的 county_data 字典；无法识别时返回 None"""
+        if isinstance(peer, cls):
+            return peer
+        if isinstance(peer, dict):
+            return cls.from_county(peer)
+        return None
+
+    def metrics(self):
+        return {dim: getattr(self, dim) for dim in MIGRATION_COMPETITION_DIMS}
+
+    def riot_started_in(self, season):
+        return self.riot_start_season is not None and self.riot_start_season == int(season)
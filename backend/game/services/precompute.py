@@ -0,0 +1,274 @@
+"""AI 决策预计算结果存储 — 邻县/下辖州县共用 NeighborPrecompute 表
+
+推进完成后服务端即投机性地为下个月排队预计算（见各服务的 schedule_precompute），
+推进时优先消费。每条结果记录推演所用输入状态的摘要，消费时与当前状态比对，
+玩家操作改动过的县视为未命中、只对这些县同步重算，陈旧结果不会覆盖新状态。
+"""
+
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import NeighborPrecompute
+from . import precompute_events
+
+logger = logging.getLogger('game')
+
+# computing 状态超过该时长视为 worker 已丢失，允许重新认领
+PRECOMPUTE_STALE_AFTER = timedelta(minutes=5)
+
+# 进度查询 / 推送中各类预计算的县 id 字段名
+ID_FIELDS = {'neighbor': 'neighbor_id', 'prefecture': 'unit_id'}
+
+# AI 施政既不读也不改、但玩家侧流程会改写的键：不计入输入摘要，应用缓存时保留现值
+PRECOMPUTE_VOLATILE_KEYS = ('annual_reviews',)
+
+
+class PrecomputeStore:
+    """以 (game, season) 幂等键认领预计算任务，并逐县汇总结果。"""
+
+    @staticmethod
+    def task_key(kind, game_id, season):
+        return f"{kind}:{game_id}:{season}"
+
+    @staticmethod
+    def input_digest(state):
+        """推演输入状态的摘要（忽略 PRECOMPUTE_VOLATILE_KEYS）"""
+        trimmed = {k: v for k, v in (state or {}).items() if k not in PRECOMPUTE_VOLATILE_KEYS}
+        raw = json.dumps(trimmed, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def fresh_entries(cls, results, states):
+        """筛出输入摘要与当前状态一致的结果，返回 {str(id): entry}
+
+        ``states`` 为 {id: 当前状态 dict}；没有摘要的旧结果视为有效。
+        """
+        fresh = {}
+        for unit_id, state in states.items():
+            entry = results.get(str(unit_id))
+            if not entry:
+                continue
+            digest = entry.get('input_digest')
+            if digest is None or digest == cls.input_digest(state):
+                fresh[str(unit_id)] = entry
+            else:
+                logger.info("Precompute entry for %s is stale, recomputing", unit_id)
+        return fresh
+
+    @staticmethod
+    def carry_volatile(cached_state, live_state):
+        """把缓存推演结果中的易变键替换为当前值"""
+        for key in PRECOMPUTE_VOLATILE_KEYS:
+            if key in live_state:
+                cached_state[key] = live_state[key]
+            else:
+                cached_state.pop(key, None)
+        return cached_state
+
+    @staticmethod
+    def dispatch(task, game_id, season):
+        """立即派发预计算编排任务；broker 不可用时记录告警并返回 False"""
+        try:
+            task.delay(game_id, season)
+        except Exception:
+            # broker 不可用时推进回退到同步计算，不影响本次请求
+            logger.warning("Failed to enqueue precompute for game %s season %s",
+                           game_id, season, exc_info=True)
+            return False
+        return True
+
+    @classmethod
+    def schedule(cls, task, game_id, season):
+        """当前事务提交后派发预计算编排任务（PRECOMPUTE_SPECULATIVE=False 时不派发）"""
+        if not getattr(settings, 'PRECOMPUTE_SPECULATIVE', True):
+            return
+        transaction.on_commit(lambda: cls.dispatch(task, game_id, season))
+
+    @classmethod
+    def ready(cls, game_id, season, kind, wait=None):
+        """返回 (game, season) 的预计算结果 {str(id): entry}；仍在计算时最多等待 ``wait`` 秒
+
+        投机预计算通常在玩家操作期间已算完；推进时若恰好仍在算，短暂等待
+        比整轮同步重算更快。等待期间只查询 status / updated_at，并由进度频道的
+        事件提前唤醒；results 只在结束等待后读取一次。超时或任务失联时返回已
+        到齐的部分结果，调用方只重算缺失的县。没有预计算返回 {}。
+        """
+        if wait is None:
+            wait = getattr(settings, 'PRECOMPUTE_ADVANCE_WAIT_SECONDS', 10)
+        rows = NeighborPrecompute.objects.filter(
+            game_id=game_id, season=season, task_key__startswith=f"{kind}:",
+        )
+        deadline = time.monotonic() + max(0.0, float(wait))
+        subscription = None
+        try:
+            while True:
+                row = rows.values('status', 'updated_at').first()
+                if row is None:
+                    return {}
+                if row['status'] == 'done':
+                    break
+                if timezone.now() - row['updated_at'] >= PRECOMPUTE_STALE_AFTER:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.info("Precompute %s for game %s season %s still running, using partial results",
+                                kind, game_id, season)
+                    break
+                if subscription is None:
+                    # 首次等待前订阅；订阅后立即复查一次状态，不会错过其间完成的事件
+                    subscription = precompute_events.subscribe(game_id) or False
+                    continue
+                if subscription:
+                    subscription.get(timeout=min(remaining, 0.5))
+                else:
+                    time.sleep(min(remaining, 0.5))
+        finally:
+            if subscription:
+                subscription.close()
+        return rows.values_list('results', flat=True).first() or {}
+
+    @staticmethod
+    def is_claimed(game_id, key):
+        """任务仍在（未被推进消费或作废）；子任务据此跳过已无人消费的 LLM 调用"""
+        return NeighborPrecompute.objects.filter(game_id=game_id, task_key=key).exists()
+
+    @classmethod
+    def claim(cls, game_id, season, key, expected):
+        """认领预计算槽位。已有同键任务在算或已算完时返回 False。"""
+        try:
+            with transaction.atomic():
+                row = NeighborPrecompute.objects.select_for_update().filter(game_id=game_id).first()
+                if row is not None and row.task_key == key:
+                    if row.status == 'done':
+                        return False
+                    if timezone.now() - row.updated_at < PRECOMPUTE_STALE_AFTER:
+                        return False
+                    logger.warning("Reclaiming stale precompute %s", key)
+
+                if row is None:
+                    row = NeighborPrecompute(game_id=game_id)
+                row.season = season
+                row.task_key = key
+                row.expected_count = expected
+                row.results = {}
+                row.failed = []
+                row.completed = []
+                row.status = 'done' if expected == 0 else 'computing'
+                row.save()
+        except IntegrityError:
+            # 并发 worker 抢先创建了该行
+            return False
+        counts = {'season': season, 'completed_count': 0, 'failed_count': 0, 'expected_count': expected}
+        precompute_events.publish(game_id, 'started' if expected > 0 else 'done', counts)
+        return expected > 0
+
+    @classmethod
+    def record(cls, game_id, key, unit_id, entry, drop_if_empty=False):
+        """写入单个县的结算结果（entry=None 表示失败），全部到齐后标记 done。
+
+        返回更新后的行；任务已被消费或被新任务替换时返回 None。
+        """
+        with transaction.atomic():
+            row = (
+                NeighborPrecompute.objects.select_for_update()
+                .filter(game_id=game_id, task_key=key)
+                .first()
+            )
+            if row is None:
+                return None
+
+            summary = {'id': unit_id, 'county_name': '', 'governor_name': ''}
+            if entry is None:
+                if unit_id not in row.failed:
+                    row.failed.append(unit_id)
+            else:
+                row.results[str(unit_id)] = entry
+                summary.update(county_name=entry.get('county_name', ''),
+                               governor_name=entry.get('governor_name', ''))
+                if all(item.get('id') != unit_id for item in row.completed):
+                    row.completed.append(summary)
+
+            dropped = False
+            if len(row.results) + len(row.failed) >= row.expected_count:
+                if drop_if_empty and not row.results:
+                    row.delete()
+                    logger.warning("Precompute %s produced no usable results", key)
+                    dropped = True
+                else:
+                    row.status = 'done'
+            if not dropped:
+                row.save(update_fields=['results', 'failed', 'completed', 'status', 'updated_at'])
+
+        counts = {
+            'season': row.season,
+            'completed_count': len(row.completed),
+            'failed_count': len(row.failed),
+            'expected_count': row.expected_count,
+        }
+        id_field = ID_FIELDS.get(key.split(':', 1)[0], 'id')
+        precompute_events.publish(game_id, 'progress', {
+            **counts, **summary, id_field: unit_id, 'ok': entry is not None,
+        })
+        if dropped:
+            precompute_events.publish(game_id, 'reset', {'season': row.season})
+            return None
+        if row.status == 'done':
+            precompute_events.publish(game_id, 'done', counts)
+        return row
+
+    @classmethod
+    def abandon(cls, game_id, key, drop=False):
+        """编排失败时收尾：drop=True 删除缓存，否则标记 done 以免推进一直等待。"""
+        qs = NeighborPrecompute.objects.filter(game_id=game_id, task_key=key)
+        season = int(key.rsplit(':', 1)[-1])
+        if drop:
+            qs.delete()
+            precompute_events.publish(game_id, 'reset', {'season': season})
+        else:
+            qs.update(status='done')
+            precompute_events.publish(game_id, 'done', {'season': season})
+
+    @classmethod
+    def discard(cls, game_id, kind=None):
+        """删除本局预计算缓存（玩家操作改变了输入），并通知进度订阅方"""
+        qs = NeighborPrecompute.objects.filter(game_id=game_id)
+        if kind:
+            qs = qs.filter(task_key__startswith=f"{kind}:")
+        seasons = list(qs.values_list('season', flat=True))
+        qs.delete()
+        for season in seasons:
+            precompute_events.publish(game_id, 'reset', {'season': season})
+
+    @classmethod
+    def status(cls, game_id, season, id_field):
+        """进度投影：只读计数与 completed 摘要列，从不反序列化 results"""
+        row = (
+            NeighborPrecompute.objects.filter(game_id=game_id)
+            .values('season', 'status', 'expected_count', 'failed', 'completed')
+            .first()
+        )
+        if not row or row['season'] != season:
+            return {"status": "idle", "completed": [], "completed_count": 0}
+
+        completed = [
+            {
+                id_field: int(item['id']),
+                "county_name": item.get('county_name', ''),
+                "governor_name": item.get('governor_name', ''),
+            }
+            for item in row['completed'] or []
+        ]
+        return {
+            "status": row['status'] if row['status'] in ('computing', 'done') else 'idle',
+            "completed": completed,
+            "completed_count": len(completed),
+            "failed_count": len(row['failed'] or []),
+            "expected_count": row['expected_count'],
+        }
@@ -0,0 +1,178 @@
+"""预计算进度推送 — 取代前端轮询 NeighborPrecompute
+
+PrecomputeStore 每认领、每完成一县、整轮完成或缓存作废时向 ``precompute:<game_id>``
+频道发布一条事件；SSE 视图订阅该频道转发给浏览器。生产环境 Celery worker 与
+Web 进程分离，走 Redis pub/sub；本地 / 测试（Celery eager，同进程）用内存 broker。
+
+事件：started {season, expected_count}、progress {season, id, county_name, governor_name,
+ok, completed_count, failed_count, expected_count}、done {season, ...计数}、reset {season}。
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from llm.streaming import format_sse
+
+logger = logging.getLogger('game')
+
+
+def channel_for(game_id):
+    return f"precompute:{game_id}"
+
+
+class _MemorySubscription:
+    def __init__(self, broker, channel):
+        self._broker = broker
+        self._channel = channel
+        self._queue = queue.Queue()
+
+    def put(self, message):
+        self._queue.put(message)
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker._unsubscribe(self._channel, self)
+
+
+class MemoryBroker:
+    """进程内 broker：发布者与订阅者须在同一进程（runserver + Celery eager）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscribe(self, channel):
+        subscription = _MemorySubscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def get(self, timeout):
+        message = self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+    def close(self):
+        self._pubsub.close()
+
+
+class RedisBroker:
+    """Redis pub/sub broker：worker 发布、Web 进程订阅"""
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, json.dumps(message, ensure_ascii=False))
+
+    def subscribe(self, channel):
+        pubsub = self._client.pubsub()
+        pubsub.subscribe(channel)
+        return _RedisSubscription(pubsub)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """按 PRECOMPUTE_EVENTS_BROKER（'redis' / 'memory'）创建进程级单例"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if getattr(settings, 'PRECOMPUTE_EVENTS_BROKER', 'memory') == 'redis':
+                    _broker = RedisBroker(getattr(settings, 'PRECOMPUTE_EVENTS_REDIS_URL', 'redis://localhost:6379/0'))
+                else:
+                    _broker = MemoryBroker()
+    return _broker
+
+
+def reset_broker():
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def publish(game_id, event, data):
+    """发布一条进度事件；推送失败只记日志，不影响预计算本身"""
+    try:
+        get_broker().publish(channel_for(game_id), {'event': event, 'data': data})
+    except Exception:
+        logger.warning("Failed to publish precompute event %s for game %s", event, game_id, exc_info=True)
+
+
+def subscribe(game_id):
+    """订阅本局进度频道；broker 不可用时返回 None（调用方退回定时轮询）"""
+    try:
+        return get_broker().subscribe(channel_for(game_id))
+    except Exception:
+        logger.warning("Failed to subscribe precompute events for game %s", game_id, exc_info=True)
+        return None
+
+
+def stream_progress(game_id, season, snapshot, timeout=None, heartbeat=15.0):
+    """SSE 帧生成器：先推送当前进度快照，再转发本月事件，整轮完成或超时后结束
+
+    先订阅再取快照，快照与订阅之间完成的县不会丢失（最多重复一次）。
+    快照为 done / idle（没有在算的预计算）或 broker 不可用时推送快照后立即结束，
+    不为无事可推的连接占用线程；客户端据此停止或改为单次查询。
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'PRECOMPUTE_STREAM_TIMEOUT_SECONDS', 120)
+    subscription = subscribe(game_id)
+    try:
+        state = snapshot()
+        yield format_sse('status', state)
+        if subscription is None or state.get('status') in ('done', 'idle'):
+            return
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = subscription.get(timeout=min(heartbeat, remaining))
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            data = message.get('data') or {}
+            if data.get('season') != season:
+                continue
+            yield format_sse(message['event'], data)
+            if message['event'] == 'done':
+                return
+    finally:
+        if subscription is not None:
+            subscription.close()
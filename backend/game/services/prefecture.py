@@ -7,7 +7,7 @@ import os
 import random
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
 
-from django.db import connection
+from django.db import connection, transaction
 
 from ..models import AdminUnit, Agent, GameState, NeighborPrecompute
 from .constants import (
@@ -23,13 +23,17 @@ from .constants import (
     month_name,
     CORVEE_PER_CAPITA,
     QUOTA_BASE_COLLECTION_EFFICIENCY,
+    MAX_MONTH,
 )
 from .county import CountyService
-from .settlement import SettlementService
 from .ai_governor import AIGovernorService
+from .ai_negotiation import AIGovernorNegotiationService
 from .emergency import EmergencyService
 from .magistrate_service import MagistrateService
 from .annual_review import AnnualReviewService
+from .precompute import PrecomputeStore
+from .prefecture_settlement import settle_subordinates
+from .unit_projection import project_units
 
 logger = logging.getLogger('game')
 
@@ -55,6 +59,11 @@ def _load_judicial_pool():
 JUDICIAL_CASE_POOL = _load_judicial_pool()
 JUDICIAL_CASES_LIST = list(JUDICIAL_CASE_POOL.values())
 
+# 府情总览只读取的下辖县 unit_data 顶层键（另投影 subordinate_reports 末条）
+OVERVIEW_UNIT_KEYS = ('governor_profile',)
+# 府情总览直接读取的冗余列
+OVERVIEW_UNIT_COLUMNS = ('name', 'governor_archetype', 'has_disaster')
+
 # ===== 汇报月份 =====
 REPORT_MONTHS = {2, 5, 8, 11}
 
@@ -471,18 +480,21 @@ class PrefectureService:
             AdminUnit.objects.filter(game=game, unit_type='COUNTY', parent=prefecture_unit)
         )
 
-        # ── AI 决策：优先使用后台预推演缓存 ──
-        precompute = NeighborPrecompute.objects.filter(
-            game=game, season=season, status='done',
-        ).first()
-        if precompute:
+        # ── AI 决策：优先使用后台预推演缓存，输入已变的县单独重算 ──
+        precomputed = PrecomputeStore.ready(game.id, season, cls.PRECOMPUTE_KIND)
+        cached = PrecomputeStore.fresh_entries(
+            precomputed,
+            {unit.id: unit.unit_data for unit in subordinates},
+        )
+        if cached:
             logger.info("Using prefecture precomputed results for game %s season %s (%d counties)",
-                        game.id, season, len(precompute.results))
-            decision_results = cls._apply_cached_ai_results(subordinates, precompute.results)
-        else:
-            logger.info("No prefecture precompute ready for game %s season %s, computing in parallel",
-                        game.id, season)
-            decision_results = cls._compute_ai_decisions(subordinates, season)
+                        game.id, season, len(cached))
+        decision_results = cls._apply_cached_ai_results(subordinates, cached)
+        misses = [unit for unit in subordinates if str(unit.id) not in cached]
+        if misses:
+            logger.info("No prefecture precompute ready for game %s season %s (%d counties), computing in parallel",
+                        game.id, season, len(misses))
+            decision_results.update(cls._compute_ai_decisions(misses, season))
 
         # 清除已消费的预计算记录
         NeighborPrecompute.objects.filter(game=game).delete()
@@ -494,16 +506,12 @@ class PrefectureService:
             "granary":     bool(pdata.get("granary", False)),
         }
 
-        # ── 物理结算 ──
-        remit_total = 0.0
-        for unit in subordinates:
-            EmergencyService.ensure_state(unit.unit_data)
-            adapter = _SubordinateAdapter(unit)
-
-            # 结算前快照 fiscal_year，用于计算本月上缴增量
-            fy_before = dict(unit.unit_data.get('fiscal_year', {}))
+        # ── 交涉 LLM 调用在结算前并发完成，settle_county 只做纯计算 ──
+        AIGovernorNegotiationService.plan_negotiations_many(
+            [unit.unit_data for unit in subordinates], season,
+        )
 
-            report = {"season": season, "events": []}
+        for unit in subordinates:
             events = decision_results.get(unit.id, [])
 
             # 存储 AI 决策摘要供汇报月使用
@@ -515,38 +523,16 @@ class PrefectureService:
             # 清理已消费的指令
             unit.unit_data.pop('pending_directives', None)
 
-            # AI 决策已修改 unit.unit_data（通过 adapter），直接进行物理结算
-            SettlementService.settle_county(unit.unit_data, season, report, game=None,
-                                            prefecture_ctx=prefecture_ctx)
-
-            # ── 计算本月实际上缴增量（从 fiscal_year 差值推导）──
-            fy_after = unit.unit_data.get('fiscal_year', {})
-            if moy == 1:
-                # 正月重置后 fy_after 只含本月新增
-                commercial_remit = (
-                    fy_after.get('commercial_tax', 0) - fy_after.get('commercial_retained', 0)
-                )
-                corvee_remit = (
-                    fy_after.get('corvee_tax', 0) - fy_after.get('corvee_retained', 0)
-                )
-                agri_remit = 0.0
-            else:
-                commercial_remit = (
-                    (fy_after.get('commercial_tax', 0) - fy_before.get('commercial_tax', 0)) -
-                    (fy_after.get('commercial_retained', 0) - fy_before.get('commercial_retained', 0))
-                )
-                corvee_remit = (
-                    (fy_after.get('corvee_tax', 0) - fy_before.get('corvee_tax', 0)) -
-                    (fy_after.get('corvee_retained', 0) - fy_before.get('corvee_retained', 0))
-                )
-                agri_remit = fy_after.get('agri_remitted', 0) - fy_before.get('agri_remitted', 0)
-
-            remit = max(0.0, commercial_remit + corvee_remit + agri_remit)
-            unit.unit_data['last_remit'] = round(remit, 1)
+        # ── 物理结算（各县互不依赖，分发到进程池并行）──
+        # AI 决策已修改 unit.unit_data（通过 adapter），直接进行物理结算
+        settled = settle_subordinates(
+            [(unit.id, unit.unit_data) for unit in subordinates], season, prefecture_ctx,
+        )
+        remit_total = 0.0
+        for unit in subordinates:
+            unit.unit_data, remit = settled[unit.id]
             remit_total += remit
 
-            unit.save(update_fields=['unit_data'])
-
         # ── 府库更新 ──
         pdata['treasury'] = round(pdata.get('treasury', 0) + remit_total, 1)
         # 累计年度已收（正月重置）
@@ -576,29 +562,36 @@ class PrefectureService:
         if moy in REPORT_MONTHS:
             cls._generate_reports(subordinates, season, pdata)
 
-        # ── 重置核查次数（正月重置）──
-        if moy == 1:
-            pdata['inspection_used'] = {"tongpan": 0, "tuiguan": 0}
+        # ── 落库：下辖县、府数据、人事与月份推进在同一事务中写入 ──
+        with transaction.atomic():
+            AdminUnit.objects.bulk_update(
+                subordinates, AdminUnit.prepare_bulk_update(subordinates, ['unit_data']),
+            )
 
-        # ── 季度末：生成司法案件 ──
-        pending_cases = []
-        if moy in {3, 6, 9, 12}:
-            pending_cases = cls._generate_judicial_cases(pdata, subordinates, moy, season)
+            # ── 重置核查次数（正月重置）──
+            if moy == 1:
+                pdata['inspection_used'] = {"tongpan": 0, "tuiguan": 0}
 
-        next_season = season + 1
-        transition = AnnualReviewService.handle_prefecture_transition(
-            game=game,
-            processed_season=season,
-            next_season=next_season,
-        )
-        if transition.get("personnel_result"):
-            pdata["personnel_last_result"] = transition["personnel_result"]
+            # ── 季度末：生成司法案件 ──
+            pending_cases = []
+            if moy in {3, 6, 9, 12}:
+                pending_cases = cls._generate_judicial_cases(pdata, subordinates, moy, season)
 
-        prefecture_unit.unit_data = pdata
-        prefecture_unit.save(update_fields=['unit_data'])
+            next_season = season + 1
+            transition = AnnualReviewService.handle_prefecture_transition(
+                game=game,
+                processed_season=season,
+                next_season=next_season,
+            )
+            if transition.get("personnel_result"):
+                pdata["personnel_last_result"] = transition["personnel_result"]
+
+            prefecture_unit.unit_data = pdata
+            prefecture_unit.save(update_fields=['unit_data'])
 
-        game.current_season = next_season
-        game.save(update_fields=['current_season'])
+            game.current_season = next_season
+            game.save(update_fields=['current_season'])
+        cls.schedule_precompute(game)
 
         result = {
             "season": season,  # the month just processed
@@ -624,7 +617,9 @@ class PrefectureService:
         for unit in subordinates:
             entry = cached.get(str(unit.id))
             if entry:
-                unit.unit_data = copy.deepcopy(entry.get("unit_data") or unit.unit_data)
+                unit.unit_data = PrecomputeStore.carry_volatile(
+                    copy.deepcopy(entry.get("unit_data") or unit.unit_data), unit.unit_data,
+                )
                 decision_results[unit.id] = entry.get("events", [])
             else:
                 decision_results[unit.id] = []
@@ -632,167 +627,103 @@ class PrefectureService:
 
     @classmethod
     def _compute_ai_decisions(cls, subordinates, season):
-        """并行 AI 决策，返回 {unit.id: [event_str, ...]}"""
-        results = {}
+        """并发 AI 决策，返回 {unit.id: [event_str, ...]}"""
+        adapters = {u.id: _SubordinateAdapter(u) for u in subordinates}
+        # 单县请求超时后由规则引擎兜底，确保结算继续进行
+        by_adapter = AIGovernorService.make_decisions_many(adapters.values(), season, timeout=20)
+        return {uid: by_adapter.get(adapter.id, []) for uid, adapter in adapters.items()}
+
+    @classmethod
+    def invalidate_precompute(cls, game, reschedule: bool = True) -> None:
+        """清理当前月份的府级AI预推演缓存，并按新输入重新排队预推演。"""
+        PrecomputeStore.discard(game.id)
+        if reschedule:
+            cls.schedule_precompute(game)
 
-        def _decide(unit):
-            from django.db import connection as _conn
+    @classmethod
+    def schedule_precompute(cls, game) -> None:
+        """投机预推演：为玩家即将推进的当前月排队（事务提交后派发）。"""
+        if game.current_season > MAX_MONTH or not game.player_unit_id:
+            return
+        from ..tasks import precompute_prefecture_decisions
+        PrecomputeStore.schedule(precompute_prefecture_decisions, game.id, game.current_season)
+
+    PRECOMPUTE_KIND = 'prefecture'
+
+    @classmethod
+    def start_precompute(cls, game_id: int, season: int) -> list:
+        """认领 (game, season) 府级预推演，返回需逐县推演的下辖县 id；无需推演返回 []"""
+        game = GameState.objects.filter(id=game_id).first()
+        unit_ids = []
+        if game and game.player_role == 'PREFECT' and game.player_unit_id:
+            unit_ids = list(
+                AdminUnit.objects.filter(
+                    game_id=game_id, unit_type='COUNTY', parent_id=game.player_unit_id,
+                ).order_by('id').values_list('id', flat=True)
+            )
+
+        key = PrecomputeStore.task_key(cls.PRECOMPUTE_KIND, game_id, season)
+        if not PrecomputeStore.claim(game_id, season, key, len(unit_ids)):
+            logger.info("Prefecture precompute already claimed for game %s season %s, skipping",
+                        game_id, season)
+            return []
+        logger.info("Starting prefecture precompute for game %s season %s (%d counties)",
+                    game_id, season, len(unit_ids))
+        return unit_ids
+
+    @classmethod
+    def precompute_single(cls, game_id: int, season: int, unit_id: int) -> None:
+        """预推演单个下辖县的 AI 施政决策并写入结果表（Celery 子任务入口）"""
+        key = PrecomputeStore.task_key(cls.PRECOMPUTE_KIND, game_id, season)
+        entry = None
+        if not PrecomputeStore.is_claimed(game_id, key):
+            # 推进已消费（或玩家操作已作废）本轮预计算，不再为其调用 LLM
+            return
+        unit = AdminUnit.objects.filter(id=unit_id, game_id=game_id).first()
+        if unit is not None:
             try:
+                digest = PrecomputeStore.input_digest(unit.unit_data)
+                # 新读出的实例即为私有副本，make_decisions 只改内存不落库
                 adapter = _SubordinateAdapter(unit)
                 events = AIGovernorService.make_decisions(adapter, season)
-                return unit.id, events
+                entry = {
+                    "events": events,
+                    "input_digest": digest,
+                    "unit_data": unit.unit_data,
+                    "last_reasoning": unit.unit_data.get('_last_reasoning', ''),
+                    "county_name": unit.unit_data.get('county_name', ''),
+                    "governor_name": unit.unit_data.get('governor_profile', {}).get('name', ''),
+                }
             except Exception as e:
-                logger.warning("AI decision failed for subordinate unit %s: %s", unit.id, e)
-                return unit.id, []
-            finally:
-                _conn.close()
-
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {executor.submit(_decide, u): u for u in subordinates}
-            try:
-                for future in as_completed(futures, timeout=20):
-                    uid, events = future.result()
-                    results[uid] = events
-            except FuturesTimeoutError:
-                # 超时：用空决策填充未完成的县，确保结算继续进行
-                missing = [u.id for u in futures.values() if u.id not in results]
                 logger.warning(
-                    "AI decisions timed out for season %s; %d unit(s) defaulting to no action: %s",
-                    season, len(missing), missing,
+                    "Prefecture precompute failed for county %s (%s): %s",
+                    unit.unit_data.get('county_name', ''), unit_id, e,
                 )
-                for uid in missing:
-                    results[uid] = []
-
-        return results
 
-    @classmethod
-    def invalidate_precompute(cls, game) -> None:
-        """清理当前月份的府级AI预推演缓存。"""
-        NeighborPrecompute.objects.filter(game=game).delete()
+        # 全部失败时删除缓存，保证正式推进回退到同步计算，而不是消费空结果
+        row = PrecomputeStore.record(game_id, key, unit_id, entry, drop_if_empty=True)
+        if row is not None and row.status == 'done':
+            logger.info("Prefecture precompute done for game %s season %s: %d/%d succeeded",
+                        game_id, season, len(row.results), row.expected_count)
 
     @classmethod
     def precompute_ai_decisions(cls, game_id: int, season: int) -> None:
-        """后台预推演下辖州县 AI 施政决策。"""
-        from django.db import connection as outer_conn
+        """在当前进程内同步完成府级预推演（测试及无 worker 时使用）。
 
+        线上路径由 game.tasks.precompute_prefecture_decisions 按县拆分为子任务。
+        """
+        key = PrecomputeStore.task_key(cls.PRECOMPUTE_KIND, game_id, season)
         try:
-            precompute, created = NeighborPrecompute.objects.get_or_create(
-                game_id=game_id,
-                defaults={'season': season, 'status': 'computing', 'results': {}},
-            )
-            if not created and precompute.status == 'computing' and precompute.season == season:
-                logger.info("Prefecture precompute already running for game %s season %s, skipping",
-                            game_id, season)
-                return
-            if not created and precompute.status == 'done' and precompute.season == season:
-                logger.info("Prefecture precompute already done for game %s season %s, skipping",
-                            game_id, season)
-                return
-
-            if not created:
-                precompute.season = season
-                precompute.status = 'computing'
-                precompute.results = {}
-                precompute.save(update_fields=['season', 'status', 'results', 'updated_at'])
-
-            game = GameState.objects.select_related('player_unit').get(id=game_id)
-            if game.player_role != 'PREFECT' or not game.player_unit_id:
-                precompute.status = 'done'
-                precompute.save(update_fields=['status', 'updated_at'])
-                return
-
-            subordinates = list(
-                AdminUnit.objects.filter(
-                    game=game, unit_type='COUNTY', parent=game.player_unit,
-                )
-            )
-            if not subordinates:
-                precompute.status = 'done'
-                precompute.save(update_fields=['status', 'updated_at'])
-                return
-
-            subordinate_copies = []
-            for unit in subordinates:
-                unit_copy = copy.copy(unit)
-                unit_copy.unit_data = copy.deepcopy(unit.unit_data)
-                subordinate_copies.append((unit.id, unit_copy))
-
-            logger.info("Starting prefecture precompute for game %s season %s (%d counties)",
-                        game_id, season, len(subordinate_copies))
-
-            results = {}
-
-            def _compute_one(unit_id, unit_copy):
-                from django.db import connection as thread_conn
-                try:
-                    adapter = _SubordinateAdapter(unit_copy)
-                    events = AIGovernorService.make_decisions(adapter, season)
-                    return unit_id, {
-                        "events": events,
-                        "unit_data": unit_copy.unit_data,
-                        "last_reasoning": unit_copy.unit_data.get('_last_reasoning', ''),
-                        "county_name": unit_copy.unit_data.get('county_name', ''),
-                        "governor_name": unit_copy.unit_data.get('governor_profile', {}).get('name', ''),
-                    }
-                except Exception as e:
-                    logger.warning(
-                        "Prefecture precompute failed for county %s (%s): %s",
-                        unit_copy.unit_data.get('county_name', ''), unit_id, e,
-                    )
-                    return unit_id, None
-                finally:
-                    thread_conn.close()
-
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = {
-                    executor.submit(_compute_one, unit_id, unit_copy): unit_id
-                    for unit_id, unit_copy in subordinate_copies
-                }
-                for future in as_completed(futures):
-                    unit_id, result = future.result()
-                    if result is not None:
-                        results[str(unit_id)] = result
-                    precompute.results = results
-                    precompute.save(update_fields=['results', 'updated_at'])
-
-            if not results:
-                NeighborPrecompute.objects.filter(game_id=game_id).delete()
-                logger.warning("Prefecture precompute produced no usable county results for game %s season %s",
-                               game_id, season)
-                return
-
-            precompute.status = 'done'
-            precompute.save(update_fields=['status', 'updated_at'])
-            logger.info("Prefecture precompute done for game %s season %s: %d/%d succeeded",
-                        game_id, season, len(results), len(subordinate_copies))
-
+            for unit_id in cls.start_precompute(game_id, season):
+                cls.precompute_single(game_id, season, unit_id)
         except Exception:
             logger.warning("Prefecture precompute failed", exc_info=True)
-            # 删除失败缓存，保证正式推进时会回退到同步计算，而不是消费空结果。
-            NeighborPrecompute.objects.filter(game_id=game_id).delete()
-        finally:
-            outer_conn.close()
+            PrecomputeStore.abandon(game_id, key, drop=True)
 
     @classmethod
     def get_precompute_status(cls, game_id: int, season: int) -> dict:
-        """查询府级AI预推演进度。"""
-        precompute = NeighborPrecompute.objects.filter(game_id=game_id).first()
-        if not precompute or precompute.season != season:
-            return {"status": "idle", "completed": [], "completed_count": 0}
-
-        completed = []
-        for unit_id, entry in precompute.results.items():
-            completed.append({
-                "unit_id": int(unit_id),
-                "county_name": entry.get("county_name", ""),
-                "governor_name": entry.get("governor_name", ""),
-            })
-
-        return {
-            "status": precompute.status if precompute.status in ('computing', 'done') else 'idle',
-            "completed": completed,
-            "completed_count": len(completed),
-        }
+        """查询府级AI预推演进度（只读进度摘要，不读取 results）。"""
+        return PrecomputeStore.status(game_id, season, 'unit_id')
 
     # ==================== 汇报生成 ====================
 
@@ -801,6 +732,7 @@ class PrefectureService:
         """
         汇报月为每个下辖县生成一份模糊汇报，存入 county unit_data['subordinate_reports']。
         失真程度由知县类型（CORRUPT 多报1–2档）决定。
+        只修改 unit.unit_data，由 advance_month 统一 bulk_update。
         """
         for unit in subordinates:
             cd = unit.unit_data
@@ -846,7 +778,6 @@ class PrefectureService:
             cd['subordinate_reports'] = reports[-8:]  # 保留最近8条
 
             unit.unit_data = cd
-            unit.save(update_fields=['unit_data'])
 
     @staticmethod
     def _calc_trend(cd, cur_indicators):
@@ -882,7 +813,7 @@ class PrefectureService:
         目标县固定为 unit_id，额外县由系统自动选取（交通基建加成）。
         返回 {"results": [...], "road_level": N, "bonus_counties": M}。
         """
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         used = pdata.get('inspection_used', {"tongpan": 0, "tuiguan": 0})
 
         if used.get(inspect_type, 0) >= 3:
@@ -955,7 +886,7 @@ class PrefectureService:
         if moy != 1:
             return {"error": "配额分配仅在正月执行"}
 
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         annual_quota = pdata.get('annual_quota', 0)
         total_assigned = sum(assignments.values())
 
@@ -976,11 +907,22 @@ class PrefectureService:
     @classmethod
     def get_prefecture_overview(cls, game) -> dict:
         """返回府情总览数据"""
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         personnel = AnnualReviewService.get_prefecture_personnel_payload(game)
-        subordinates = list(
-            AdminUnit.objects.filter(game=game, unit_type='COUNTY', parent=game.player_unit)
+        counties = AdminUnit.objects.filter(game=game, unit_type='COUNTY', parent=game.player_unit)
+        # 只投影看板用到的键，最近汇报只取末条；县名/施政类型/灾情读冗余列
+        subordinates = project_units(
+            counties,
+            keys=OVERVIEW_UNIT_KEYS,
+            last_keys=('subordinate_reports',),
+            columns=OVERVIEW_UNIT_COLUMNS,
+        )
+        # 灾情只在 has_disaster 的县上读取灾种
+        disasters = list(
+            counties.filter(has_disaster=True).order_by('id')
+            .values_list('id', 'name', 'unit_data__disaster_this_year__type')
         )
+        disaster_types = {unit_id: dtype for unit_id, _name, dtype in disasters}
 
         # 汇总最新汇报数据（取各县最后一次汇报的指标）
         county_summaries = []
@@ -989,17 +931,16 @@ class PrefectureService:
             reports = cd.get('subordinate_reports', [])
             latest = reports[-1] if reports else None
             gp = cd.get('governor_profile', {})
-            disaster = cd.get('disaster_this_year') or {}
             county_summaries.append({
                 "unit_id": unit.id,
-                "county_name": cd.get('county_name', ''),
+                "county_name": unit.columns['name'],
                 "governor_name": gp.get('name', ''),
                 "governor_style": gp.get('style', ''),
-                "governor_archetype": gp.get('archetype', 'MIDDLING'),
+                "governor_archetype": unit.columns['governor_archetype'] or 'MIDDLING',
                 "latest_report": latest,
                 "quota": pdata.get('quota_assignments', {}).get(str(unit.id), 0),
-                "has_disaster": bool(disaster),
-                "disaster_type": disaster.get('type'),
+                "has_disaster": unit.columns['has_disaster'],
+                "disaster_type": disaster_types.get(unit.id),
             })
 
         return {
@@ -1018,7 +959,7 @@ class PrefectureService:
             "year_end_review_pending": pdata.get('year_end_review_pending', False),
             "exam_pending": pdata.get('exam_pending', False),
             "pending_judicial_count": len(pdata.get('pending_judicial_cases', [])),
-            "todo_items": cls._build_overview_todos(pdata, subordinates),
+            "todo_items": cls._build_overview_todos(pdata, disasters),
             "counties": county_summaries,
             "personnel_available": personnel.get("available", False),
             "personnel_phase": personnel.get("phase"),
@@ -1026,8 +967,8 @@ class PrefectureService:
         }
 
     @classmethod
-    def _build_overview_todos(cls, pdata: dict, subordinates: list) -> list:
-        """汇总府情总览的待办事项提醒。"""
+    def _build_overview_todos(cls, pdata: dict, disasters: list) -> list:
+        """汇总府情总览的待办事项提醒。disasters 为有灾县的 [(id, 县名, 灾种)]。"""
         todo_items = []
 
         if pdata.get('year_end_review_pending'):
@@ -1051,18 +992,11 @@ class PrefectureService:
                 "target_tab": "pref-tab-judicial",
             })
 
-        disaster_counties = []
-        disaster_types = set()
-        for unit in subordinates:
-            disaster = unit.unit_data.get('disaster_this_year') or {}
-            if not disaster:
-                continue
-            county_name = unit.unit_data.get('county_name', '')
-            if county_name:
-                disaster_counties.append(county_name)
-            dtype = DISASTER_TYPE_LABELS.get(disaster.get('type'))
-            if dtype:
-                disaster_types.add(dtype)
+        disaster_counties = [name for _unit_id, name, _dtype in disasters if name]
+        disaster_types = {
+            DISASTER_TYPE_LABELS[dtype] for _unit_id, _name, dtype in disasters
+            if dtype in DISASTER_TYPE_LABELS
+        }
 
         if disaster_counties:
             disaster_summary = "、".join(disaster_counties[:3])
@@ -1103,7 +1037,7 @@ class PrefectureService:
                 "bio": gp.get('bio', ''),
             },
             "reports": cd.get('subordinate_reports', []),
-            "quota": game.player_unit.unit_data.get('quota_assignments', {}).get(str(unit_id), 0),
+            "quota": game.get_unit_data().get('quota_assignments', {}).get(str(unit_id), 0),
             "infrastructure": {
                 "irrigation_level":    cd.get('irrigation_level', 0),
                 "medical_level":       cd.get('medical_level', 0),
@@ -1172,7 +1106,7 @@ class PrefectureService:
         if not spec:
             return {"error": f"未知投资项目: {project}"}
 
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         field = spec['field']
 
         current_level = 1 if (field == 'granary' and pdata.get('granary')) else pdata.get(field, 0)
@@ -1239,7 +1173,7 @@ class PrefectureService:
     @classmethod
     def get_invest_status(cls, game) -> dict:
         """返回府级基础建设当前状态与可投资项目列表"""
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         queue = pdata.get('construction_queue', [])
         treasury = pdata.get('treasury', 0)
         in_queue_projects = {item['project'] for item in queue}
@@ -1496,7 +1430,7 @@ class PrefectureService:
     @classmethod
     def get_judicial_cases(cls, game) -> dict:
         """返回待决卷宗列表（完整数据）和已决日志"""
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         pending_meta = pdata.get('pending_judicial_cases', [])
 
         # 从案件池查取完整卷宗数据
@@ -1547,16 +1481,9 @@ class PrefectureService:
         applied['prefect_affinity'] = None
         if magistrate_delta:
             source_county = case_data.get('source_county')
-            county_units = AdminUnit.objects.filter(
-                game=game, unit_type='COUNTY', parent=game.player_unit,
-            )
-            target_unit = next(
-                (
-                    unit for unit in county_units
-                    if unit.unit_data.get('county_name') == source_county
-                ),
-                None,
-            )
+            target_unit = AdminUnit.objects.filter(
+                game=game, unit_type='COUNTY', parent=game.player_unit, name=source_county,
+            ).order_by('id').first() if source_county else None
             if target_unit is not None:
                 cd = target_unit.unit_data
                 cd['prefect_affinity'] = round(_clamp_meter(
@@ -1581,7 +1508,7 @@ class PrefectureService:
         if not option:
             return {"error": f"无效决策选项: {action}"}
 
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         effects = option.get('immediate_effects', {})
         applied_state = cls._apply_judicial_effects(game, pdata, case_data, effects)
 
@@ -1628,7 +1555,7 @@ class PrefectureService:
     @classmethod
     def get_talent_info(cls, game) -> dict:
         """返回才池统计信息与历史府试结果"""
-        pdata = game.player_unit.unit_data
+        pdata = game.get_unit_data()
         pool = pdata.get('talent_pool', [])
 
         by_county: dict = {}
@@ -0,0 +1,132 @@
+"""知府游戏下辖县并行结算
+
+各县结算在给定 prefecture_ctx 后互不依赖：父进程把 unit_data（可 pickle 的字典）
+分发到进程池，子进程只做 settle_county 纯计算并返回结算后的字典与本月上缴额，
+不触碰 ORM；父进程收齐后统一 bulk_update。
+
+随机数：父进程按县顺序为每县抽取一个种子，县内结算使用独立的 Random 流，
+串行与并行两条路径在同一全局种子下结果一致。
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .constants import month_of_year
+from .emergency import EmergencyService
+from .settlement import SettlementService
+from .process_workers import init_django_worker
+
+logger = logging.getLogger('game')
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def compute_remit(fy_before, fy_after, moy):
+    """由结算前后 fiscal_year 差值推导本月实际上缴额"""
+    if moy == 1:
+        # 正月重置后 fy_after 只含本月新增
+        commercial_remit = (
+            fy_after.get('commercial_tax', 0) - fy_after.get('commercial_retained', 0)
+        )
+        corvee_remit = (
+            fy_after.get('corvee_tax', 0) - fy_after.get('corvee_retained', 0)
+        )
+        agri_remit = 0.0
+    else:
+        commercial_remit = (
+            (fy_after.get('commercial_tax', 0) - fy_before.get('commercial_tax', 0)) -
+            (fy_after.get('commercial_retained', 0) - fy_before.get('commercial_retained', 0))
+        )
+        corvee_remit = (
+            (fy_after.get('corvee_tax', 0) - fy_before.get('corvee_tax', 0)) -
+            (fy_after.get('corvee_retained', 0) - fy_before.get('corvee_retained', 0))
+        )
+        agri_remit = fy_after.get('agri_remitted', 0) - fy_before.get('agri_remitted', 0)
+    return max(0.0, commercial_remit + corvee_remit + agri_remit)
+
+
+def settle_subordinate(unit_id, unit_data, season, prefecture_ctx, seed):
+    """结算单个下辖县（可在子进程中执行），返回 (unit_id, unit_data, remit)"""
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        EmergencyService.ensure_state(unit_data)
+        # 结算前快照 fiscal_year，用于计算本月上缴增量
+        fy_before = dict(unit_data.get('fiscal_year', {}))
+        report = {"season": season, "events": []}
+        SettlementService.settle_county(
+            unit_data, season, report, game=None, prefecture_ctx=prefecture_ctx,
+        )
+        remit = compute_remit(fy_before, unit_data.get('fiscal_year', {}), month_of_year(season))
+        unit_data['last_remit'] = round(remit, 1)
+        return unit_id, unit_data, remit
+    finally:
+        random.setstate(state)
+
+
+def _configured_workers():
+    workers = getattr(settings, 'PREFECTURE_SETTLEMENT_WORKERS', 1)
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _get_pool(workers):
+    """进程内共享的结算进程池（按需创建，worker 数变化时重建）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=init_django_worker)
+            _pool_workers = workers
+        return _pool
+
+
+def reset_pool():
+    """关闭共享进程池（测试或进程退出时使用）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def settle_subordinates(jobs, season, prefecture_ctx, workers=None):
+    """结算全部下辖县
+
+    jobs: [(unit_id, unit_data), ...]
+    返回 {unit_id: (unit_data, remit)}。并行时返回的是子进程结算后的新字典；
+    串行（workers<=1、仅一县、或当前进程为守护进程如 Celery prefork 子进程）时原地修改。
+    进程池异常时整体回退串行，父进程中的原始字典此前未被改动。
+    """
+    workers = min(workers or _configured_workers(), len(jobs))
+    seeds = [random.getrandbits(64) for _ in jobs]
+    tasks = [
+        (unit_id, unit_data, season, prefecture_ctx, seed)
+        for (unit_id, unit_data), seed in zip(jobs, seeds)
+    ]
+
+    if workers > 1 and not multiprocessing.current_process().daemon:
+        try:
+            pool = _get_pool(workers)
+            futures = [pool.submit(settle_subordinate, *task) for task in tasks]
+            results = [future.result() for future in futures]
+            return {unit_id: (data, remit) for unit_id, data, remit in results}
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning("Parallel prefecture settlement failed, falling back to serial: %s", e)
+            reset_pool()
+
+    results = {}
+    for task in tasks:
+        unit_id, data, remit = settle_subordinate(*task)
+        results[unit_id] = (data, remit)
+    return results
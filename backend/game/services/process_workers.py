@@ -0,0 +1,12 @@
+"""进程池子进程的公共初始化（批量推演与知府下辖县并行结算共用）"""
+
+import os
+
+
+def init_django_worker():
+    """spawn 启动的子进程需要自行初始化 Django（fork 时已继承，跳过）"""
+    from django.apps import apps
+    if not apps.ready:
+        import django
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+        django.setup()
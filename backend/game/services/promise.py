@@ -44,7 +44,8 @@ class PromiseService:
 
         try:
             client = LLMClient()
-            result = client.chat_json(messages, temperature=0.2, max_tokens=512)
+            result = client.chat_json(messages, temperature=0.2, max_tokens=512,
+                                      tag='promise', template='promise_extraction')
         except Exception as e:
             logger.error("Promise extraction LLM failed: %s", e)
             return []
@@ -127,25 +128,37 @@ class PromiseService:
     # ------------------------------------------------------------------
 
     @classmethod
-    def check_promises(cls, game):
-        """Check all pending promises. Returns list of event description strings."""
-        pending = Promise.objects.filter(game=game, status='PENDING')
-        events = []
+    def check_promises(cls, game, county=None):
+        """Check all pending promises. Returns list of event description strings.
+
+        ``county`` 为结算中已加载的县状态（advance_season 传入），缺省时读取一次存档。
+        全部承诺针对同一份县状态一次判定，状态变更 bulk_update、清名每位玩家只写一次、
+        日志 bulk_create —— 每月查询数与待履行承诺数量无关。
+        """
+        pending = list(Promise.objects.filter(game=game, status='PENDING').order_by('id'))
+        if not pending:
+            return []
+        if county is None:
+            county = load_county_state(game)
 
+        evaluator = PromiseEvaluator(county, cls._TYPE_TO_ACTION)
+        events = []
+        resolved = []
         for promise in pending:
             # Check if fulfilled early
-            fulfilled = cls._validate_promise(promise, game)
-            if fulfilled:
-                cls._resolve_promise(promise, game, 'FULFILLED')
+            if evaluator.is_fulfilled(promise):
+                resolved.append((promise, 'FULFILLED'))
                 events.append(f'承诺已履行：{promise.description}（清名+3）')
             elif game.current_season >= promise.deadline_season:
                 # Deadline reached — but defer if project is still under construction
-                if cls._is_in_construction(promise, game):
+                if evaluator.is_in_construction(promise):
                     events.append(f'承诺延期：{promise.description}（项目建设中，暂不计为违约）')
                 else:
-                    cls._resolve_promise(promise, game, 'BROKEN')
+                    resolved.append((promise, 'BROKEN'))
                     events.append(f'承诺已违约：{promise.description}（清名-5）')
 
+        if resolved:
+            cls._apply_resolutions(game, resolved)
         return events
 
     # Promise type → investment action 映射（仅限基建/延迟类投资）
@@ -158,122 +171,136 @@ class PromiseService:
         'BUILD_MEDICAL': 'build_medical',
     }
 
+    _INTEGRITY_CHANGE = {'FULFILLED': 3, 'BROKEN': -5}
+
     @classmethod
-    def _is_in_construction(cls, promise, game):
-        """检查承诺对应的项目是否仍在建设中（active_investments）。"""
-        county = load_county_state(game)
-        active = county.get('active_investments', [])
+    def _apply_resolutions(cls, game, resolved):
+        """批量落库：承诺状态、玩家清名、承诺日志"""
+        now = timezone.now()
+        for promise, new_status in resolved:
+            promise.status = new_status
+            promise.resolved_at = now
+        Promise.objects.bulk_update([p for p, _ in resolved], ['status', 'resolved_at'])
+
+        # Adjust integrity — 逐条钳制到 [0, 100]，与逐条结算的结果一致
+        player = cls._get_player(game)
+        if player is not None:
+            integrity = player.integrity
+            for _, new_status in resolved:
+                integrity = max(0, min(100, integrity + cls._INTEGRITY_CHANGE[new_status]))
+            if integrity != player.integrity:
+                player.integrity = integrity
+                player.save(update_fields=['integrity'])
+
+        logs = []
+        for promise, new_status in resolved:
+            status_text = '已履行' if new_status == 'FULFILLED' else '已违约'
+            delta = cls._INTEGRITY_CHANGE[new_status]
+            logs.append(EventLog(
+                game=game,
+                season=game.current_season,
+                event_type=f'promise_{new_status.lower()}',
+                category='PROMISE',
+                description=f'承诺{status_text}：{promise.description}（清名{delta:+d}）',
+                data={
+                    'promise_id': promise.id,
+                    'promise_type': promise.promise_type,
+                    'status': new_status,
+                    'integrity_change': delta,
+                },
+            ))
+        EventLog.objects.bulk_create(logs)
 
-        action = cls._TYPE_TO_ACTION.get(promise.promise_type)
-        if not action:
-            return False
+    @staticmethod
+    def _get_player(game):
+        player = getattr(game, 'player', None)
+        if player is not None:
+            return player
+        from ..models import PlayerProfile
+        return PlayerProfile.objects.filter(game=game).first()
+
+
+class PromiseEvaluator:
+    """针对一份县状态判定承诺 — 村庄与在建项目先建索引，单条判定为常数时间
+
+    ``is_fulfilled`` / ``is_in_construction`` 的判定规则与逐条读档时代保持一致：
+    指定目标村的承诺只看该村，未指定则任一村满足即可。
+    """
+
+    def __init__(self, county, type_to_action):
+        self.county = county
+        self.type_to_action = type_to_action
+
+        self._villages_by_name = {}
+        for v in county.get('villages', []):
+            self._villages_by_name.setdefault(v['name'], []).append(v)
+        self._any_school = any(v.get('has_school') for v in county.get('villages', []))
+        self._max_farmland = max(
+            (v.get('farmland', 0) for v in county.get('villages', [])), default=None,
+        )
+
+        # action → 目标村集合；None 表示不定向（或未记录目标村）的在建项目
+        self._active = {}
+        for inv in county.get('active_investments', []):
+            self._active.setdefault(inv.get('action'), set()).add(inv.get('target_village') or None)
+
+    def _villages(self, target_village):
+        return self._villages_by_name.get(target_village, [])
 
+    def is_in_construction(self, promise):
+        """检查承诺对应的项目是否仍在建设中（active_investments）。"""
+        targets = self._active.get(self.type_to_action.get(promise.promise_type))
+        if not targets:
+            return False
         target_village = promise.context.get('target_village')
-        for inv in active:
-            if inv.get('action') != action:
-                continue
-            # 对村庄定向投资，还需匹配村庄
-            if target_village and inv.get('target_village') and inv['target_village'] != target_village:
-                continue
-            return True
-        return False
+        # 对村庄定向投资，还需匹配村庄
+        return not target_village or None in targets or target_village in targets
 
-    @classmethod
-    def _validate_promise(cls, promise, game):
+    def is_fulfilled(self, promise):
         """Check if a promise has been fulfilled. Returns True/False."""
-        county = load_county_state(game)
+        county = self.county
         ctx = promise.context
+        promise_type = promise.promise_type
 
-        if promise.promise_type == 'LOWER_TAX':
+        if promise_type == 'LOWER_TAX':
             target = ctx.get('target_value')
             if target is not None:
                 return county.get('tax_rate', 1.0) <= target
             # No explicit target: just check if rate decreased
             return county.get('tax_rate', 1.0) < ctx.get('initial_tax_rate', 1.0)
 
-        elif promise.promise_type == 'BUILD_SCHOOL':
+        elif promise_type == 'BUILD_SCHOOL':
             target_village = ctx.get('target_village')
-            for v in county.get('villages', []):
-                if target_village and v['name'] != target_village:
-                    continue
-                if v.get('has_school'):
-                    return True
-            return False
+            if not target_village:
+                return self._any_school
+            return any(v.get('has_school') for v in self._villages(target_village))
 
-        elif promise.promise_type == 'BUILD_IRRIGATION':
+        elif promise_type == 'BUILD_IRRIGATION':
             initial = ctx.get('initial_irrigation_level', 0)
             return county.get('irrigation_level', 0) > initial
 
-        elif promise.promise_type == 'RELIEF':
+        elif promise_type == 'RELIEF':
             disaster = county.get('disaster_this_year')
-            if disaster and disaster.get('relieved'):
-                return True
             # If no disaster, can't fulfill or break — keep pending
-            return False
+            return bool(disaster and disaster.get('relieved'))
 
-        elif promise.promise_type == 'HIRE_BAILIFFS':
+        elif promise_type == 'HIRE_BAILIFFS':
             initial = ctx.get('initial_bailiff_level', 0)
             return county.get('bailiff_level', 0) > initial
 
-        elif promise.promise_type == 'RECLAIM_LAND':
+        elif promise_type == 'RECLAIM_LAND':
             target_village = ctx.get('target_village')
             initial_farmland = ctx.get('initial_farmland', 0)
-            for v in county.get('villages', []):
-                if target_village and v['name'] != target_village:
-                    continue
-                if v['farmland'] > initial_farmland:
-                    return True
-            return False
+            if not target_village:
+                return self._max_farmland is not None and self._max_farmland > initial_farmland
+            return any(v.get('farmland', 0) > initial_farmland for v in self._villages(target_village))
 
-        elif promise.promise_type == 'REPAIR_ROADS':
-            # Check if there's an active or completed road investment
-            for inv in county.get('active_investments', []):
-                if inv.get('action') == 'repair_roads':
-                    return True
-            # If commercial went up, roads were repaired (completed)
-            return False
+        elif promise_type == 'REPAIR_ROADS':
+            # Check if there's an active road investment
+            return 'repair_roads' in self._active
 
-        elif promise.promise_type == 'BUILD_GRANARY':
-            return county.get('has_granary', False)
+        elif promise_type == 'BUILD_GRANARY':
+            return bool(county.get('has_granary', False))
 
         # OTHER: cannot auto-validate
         return False
-
-    @classmethod
-    def _resolve_promise(cls, promise, game, new_status):
-        """Mark promise as fulfilled or broken, adjust integrity."""
-        promise.status = new_status
-        promise.resolved_at = timezone.now()
-        promise.save(update_fields=['status', 'resolved_at'])
-
-        # Adjust integrity
-        player = getattr(game, 'player', None)
-        if player is None:
-            try:
-                from ..models import PlayerProfile
-                player = PlayerProfile.objects.get(game=game)
-            except Exception:
-                return
-
-        if new_status == 'FULFILLED':
-            player.integrity = min(100, player.integrity + 3)
-        elif new_status == 'BROKEN':
-            player.integrity = max(0, player.integrity - 5)
-        player.save(update_fields=['integrity'])
-
-        # Log event
-        status_text = '已履行' if new_status == 'FULFILLED' else '已违约'
-        integrity_change = '+3' if new_status == 'FULFILLED' else '-5'
-        EventLog.objects.create(
-            game=game,
-            season=game.current_season,
-            event_type=f'promise_{new_status.lower()}',
-            category='PROMISE',
-            description=f'承诺{status_text}：{promise.description}（清名{integrity_change}）',
-            data={
-                'promise_id': promise.id,
-                'promise_type': promise.promise_type,
-                'status': new_status,
-                'integrity_change': 3 if new_status == 'FULFILLED' else -5,
-            },
-        )
@@ -1,12 +1,11 @@
 """月度结算引擎"""
 
-import copy
 import logging
 import random
 
 logger = logging.getLogger('game')
 
-from ..models import Agent, EventLog, Promise
+from ..models import Agent, EventLog, Promise, TermMonthMetric
 from .constants import (
     ANNUAL_CONSUMPTION,
     MAX_MONTH,
@@ -26,15 +25,17 @@ from .settlement_disaster import DisasterMixin
 from .settlement_metrics import MetricsMixin
 from .settlement_seasonal import SeasonalMixin
 from .settlement_summary import SummaryMixin
+from .ai_negotiation import NEGOTIATION_PLAN_KEY, planned_trigger
 from .emergency import EmergencyService
 from .annual_review import AnnualReviewService
 from .ledger import (
-    advance_gentry_grain_ledgers,
     ensure_county_ledgers,
     ensure_village_ledgers,
     sync_county_gentry_land_ratio,
     sync_legacy_from_ledgers,
 )
+from .peers import PeerSummary
+from .settlement_reports import store_report
 from .state import load_county_state, save_player_state
 
 
@@ -105,7 +106,7 @@ class SettlementService(
             cls._autumn_settlement(county, report, peer_counties=peer_counties, prefecture_ctx=prefecture_ctx)
 
         # 8a. 地主粮食账本（月度消费；九月叠加秋收，不清零）
-        advance_gentry_grain_ledgers(county, month)
+        cls._advance_gentry_ledgers(county, month)
 
         # 8b. [十月] 执行九月农业税上缴（含灾害减免批示）
         if moy == 10:
@@ -119,6 +120,9 @@ class SettlementService(
         if moy == 12:
             cls._winter_settlement(county, month, report)
 
+        # 本月预定的 AI 交涉策略只用于本次结算
+        county.pop(NEGOTIATION_PLAN_KEY, None)
+
     @classmethod
     def advance_season(cls, game):
         """
@@ -147,13 +151,11 @@ class SettlementService(
         # 0. Reset per-month counters
         county["advisor_questions_used"] = 0
 
-        # Load peer counties for autumn
-        neighbor_counties = []
-        for neighbor in game.neighbors.all():
-            peer = dict(neighbor.county_data)
-            EmergencyService.ensure_state(peer)
-            peer["_peer_name"] = neighbor.county_name
-            neighbor_counties.append(peer)
+        # 邻县对比摘要（迁徙竞争 / 连锁民变只读）
+        neighbor_counties = [
+            PeerSummary.from_county(neighbor.county_data, name=neighbor.county_name)
+            for neighbor in game.neighbors.all()
+        ]
 
         # Single physics engine
         cls.settle_county(county, month, report, peer_counties=neighbor_counties, game=game)
@@ -164,7 +166,7 @@ class SettlementService(
         # Check promises
         from .promise import PromiseService
         try:
-            promise_events = PromiseService.check_promises(game)
+            promise_events = PromiseService.check_promises(game, county=county)
             report['events'].extend(promise_events)
         except Exception as e:
             import logging
@@ -205,10 +207,9 @@ class SettlementService(
         game.save(update_fields=["current_season", "updated_at"])
 
         # Log settlement summary
-        # Keep legacy keys for existing summary analyzers, and store full month payload
-        # for 县志 "查看当月月报" expansion.
-        log_data = {'events': report.get('events', [])}
-        log_data['settlement_report'] = copy.deepcopy(report)
+        # Keep legacy keys for existing summary analyzers; the full month payload for
+        # 县志 "查看当月月报" expansion lives in the SettlementReport side table.
+        log_data = {'events': report.get('events', []), 'has_settlement_report': True}
         # Monthly micro-snapshot for trend analysis
         total_pop = sum(
             v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
@@ -236,7 +237,7 @@ class SettlementService(
             log_data['winter_snapshot'] = report['winter_snapshot']
         if report.get('population_update'):
             log_data['population_update'] = report['population_update']
-        EventLog.objects.create(
+        settlement_log = EventLog.objects.create(
             game=game,
             season=month,
             event_type='season_settlement',
@@ -244,6 +245,17 @@ class SettlementService(
             description=f"{month_name(month)}结算",
             data=log_data,
         )
+        store_report(settlement_log, report)
+        TermMonthMetric.objects.update_or_create(
+            game=game,
+            neighbor_county=None,
+            season=month,
+            defaults={
+                "snapshot": log_data['monthly_snapshot'],
+                "autumn": report.get('autumn') or None,
+                "winter_snapshot": report.get('winter_snapshot') or None,
+            },
+        )
 
         return report
 
@@ -291,6 +303,7 @@ class SettlementService(
         if not has_irrigation:
             return
 
+        pre_rolled, planned_village = (False, None) if game is not None else planned_trigger(county, 'hidden_land')
         for v in county['villages']:
             ensure_village_ledgers(v)
             if v.get('hidden_land_discovered', False):
@@ -308,9 +321,11 @@ class SettlementService(
             bribe_rejected = game is not None and county.get('rejected_bribes', {}).get(_hbk)
 
             if not bribe_rejected:
-                morale = v.get('morale', 50)
-                prob = 0.05 + max(0, (morale - 30)) / 2 * 0.01
-                if random.random() >= prob:
+                if pre_rolled:
+                    # AI 知县：触发已在结算前掷定（见 plan_negotiations_many）
+                    if village_name != planned_village:
+                        continue
+                elif random.random() >= cls._hidden_land_probability(v):
                     continue
 
             if game is not None:
@@ -409,7 +424,7 @@ class SettlementService(
                 if ratio is None:
                     # Deterministic fallback
                     bailiff_score = min(1.0, county.get('bailiff_level', 0) / 3)
-                    morale_score = min(1.0, morale / 100)
+                    morale_score = min(1.0, v.get('morale', 50) / 100)
                     ratio = 0.60 + 0.15 * (0.5 * bailiff_score + 0.5 * morale_score)
                     ratio = max(0.50, min(0.85, ratio + random.uniform(-0.03, 0.03)))
 
@@ -433,6 +448,31 @@ class SettlementService(
         if game is None:
             sync_county_gentry_land_ratio(county)
 
+    @staticmethod
+    def _hidden_land_probability(village):
+        """修水利期间单村隐田被发现的月概率"""
+        morale = village.get('morale', 50)
+        return 0.05 + max(0, (morale - 30)) / 2 * 0.01
+
+    @staticmethod
+    def _annexation_probability(village, monthly_surplus, has_disaster):
+        """余粮紧张时单村地主兼并的月概率（玩家与 AI 知县共用）"""
+        prob = 0.08
+        if village['morale'] < 40:
+            prob += 0.10
+        if village['morale'] < 25:
+            prob += 0.15
+        if village.get('gentry_land_pct', 0) > 0.35:
+            prob += 0.05
+        if has_disaster:
+            prob += 0.10
+        if village['morale'] > 60:
+            prob -= 0.05
+        # 余粮为负时提高概率：负值绝对值越大，加成越高
+        if monthly_surplus < 0:
+            prob += min(0.25, abs(monthly_surplus) * 0.02)
+        return max(0.0, min(0.5, prob))
+
     @classmethod
     def _estimate_monthly_surplus_per_capita(cls, county, month):
         """Estimate current monthly per-capita peasant grain surplus (斤)."""
@@ -471,6 +511,7 @@ class SettlementService(
         welfare_w = goals.get('welfare', 0.2)
         bailiff_level = county.get('bailiff_level', 0)
 
+        pre_rolled, planned_village = (False, None) if game is not None else planned_trigger(county, 'annexation')
         for v in county['villages']:
             ensure_village_ledgers(v)
 
@@ -482,24 +523,11 @@ class SettlementService(
             bribe_rejected = game is not None and county.get('rejected_bribes', {}).get(_abk)
 
             if not bribe_rejected:
-                # Same probability formula for both paths
-                prob = 0.08
-                if v['morale'] < 40:
-                    prob += 0.10
-                if v['morale'] < 25:
-                    prob += 0.15
-                if v.get('gentry_land_pct', 0) > 0.35:
-                    prob += 0.05
-                if has_disaster:
-                    prob += 0.10
-                if v['morale'] > 60:
-                    prob -= 0.05
-                # 余粮为负时提高概率：负值绝对值越大，加成越高
-                if monthly_surplus < 0:
-                    prob += min(0.25, abs(monthly_surplus) * 0.02)
-                prob = max(0.0, min(0.5, prob))
-
-                if random.random() >= prob:
+                if pre_rolled:
+                    # AI 知县：触发已在结算前掷定（见 plan_negotiations_many）
+                    if village_name != planned_village:
+                        continue
+                elif random.random() >= cls._annexation_probability(v, monthly_surplus, has_disaster):
                     continue
 
             if game is not None:
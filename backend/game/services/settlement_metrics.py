@@ -11,7 +11,11 @@ from .constants import (
     ROAD_COMMERCE_BONUS_PER_LEVEL,
     month_of_year,
 )
-from .ledger import ensure_county_ledgers, refresh_village_grain_ledgers
+from .ledger import (
+    advance_gentry_grain_ledgers,
+    ensure_county_ledgers,
+    refresh_village_grain_ledgers,
+)
 
 
 class MetricsMixin:
@@ -45,8 +49,7 @@ class MetricsMixin:
 
         # County → Village propagation: 县级变化的50%传导到各村
         if county_delta != 0:
-            for v in county["villages"]:
-                v["morale"] = max(0, min(100, v["morale"] + county_delta * 0.5))
+            cls._propagate_to_villages(county, "morale", county_delta)
 
         # Village → County aggregation: 按人口权重加权平均，与当前县级民心混合
         cls._sync_county_from_villages(county, "morale")
@@ -81,8 +84,7 @@ class MetricsMixin:
 
         # County → Village propagation
         if county_delta != 0:
-            for v in county["villages"]:
-                v["security"] = max(0, min(100, v["security"] + county_delta * 0.5))
+            cls._propagate_to_villages(county, "security", county_delta)
 
         # Village → County aggregation
         cls._sync_county_from_villages(county, "security")
@@ -93,6 +95,20 @@ class MetricsMixin:
                 f"治安变化: {'+' if actual_change > 0 else ''}"
                 f"{actual_change:.1f} (当前: {county['security']:.1f})")
 
+    @staticmethod
+    def _propagate_to_villages(county, field, county_delta):
+        """县级指标变化的50%传导到各村"""
+        for v in county["villages"]:
+            v[field] = max(0, min(100, v[field] + county_delta * 0.5))
+
+    @staticmethod
+    def _registered_population_total(county):
+        """在册村民总人口（不含地主账本人口）"""
+        return sum(
+            v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
+            for v in county["villages"]
+        )
+
     @staticmethod
     def _sync_county_from_villages(county, field):
         """按人口权重将各村指标汇聚到县级，与当前县值混合(70%村均/30%县值)"""
@@ -122,11 +138,7 @@ class MetricsMixin:
         irrigation_mult = 1 + county.get("irrigation_level", 0) * 0.15
         tax_rate = county.get("tax_rate", 0.12)
 
-        total = 0
-        for v in county["villages"]:
-            peasant_land = v.get("peasant_ledger", {}).get("farmland", 0)
-            production = peasant_land * MAX_YIELD_PER_MU * ag_suit * irrigation_mult * (1 - tax_rate)
-            total += production
+        total = cls._peasant_farmland_production(county, ag_suit, irrigation_mult, tax_rate)
 
         if include_disaster:
             disaster = county.get("disaster_this_year")
@@ -140,6 +152,21 @@ class MetricsMixin:
 
         return total
 
+    @staticmethod
+    def _peasant_farmland_production(county, ag_suit, irrigation_mult, tax_rate):
+        """各村农民自有田地的税后产出合计（斤，未计灾害）"""
+        total = 0
+        for v in county["villages"]:
+            peasant_land = v.get("peasant_ledger", {}).get("farmland", 0)
+            production = peasant_land * MAX_YIELD_PER_MU * ag_suit * irrigation_mult * (1 - tax_rate)
+            total += production
+        return total
+
+    @classmethod
+    def _advance_gentry_ledgers(cls, county, month):
+        """地主粮食账本月度推进"""
+        advance_gentry_grain_ledgers(county, month)
+
     @classmethod
     def _refresh_village_ledger_metrics(cls, county, monthly_consumption, month=None):
         """Refresh village-level grain ledgers from current county state."""
@@ -155,10 +182,7 @@ class MetricsMixin:
         prefecture_ctx: optional dict with road_level for inter-county commerce bonus.
         """
         ensure_county_ledgers(county)
-        total_pop = sum(
-            v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
-            for v in county["villages"]
-        )
+        total_pop = cls._registered_population_total(county)
         base_monthly_consumption = total_pop * ANNUAL_CONSUMPTION / 12
 
         # 统一口径：到下次秋收（九月）剩余月数视角
@@ -260,10 +284,7 @@ class MetricsMixin:
         """年度徭役征收（五月全额）"""
         ensure_county_ledgers(county)
         # 徭役折银仅基于在册村民（地主账本人口不纳入应役人口）
-        liable_pop = sum(
-            v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
-            for v in county["villages"]
-        )
+        liable_pop = cls._registered_population_total(county)
         corvee_total = liable_pop * CORVEE_PER_CAPITA
 
         remit_ratio = county.get("remit_ratio", 0.65)
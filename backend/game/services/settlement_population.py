@@ -14,6 +14,7 @@ from .constants import (
     MIGRATION_COMPETITION_DIMS,
 )
 from .ledger import ensure_county_ledgers, ensure_village_ledgers
+from .peers import PeerSummary
 
 
 class PopulationMixin:
@@ -131,21 +132,15 @@ class PopulationMixin:
         pair_details = []
 
         for idx, peer in enumerate(peer_counties):
-            if not isinstance(peer, dict):
+            peer = PeerSummary.coerce(peer)
+            if peer is None:
                 continue
 
-            peer_villages = peer.get("villages") or []
-            peer_pop = sum(
-                v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
-                for v in peer_villages
-            )
+            peer_pop = peer.registered_population
             if peer_pop <= 0:
                 continue
 
-            peer_metrics = {
-                dim: float(peer.get(dim, 50))
-                for dim in MIGRATION_COMPETITION_DIMS
-            }
+            peer_metrics = peer.metrics()
             pair_eval = cls._classify_competition_pair(own_metrics, peer_metrics)
             direction = pair_eval["direction"]
             rate = pair_eval["rate"]
@@ -162,7 +157,7 @@ class PopulationMixin:
                 moved = int(own_total_pop * rate)
                 total_outflow += moved
 
-            peer_name = peer.get("_peer_name") or peer.get("county_name") or peer.get("county_type_name") or f"邻县{idx + 1}"
+            peer_name = peer.name or f"邻县{idx + 1}"
             pair_details.append(
                 {
                     "peer_index": idx + 1,
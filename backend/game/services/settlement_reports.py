@@ -0,0 +1,63 @@
+"""月度结算月报存储 — 县志 "查看当月月报" 的按需读取
+
+完整月报不再内嵌在 EventLog.data['settlement_report']，而是序列化为 JSON 字节串
+（默认 zlib 压缩）写入 SettlementReport 旁表；EventLog.data 只留
+has_settlement_report 标记。旧存档中内嵌的月报仍可读取。
+"""
+
+import json
+import zlib
+
+from django.conf import settings
+
+from ..models import SettlementReport
+
+
+def encode_report(report, compress=None):
+    """序列化月报，返回 (encoding, payload_bytes, raw_size)
+
+    json.dumps 本身即是快照，写入后调用方继续修改 report 不受影响。
+    """
+    if compress is None:
+        compress = getattr(settings, 'SETTLEMENT_REPORT_COMPRESSION', True)
+    raw = json.dumps(report, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if compress:
+        level = getattr(settings, 'SETTLEMENT_REPORT_ZLIB_LEVEL', 6)
+        return 'zlib', zlib.compress(raw, level), len(raw)
+    return 'json', raw, len(raw)
+
+
+def decode_report(encoding, payload):
+    raw = bytes(payload)
+    if encoding == 'zlib':
+        raw = zlib.decompress(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def store_report(event_log, report):
+    """为一条 season_settlement 日志写入完整月报"""
+    encoding, payload, size = encode_report(report)
+    return SettlementReport.objects.create(
+        event_log=event_log, encoding=encoding, payload=payload, size=size,
+    )
+
+
+# 更早的存档没有完整月报，只能由这些摘要字段拼出部分月报
+LEGACY_REPORT_KEYS = ('events', 'monthly_snapshot', 'population_update', 'autumn', 'winter_snapshot')
+
+
+def load_report(event_log):
+    """读取日志对应的完整月报
+
+    旁表缺失时依次回退：旧存档内嵌的 data['settlement_report']、由摘要字段拼出的部分月报；
+    都没有则返回 None。
+    """
+    try:
+        stored = SettlementReport.objects.get(event_log_id=event_log.pk)
+    except SettlementReport.DoesNotExist:
+        data = event_log.data or {}
+        if data.get('settlement_report'):
+            return data['settlement_report']
+        partial = {key: data[key] for key in LEGACY_REPORT_KEYS if data.get(key)}
+        return partial or None
+    return decode_report(stored.encoding, stored.payload)
@@ -325,6 +325,37 @@ class SeasonalMixin:
             f"{relief_note}，县库入账{round(agri_retained_final)}两"
         )
 
+    @staticmethod
+    def _village_agri_output(county, base_yield, suitability, irrigation_bonus):
+        """各村在册田地的农业产出合计（两，未计灾害）"""
+        total_agri_output = 0
+        for v in county["villages"]:
+            output = v["farmland"] * base_yield * suitability * (1 + irrigation_bonus)
+            total_agri_output += output
+        return total_agri_output
+
+    @staticmethod
+    def _apply_disaster_pop_loss(county, disaster, granary_active, prefecture_ctx=None):
+        """秋季灾害人口损失：逐村扣减在册人口，返回全县损失人数"""
+        total_pop_loss = 0
+        for v in county["villages"]:
+            ensure_village_ledgers(v)
+            loss_rate = random.uniform(0.02, disaster["severity"] / 5)
+            base_pop = v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
+            pop_loss = int(base_pop * loss_rate)
+            if granary_active:
+                pop_loss = int(pop_loss * GRANARY_POP_LOSS_MULTIPLIER)
+            if disaster.get("relieved"):
+                pop_loss = int(pop_loss * RELIEF_POP_LOSS_MULTIPLIER)
+            # 府级义仓：跨县粮食调拨进一步减少人口损失
+            if prefecture_ctx and prefecture_ctx.get("granary"):
+                pop_loss = int(pop_loss * PREF_GRANARY_POP_LOSS_MULT)
+            new_pop = max(0, base_pop - pop_loss)
+            v["peasant_ledger"]["registered_population"] = new_pop
+            v["population"] = new_pop
+            total_pop_loss += pop_loss
+        return total_pop_loss
+
     @classmethod
     def _autumn_settlement(cls, county, report, peer_counties=None, prefecture_ctx=None):
         """Autumn: annual population update, agricultural output and agri tax only.
@@ -353,10 +384,7 @@ class SeasonalMixin:
 
         # Agricultural output per village
         base_yield = 0.5  # 两/亩
-        total_agri_output = 0
-        for v in county["villages"]:
-            output = v["farmland"] * base_yield * suitability * (1 + irrigation_bonus)
-            total_agri_output += output
+        total_agri_output = cls._village_agri_output(county, base_yield, suitability, irrigation_bonus)
 
         # Disaster damage (non-plague disasters reduce output; all disasters cause pop loss)
         disaster = county.get("disaster_this_year")
@@ -375,23 +403,8 @@ class SeasonalMixin:
         # 灾害持续效果：所有灾害类型的秋季人口损失
         if disaster:
             granary_active = bool(county.get("has_granary", False))
-            total_pop_loss = 0
-            for v in county["villages"]:
-                ensure_village_ledgers(v)
-                loss_rate = random.uniform(0.02, disaster["severity"] / 5)
-                base_pop = v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
-                pop_loss = int(base_pop * loss_rate)
-                if granary_active:
-                    pop_loss = int(pop_loss * GRANARY_POP_LOSS_MULTIPLIER)
-                if disaster.get("relieved"):
-                    pop_loss = int(pop_loss * RELIEF_POP_LOSS_MULTIPLIER)
-                # 府级义仓：跨县粮食调拨进一步减少人口损失
-                if prefecture_ctx and prefecture_ctx.get("granary"):
-                    pop_loss = int(pop_loss * PREF_GRANARY_POP_LOSS_MULT)
-                new_pop = max(0, base_pop - pop_loss)
-                v["peasant_ledger"]["registered_population"] = new_pop
-                v["population"] = new_pop
-                total_pop_loss += pop_loss
+            total_pop_loss = cls._apply_disaster_pop_loss(
+                county, disaster, granary_active, prefecture_ctx=prefecture_ctx)
             pref_granary_active = bool((prefecture_ctx or {}).get("granary"))
             report["events"].append(
                 f"灾害持续影响: 全县人口减少{total_pop_loss}人"
@@ -414,10 +427,7 @@ class SeasonalMixin:
                 )
 
         # Agricultural tax (doc 06a §4.1) — only agri tax computed at autumn
-        total_pop = sum(
-            v.get("peasant_ledger", {}).get("registered_population", v.get("population", 0))
-            for v in county["villages"]
-        )
+        total_pop = cls._registered_population_total(county)
         morale_factor = county["morale"] / 100
         collection_efficiency = 0.7 + 0.3 * morale_factor  # ranges 0.7-1.0
         agri_tax = total_agri_output * county["tax_rate"] * collection_efficiency
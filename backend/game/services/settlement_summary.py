@@ -2,7 +2,7 @@
 
 from collections import defaultdict
 
-from ..models import Agent, EventLog, NeighborCounty, NeighborEventLog, Promise
+from ..models import Agent, EventLog, NeighborCounty, NeighborEventLog, Promise, TermMonthMetric
 from .constants import (
     COUNTY_TYPES,
     CORVEE_PER_CAPITA,
@@ -215,6 +215,63 @@ class SummaryMixin:
 
         return agri_tax + corvee_tax + annual_commercial_tax
 
+    @staticmethod
+    def _term_metric_row(row):
+        """TermMonthMetric 行 → 与结算日志相同的 {season, data} 结构"""
+        data = {"monthly_snapshot": row["snapshot"]}
+        if row.get("autumn"):
+            data["autumn"] = row["autumn"]
+        if row.get("winter_snapshot"):
+            data["winter_snapshot"] = row["winter_snapshot"]
+        if row.get("disaster"):
+            data["disaster_before_settlement"] = row["disaster"]
+        return {"season": row["season"], "data": data}
+
+    @classmethod
+    def _has_term_metrics(cls, game):
+        """本任期自首月起已写入月度指标表（旧档从中途开始记录，仍走日志扫描）"""
+        return TermMonthMetric.objects.filter(
+            game=game, neighbor_county__isnull=True, season=1,
+        ).exists()
+
+    @classmethod
+    def _load_player_settlement_rows(cls, game, use_metrics):
+        """玩家本县逐月结算行（按月份升序）"""
+        if use_metrics:
+            rows = TermMonthMetric.objects.filter(
+                game=game, neighbor_county__isnull=True, season__lte=MAX_MONTH,
+            ).order_by("season").values("season", "snapshot", "autumn", "winter_snapshot")
+            return [cls._term_metric_row(row) for row in rows]
+        return list(EventLog.objects.filter(
+            game=game, category="SETTLEMENT", season__lte=MAX_MONTH,
+        ).order_by("season").values("season", "data"))
+
+    @classmethod
+    def _load_neighbor_snapshot_rows(cls, game, neighbor_ids, final_season, use_metrics):
+        """各邻县逐月快照行：{neighbor_id: [{season, data}, ...]}"""
+        rows_by_id = defaultdict(list)
+        if not neighbor_ids:
+            return rows_by_id
+        if use_metrics:
+            rows = TermMonthMetric.objects.filter(
+                game=game, neighbor_county_id__in=neighbor_ids, season__lte=final_season,
+            ).order_by("neighbor_county_id", "season").values(
+                "neighbor_county_id", "season", "snapshot", "autumn", "winter_snapshot", "disaster",
+            )
+            for row in rows:
+                rows_by_id[row["neighbor_county_id"]].append(cls._term_metric_row(row))
+            return rows_by_id
+        rows = NeighborEventLog.objects.filter(
+            neighbor_county_id__in=neighbor_ids,
+            event_type="season_snapshot",
+            season__lte=final_season,
+        ).order_by("neighbor_county_id", "season").values(
+            "neighbor_county_id", "season", "data",
+        )
+        for row in rows:
+            rows_by_id[row["neighbor_county_id"]].append(row)
+        return rows_by_id
+
     @classmethod
     def _build_term_window(cls, settlement_rows, fallback_final_season=None):
         snapshot_seasons = []
@@ -390,9 +447,8 @@ class SummaryMixin:
             v.get("name"): v for v in initial_villages if v.get("name")
         }
 
-        settlement_logs = list(EventLog.objects.filter(
-            game=game, category="SETTLEMENT", season__lte=MAX_MONTH,
-        ).order_by("season").values("season", "data"))
+        use_metrics = cls._has_term_metrics(game)
+        settlement_logs = cls._load_player_settlement_rows(game, use_metrics)
         term_window = cls._build_term_window(
             settlement_logs,
             fallback_final_season=game.current_season - 1,
@@ -477,17 +533,9 @@ class SummaryMixin:
             "id", "county_name", "governor_name", "governor_style", "county_data",
         ))
         neighbor_ids = [n["id"] for n in neighbors]
-        neighbor_logs_by_id = defaultdict(list)
-        if neighbor_ids:
-            nlogs = NeighborEventLog.objects.filter(
-                neighbor_county_id__in=neighbor_ids,
-                event_type="season_snapshot",
-                season__lte=actual_final_season,
-            ).order_by("neighbor_county_id", "season").values(
-                "neighbor_county_id", "season", "data",
-            )
-            for row in nlogs:
-                neighbor_logs_by_id[row["neighbor_county_id"]].append(row)
+        neighbor_logs_by_id = cls._load_neighbor_snapshot_rows(
+            game, neighbor_ids, actual_final_season, use_metrics,
+        )
 
         neighbor_term_metrics = []
         disaster_type_weight = {
@@ -1241,9 +1289,8 @@ class SummaryMixin:
         }
         initial_snap = county.get("initial_snapshot") or {}
 
-        player_settlement_logs = list(EventLog.objects.filter(
-            game=game, category="SETTLEMENT", season__lte=MAX_MONTH,
-        ).order_by("season").values("season", "data"))
+        use_metrics = cls._has_term_metrics(game)
+        player_settlement_logs = cls._load_player_settlement_rows(game, use_metrics)
         term_window = cls._build_term_window(
             player_settlement_logs,
             fallback_final_season=game.current_season - 1,
@@ -1264,11 +1311,9 @@ class SummaryMixin:
         neighbor_exposure = 0.0
         disaster_count = 0
 
-        nlogs = list(NeighborEventLog.objects.filter(
-            neighbor_county=neighbor,
-            event_type="season_snapshot",
-            season__lte=actual_final_season,
-        ).order_by("season").values("season", "data"))
+        nlogs = cls._load_neighbor_snapshot_rows(
+            game, [neighbor.id], actual_final_season, use_metrics,
+        )[neighbor.id]
         for row in nlogs:
             data = row.get("data") or {}
             season = row.get("season")
@@ -0,0 +1,165 @@
+"""离线批量推演 — 不经 ORM 直接驱动 settle_county（邻县路径），用于数值平衡与压测
+
+每个县由 (base_seed + 序号) 决定随机种子，从 CountyService.create_initial_county 起步，
+AI 知县走规则引擎（不调用 LLM），逐月输出与邻县月度快照同结构的记录。
+多县按块分发到进程池，父进程按完成顺序把记录流式写入 JSONL / Parquet。
+"""
+
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import SimpleNamespace
+
+from .ai_governor import AIGovernorService
+from .constants import GOVERNOR_STYLES, MAX_MONTH
+from .county import CountyService
+from .neighbor import NeighborService
+from .process_workers import init_django_worker
+from .settlement import SettlementService
+
+POLICIES = ('rule', 'none')
+
+
+def simulate_county(index, seed, months=MAX_MONTH, county_type=None, policy='rule'):
+    """推演单个县 months 个月，返回逐月快照记录列表"""
+    random.seed(seed)
+    county = CountyService.create_initial_county(county_type=county_type)
+    governor = SimpleNamespace(
+        id=index,
+        county_data=county,
+        county_name=f"模拟县{index}",
+        governor_name=f"模拟知县{index}",
+        governor_style=random.choice(sorted(GOVERNOR_STYLES)),
+        governor_bio="",
+        last_reasoning="",
+    )
+
+    rows = []
+    for month in range(1, months + 1):
+        report = {"season": month, "events": []}
+        if policy == 'rule':
+            profile = AIGovernorService._ensure_profile(governor)
+            events = AIGovernorService._rule_based_decisions(governor, county, month, profile)
+            AIGovernorService._append_memory(county, month, events)
+        SettlementService.settle_county(county, month, report)
+        rows.append({
+            "county": index,
+            "seed": seed,
+            "county_type": county.get("county_type"),
+            **NeighborService._build_monthly_snapshot(county, month),
+            "event_count": len(report["events"]),
+        })
+    return rows
+
+
+def _simulate_chunk(indices, base_seed, months, county_type, policy):
+    rows = []
+    for index in indices:
+        rows.extend(simulate_county(index, base_seed + index, months, county_type, policy))
+    return rows
+
+
+class JSONLWriter:
+    def __init__(self, path):
+        self._fh = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows):
+        for row in rows:
+            self._fh.write(json.dumps(row, ensure_ascii=False))
+            self._fh.write('\n')
+
+    def close(self):
+        self._fh.close()
+
+
+class ParquetWriter:
+    """按块追加写 Parquet（需要 pyarrow）"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+        self._path = path
+        self._writer = None
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not rows:
+            return
+        table = pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path):
+    """按扩展名选择输出格式；path 为空时不落盘"""
+    if not path:
+        return None
+    if path.endswith('.parquet'):
+        return ParquetWriter(path)
+    return JSONLWriter(path)
+
+
+class BatchSimulationService:
+    """批量推演 N 县 × M 月，返回吞吐统计"""
+
+    @classmethod
+    def run(cls, counties, months=MAX_MONTH, workers=None, base_seed=0,
+            county_type=None, policy='rule', output=None, chunk_size=None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy: {policy}")
+        workers = workers or os.cpu_count() or 1
+        chunk_size = chunk_size or max(1, min(50, counties // (workers * 4) or 1))
+        chunks = [
+            list(range(start, min(start + chunk_size, counties)))
+            for start in range(0, counties, chunk_size)
+        ]
+
+        writer = open_writer(output)
+        county_months = 0
+        started = time.perf_counter()
+        try:
+            if workers == 1:
+                for chunk in chunks:
+                    rows = _simulate_chunk(chunk, base_seed, months, county_type, policy)
+                    county_months += cls._emit(writer, rows)
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=init_django_worker) as pool:
+                    futures = [
+                        pool.submit(_simulate_chunk, chunk, base_seed, months, county_type, policy)
+                        for chunk in chunks
+                    ]
+                    for future in as_completed(futures):
+                        county_months += cls._emit(writer, future.result())
+        finally:
+            if writer is not None:
+                writer.close()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "counties": counties,
+            "months": months,
+            "workers": workers,
+            "county_months": county_months,
+            "elapsed_seconds": round(elapsed, 3),
+            "county_months_per_second": round(county_months / elapsed, 1) if elapsed > 0 else None,
+            "output": output,
+        }
+
+    @staticmethod
+    def _emit(writer, rows):
+        if writer is not None:
+            writer.write(rows)
+        return len(rows)
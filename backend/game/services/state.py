@@ -1,20 +1,248 @@
 """玩家状态访问层。"""
 
 import copy
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, JSONField, Value
+from django.db.models.expressions import Func
+
+
+def _clone(value):
+    """Structural copy for JSON-shaped trees (much cheaper than copy.deepcopy)."""
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return copy.deepcopy(value)
+
+
+class PlayerState(dict):
+    """Copy-on-write view over a persisted state dict.
+
+    Top-level keys share the stored sub-trees until they are first accessed;
+    a key's sub-tree is cloned only when handed out to the caller. Keys that
+    were never touched are carried over as-is by ``save_player_state``.
+    """
+
+    __slots__ = ("_source", "_touched")
+
+    def __init__(self, source=None):
+        source = source or {}
+        super().__init__(source)
+        self._source = source
+        self._touched = set()
+
+    def _own(self, key):
+        if key not in self._touched:
+            self._touched.add(key)
+            value = dict.__getitem__(self, key)
+            if isinstance(value, (dict, list)):
+                dict.__setitem__(self, key, _clone(value))
+
+    def _own_all(self):
+        for key in dict.keys(self):
+            self._own(key)
+
+    def __getitem__(self, key):
+        if dict.__contains__(self, key):
+            self._own(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            self._own(key)
+            return dict.__getitem__(self, key)
+        return default
+
+    def __setitem__(self, key, value):
+        self._touched.add(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._touched.add(key)
+        dict.__delitem__(self, key)
+
+    def __iter__(self):
+        # A custom iterator stops dict(), {**state} and dict.update() from
+        # bypassing __getitem__ and leaking shared sub-trees.
+        return iter(list(dict.keys(self)))
+
+    def setdefault(self, key, default=None):
+        if dict.__contains__(self, key):
+            self._own(key)
+            return dict.__getitem__(self, key)
+        self[key] = default
+        return default
+
+    def pop(self, key, *default):
+        if dict.__contains__(self, key):
+            self._own(key)
+        self._touched.add(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key = next(reversed(list(dict.keys(self))))
+        return key, self.pop(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self._touched.update(dict.keys(self))
+        dict.clear(self)
+
+    def values(self):
+        self._own_all()
+        return dict.values(self)
+
+    def items(self):
+        self._own_all()
+        return dict.items(self)
+
+    def copy(self):
+        return _clone(self.to_dict())
+
+    def to_dict(self):
+        """Plain dict sharing this state's current sub-trees."""
+        self._own_all()
+        return dict(dict.items(self))
+
+    def __copy__(self):
+        return self.to_dict()
+
+    def __deepcopy__(self, memo):
+        return _clone(self.to_dict())
+
+    def __reduce__(self):
+        return dict, (self.to_dict(),)
+
+    def build_payload(self):
+        """Return the dict to persist, cloning only sub-trees that changed.
+
+        Touched keys whose value still equals the stored one reuse the stored
+        sub-tree, so read-only access never costs a second copy.
+        """
+        return self.build_patch()[0]
+
+    def build_patch(self):
+        """Return ``(payload, changed, removed)`` relative to the loaded source.
+
+        ``changed`` maps top-level keys to their new (cloned) values and
+        ``removed`` lists top-level keys that were deleted.
+        """
+        payload = {}
+        changed = {}
+        source = self._source
+        for key in dict.keys(self):
+            value = dict.__getitem__(self, key)
+            if key not in self._touched:
+                payload[key] = value
+            elif key in source and source[key] == value:
+                payload[key] = source[key]
+            else:
+                payload[key] = changed[key] = _clone(value)
+        removed = [key for key in source if not dict.__contains__(self, key)]
+        return payload, changed, removed
+
+    def rebase(self, source):
+        """Point this state at a freshly persisted payload."""
+        self._source = source
+
+
+class _JSONBPatch(Func):
+    """``(column || patch) - removed_keys`` on a PostgreSQL jsonb column."""
+
+    output_field = JSONField()
+
+    def __init__(self, column, changed, removed):
+        self.removed = list(removed)
+        super().__init__(F(column), Value(changed, output_field=JSONField()))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column_sql, column_params = compiler.compile(self.source_expressions[0])
+        patch_sql, patch_params = compiler.compile(self.source_expressions[1])
+        sql = f"({column_sql} || {patch_sql}::jsonb)"
+        params = [*column_params, *patch_params]
+        if self.removed:
+            sql = f"({sql} - %s::text[])"
+            params.append(self.removed)
+        return sql, params
+
+
+def _use_jsonb_patch():
+    return (
+        connection.vendor == "postgresql"
+        and getattr(settings, "GAME_STATE_JSONB_PATCH", True)
+    )
+
+
+def _write_json_field(instance, field, payload, patch, extra_fields=()):
+    """Persist one JSON field, as a targeted jsonb patch when possible.
+
+    ``patch`` is ``(changed, removed)`` or None. Without a patch, or off
+    PostgreSQL, this falls back to full-field replacement via ``save``.
+    """
+    setattr(instance, field, payload)
+    if patch is None or not _use_jsonb_patch():
+        instance.save(update_fields=[field, *extra_fields])
+        return
+
+    changed, removed = patch
+    if changed or removed:
+        # update() 不经过 save()：冗余列随补丁一并写入
+        sync = getattr(instance, "sync_denormalized", None)
+        denormalized = sync() if sync else {}
+        type(instance).objects.filter(pk=instance.pk).update(
+            **{field: _JSONBPatch(field, changed, removed)}, **denormalized,
+        )
+    if extra_fields:
+        instance.save(update_fields=list(extra_fields))
+
+
+_SHARED_STATE_ATTR = "_shared_player_state"
 
 
 def load_player_state(game, refresh=False):
-    """Load current player state from the canonical source as a deep copy."""
+    """Load current player state from the canonical source as a copy-on-write view.
+
+    Inside ``shared_player_state(game)`` the same view is returned on every call.
+    """
     if refresh:
+        setattr(game, _SHARED_STATE_ATTR, None)
         game.refresh_from_db()
+        if game.player_unit_id:
+            game.player_unit.refresh_from_db()
 
-    if game.player_unit_id:
-        player_unit = game.player_unit
-        if refresh:
-            player_unit.refresh_from_db()
-        return copy.deepcopy(player_unit.unit_data or {})
+    shared = getattr(game, _SHARED_STATE_ATTR, None)
+    if shared is not None:
+        return shared
+    return PlayerState(game.get_unit_data() or {})
 
-    return copy.deepcopy(game.county_data or {})
+
+@contextmanager
+def shared_player_state(game):
+    """Share one loaded player state across every load of ``game`` in the block.
+
+    Intended for read-mostly request paths (serializers, prompt context
+    building) that would otherwise load and copy the county several times.
+    Nested scopes reuse the outer state.
+    """
+    shared = getattr(game, _SHARED_STATE_ATTR, None)
+    if shared is not None:
+        yield shared
+        return
+
+    state = load_player_state(game)
+    setattr(game, _SHARED_STATE_ATTR, state)
+    try:
+        yield state
+    finally:
+        setattr(game, _SHARED_STATE_ATTR, None)
 
 
 def load_county_state(game, refresh=False):
@@ -23,24 +251,33 @@ def load_county_state(game, refresh=False):
 
 
 def save_player_state(game, state, mirror_legacy=True):
-    """Persist current player state using full-dict replacement."""
-    payload = copy.deepcopy(state or {})
+    """Persist current player state.
 
-    if game.player_unit_id:
-        player_unit = game.player_unit
-        player_unit.unit_data = copy.deepcopy(payload)
-        player_unit.save(update_fields=["unit_data"])
+    The canonical copy lives in ``player_unit.unit_data``; games without a
+    player unit (old saves) fall back to ``GameState.legacy_county_data``.
+    ``mirror_legacy`` is accepted for older callers but no longer writes a
+    second copy: ``GameState.county_data`` reads through to the unit.
 
-        if mirror_legacy and player_unit.unit_type == "COUNTY":
-            game.county_data = copy.deepcopy(payload)
-            game.save(update_fields=["county_data", "updated_at"])
-            return payload
+    Stored dicts are treated as immutable snapshots: the payload shares
+    unchanged sub-trees with the previous one instead of deep-copying them.
+    When ``state`` came from ``load_player_state`` and the database is
+    PostgreSQL, only the changed top-level keys are written (jsonb ``||``);
+    otherwise the whole field is replaced.
+    """
+    if isinstance(state, PlayerState):
+        payload, changed, removed = state.build_patch()
+        patch = (changed, removed)
+        state.rebase(payload)
+    else:
+        payload = _clone(state or {})
+        patch = None
 
+    if game.player_unit_id:
+        _write_json_field(game.player_unit, "unit_data", payload, patch)
         game.save(update_fields=["updated_at"])
         return payload
 
-    game.county_data = payload
-    game.save(update_fields=["county_data", "updated_at"])
+    _write_json_field(game, "legacy_county_data", payload, patch, extra_fields=["updated_at"])
     return payload
 
 
@@ -0,0 +1,83 @@
+"""AdminUnit.unit_data 按键投影 — 府级看板只读取需要的少数顶层键
+
+府情总览、人事面板每次要遍历全部下辖县，但只用到县名、知县档案、灾害、
+评议记录与最近一次汇报。PostgreSQL 上用 jsonb ``->`` 在库内取键
+（列表键只取末元素），只把这几段 JSON 传回应用；其它数据库退回为读取
+整份 unit_data 后在 Python 中裁剪。两条路径返回的结构相同。
+县名、施政类型、灾情等已有冗余列（见 DenormalizedJSONMixin）的，经
+``columns`` 直接读列，不必再从 JSON 中投影。
+"""
+
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Func, JSONField
+from django.db.models.fields.json import KeyTransform
+
+
+@dataclass
+class UnitProjection:
+    """只含投影键的下辖单位只读视图（与 AdminUnit 一样提供 id / unit_data）"""
+
+    id: int
+    unit_data: dict = field(default_factory=dict)
+    columns: dict = field(default_factory=dict)
+
+
+class _JSONLastElement(Func):
+    """jsonb 数组末元素：``(expr -> -1)``"""
+
+    template = "(%(expressions)s -> -1)"
+    output_field = JSONField()
+
+
+def _use_json_projection():
+    return (
+        connection.vendor == "postgresql"
+        and getattr(settings, "UNIT_DATA_JSON_PROJECTION", True)
+    )
+
+
+def _trim(data, keys, last_keys):
+    projected = {key: data[key] for key in keys if data.get(key) is not None}
+    for key in last_keys:
+        items = data.get(key)
+        if isinstance(items, list) and items:
+            projected[key] = [items[-1]]
+    return projected
+
+
+def project_units(queryset, keys=(), last_keys=(), columns=()):
+    """按 queryset 顺序返回 [UnitProjection]
+
+    ``keys``：整段读取的顶层键；``last_keys``：列表型顶层键，只保留末元素
+    （投影结果中仍是单元素列表，调用方 ``reports[-1]`` 的写法不变）。
+    缺失或为 null 的键不出现在投影中。``columns``：一并读取的普通列，
+    放在 ``UnitProjection.columns``。
+    """
+    keys, last_keys, columns = tuple(keys), tuple(last_keys), tuple(columns)
+    if not _use_json_projection():
+        return [
+            UnitProjection(pk, _trim(data or {}, keys, last_keys), dict(zip(columns, values)))
+            for pk, data, *values in queryset.values_list("id", "unit_data", *columns)
+        ]
+
+    annotations = {f"_k{idx}": KeyTransform(key, "unit_data") for idx, key in enumerate(keys)}
+    annotations.update({
+        f"_l{idx}": _JSONLastElement(KeyTransform(key, "unit_data"))
+        for idx, key in enumerate(last_keys)
+    })
+    rows = queryset.annotate(**annotations).values_list("id", *columns, *annotations)
+    units = []
+    for pk, *values in rows:
+        column_values, values = values[:len(columns)], values[len(columns):]
+        data = {}
+        for key, value in zip(keys, values[:len(keys)]):
+            if value is not None:
+                data[key] = value
+        for key, value in zip(last_keys, values[len(keys):]):
+            if value is not None:
+                data[key] = [value]
+        units.append(UnitProjection(pk, data, dict(zip(columns, column_values))))
+    return units
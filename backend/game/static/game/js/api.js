@@ -45,6 +45,95 @@
     });
   }
 
+  // SSE 流式请求：每个 delta 事件调用 onDelta(text)，done 事件的数据作为 Promise 结果
+  function streamRequest(path, body, onDelta) {
+    return fetch(path, {
+      method: "POST",
+      credentials: "same-origin",
+      headers: {
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+        "X-CSRFToken": getCSRF(),
+      },
+      body: JSON.stringify(body),
+    }).then(function (res) {
+      var type = res.headers.get("Content-Type") || "";
+      if (!res.ok || type.indexOf("text/event-stream") === -1 || !res.body) {
+        // 参数校验等错误仍以普通 JSON 返回
+        return res.json().catch(function () { return {}; }).then(function (data) {
+          if (!res.ok) {
+            var err = new Error(data.error || data.message || "请求失败");
+            err.data = data;
+            err.status = res.status;
+            throw err;
+          }
+          return data;
+        });
+      }
+      var reader = res.body.getReader();
+      var decoder = new TextDecoder();
+      var buffer = "";
+      var result = null;
+
+      function handleFrame(frame) {
+        var event = "message";
+        var dataLines = [];
+        frame.split("\n").forEach(function (line) {
+          if (line.indexOf("event:") === 0) event = line.slice(6).trim();
+          else if (line.indexOf("data:") === 0) dataLines.push(line.slice(5).trim());
+        });
+        if (!dataLines.length) return;
+        var data = JSON.parse(dataLines.join("\n"));
+        if (event === "delta") {
+          if (onDelta) onDelta(data.text);
+        } else if (event === "done") {
+          result = data;
+        } else if (event === "error") {
+          throw new Error(data.error || "请求失败");
+        }
+      }
+
+      function pump() {
+        return reader.read().then(function (chunk) {
+          if (chunk.done) {
+            if (result === null) throw new Error("连接中断");
+            return result;
+          }
+          buffer += decoder.decode(chunk.value, { stream: true });
+          var idx;
+          while ((idx = buffer.indexOf("\n\n")) !== -1) {
+            handleFrame(buffer.slice(0, idx));
+            buffer = buffer.slice(idx + 2);
+          }
+          return pump();
+        });
+      }
+      return pump();
+    });
+  }
+
+  // SSE 订阅（EventSource，GET）：handlers 以事件名为键，收到解析后的数据；
+  // "error" 同时承接服务端 error 事件与连接错误（后者数据为 null）。
+  // 浏览器不支持 EventSource 时返回 null，调用方退回轮询。
+  function subscribe(path, handlers) {
+    if (typeof EventSource === "undefined") return null;
+    var source = new EventSource(path);
+    Object.keys(handlers).forEach(function (name) {
+      source.addEventListener(name, function (e) {
+        var data = null;
+        if (e.data) {
+          try {
+            data = JSON.parse(e.data);
+          } catch (_parseErr) {
+            data = null;
+          }
+        }
+        handlers[name](data, source);
+      });
+    });
+    return source;
+  }
+
   window.Game = window.Game || {};
   window.Game.api = {
     login: function (username, password) {
@@ -95,6 +184,9 @@
     getPrecomputeStatus: function (id) {
       return request("GET", "/api/games/" + id + "/neighbors/precompute/");
     },
+    watchPrecomputeStatus: function (id, handlers) {
+      return subscribe("/api/games/" + id + "/neighbors/precompute/?stream=1", handlers);
+    },
     setTaxRate: function (id, rate) {
       return request("POST", "/api/games/" + id + "/tax-rate/", { tax_rate: rate });
     },
@@ -143,6 +235,11 @@
       if (speakerRole) body.speaker_role = speakerRole;
       return request("POST", "/api/games/" + gameId + "/negotiations/" + sessionId + "/chat/", body);
     },
+    streamNegotiationChat: function (gameId, sessionId, message, speakerRole, onDelta) {
+      var body = { message: message };
+      if (speakerRole) body.speaker_role = speakerRole;
+      return streamRequest("/api/games/" + gameId + "/negotiations/" + sessionId + "/chat/?stream=1", body, onDelta);
+    },
     getNegotiationHistory: function (gameId, sessionId) {
       return request("GET", "/api/games/" + gameId + "/negotiations/" + sessionId + "/chat/");
     },
@@ -160,6 +257,9 @@
     chatWithAgent: function (gameId, agentId, message) {
       return request("POST", "/api/games/" + gameId + "/agents/" + agentId + "/chat/", { message: message });
     },
+    streamChatWithAgent: function (gameId, agentId, message, onDelta) {
+      return streamRequest("/api/games/" + gameId + "/agents/" + agentId + "/chat/?stream=1", { message: message }, onDelta);
+    },
     getAgentChatHistory: function (gameId, agentId) {
       return request("GET", "/api/games/" + gameId + "/agents/" + agentId + "/chat/");
     },
@@ -175,8 +275,11 @@
     getNeighborDetail: function (gameId, neighborId) {
       return request("GET", "/api/games/" + gameId + "/neighbors/" + neighborId + "/");
     },
-    getNeighborEvents: function (gameId, neighborId, limit) {
-      var qs = limit ? "?limit=" + limit : "";
+    getNeighborEvents: function (gameId, neighborId, limit, cursor) {
+      var params = [];
+      if (limit) params.push("limit=" + encodeURIComponent(limit));
+      if (cursor) params.push("cursor=" + encodeURIComponent(cursor));
+      var qs = params.length > 0 ? "?" + params.join("&") : "";
       return request("GET", "/api/games/" + gameId + "/neighbors/" + neighborId + "/events/" + qs);
     },
     getNeighborSummaryV2: function (gameId, neighborId) {
@@ -210,6 +313,9 @@
     getPrefecturePrecomputeStatus: function (gameId) {
       return request("GET", "/api/prefecture/" + gameId + "/precompute/");
     },
+    watchPrefecturePrecomputeStatus: function (gameId, handlers) {
+      return subscribe("/api/prefecture/" + gameId + "/precompute/?stream=1", handlers);
+    },
     advancePrefectureMonth: function (gameId) {
       return request("POST", "/api/prefecture/" + gameId + "/advance/", {});
     },
@@ -247,13 +353,17 @@
       return request("POST", "/api/prefecture/" + gameId + "/judicial/decide/", { case_id: caseId, action: action });
     },
     // Event logs
-    getEventLogs: function (gameId, category, season, limit) {
+    getEventLogs: function (gameId, category, season, limit, cursor) {
       var params = [];
       if (category) params.push("category=" + encodeURIComponent(category));
       if (season) params.push("season=" + encodeURIComponent(season));
       if (limit) params.push("limit=" + encodeURIComponent(limit));
+      if (cursor) params.push("cursor=" + encodeURIComponent(cursor));
       var qs = params.length > 0 ? "?" + params.join("&") : "";
       return request("GET", "/api/games/" + gameId + "/events/" + qs);
     },
+    getSettlementReport: function (gameId, logId) {
+      return request("GET", "/api/games/" + gameId + "/events/" + logId + "/settlement-report/");
+    },
   };
 })();
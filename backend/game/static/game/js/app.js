@@ -461,7 +461,7 @@
         if (data.current_season > 36) {
           components.showToast("三年任期已满！", "info");
         } else {
-          api.precomputePrefecture(data.game_id).catch(function () {});
+          // 推进后服务端已自动排队下月预推演
           startPrefecturePrecomputePolling(data.game_id);
         }
       })
@@ -531,7 +531,6 @@
         Game.state.prefectureGame = data;
         refreshPrefectureTabVisibility(data);
         Game.prefecture.renderOverview(data);
-        api.precomputePrefecture(data.game_id).catch(function () {});
         startPrefecturePrecomputePolling(data.game_id);
       })
       .catch(function (err) {
@@ -619,7 +618,6 @@
         Game.state.prefectureGame = data;
         refreshPrefectureTabVisibility(data);
         Game.prefecture.renderOverview(data);
-        api.precomputePrefecture(data.game_id).catch(function () {});
         startPrefecturePrecomputePolling(data.game_id);
       })
       .catch(function (err) {
@@ -717,9 +715,6 @@
       .then(function (result) {
         components.showToast(result.response || "指令已下达", "success");
         el("pref-directive-modal").classList.add("hidden");
-        return api.precomputePrefecture(pg.game_id).catch(function () {});
-      })
-      .then(function () {
         startPrefecturePrecomputePolling(pg.game_id);
       })
       .catch(function (err) {
@@ -1092,62 +1087,162 @@
 
   // ==================== Advance Season ====================
 
-  // 邻县预计算轮询
-  var _precomputeTimer = null;
+  // 预计算进度：优先订阅 SSE 推送（逐县完成即刷新），不支持或连接失败时退回 3 秒轮询。
+  // 服务端对 idle（尚无预计算）只推快照即断开：此时关闭订阅，3 秒后单次查询，
+  // 已开始则重新订阅，仍为 idle 则停止（下次推进后会再次调用）。
+  // render(data) 刷新状态文字；轮询时它返回 true 即停止。data 为 null 表示查询失败。
+  function trackPrecompute(watch, poll, render) {
+    var tracker = { source: null, timer: null, recheck: null };
+    tracker.stop = function () {
+      if (tracker.source) {
+        tracker.source.close();
+        tracker.source = null;
+      }
+      if (tracker.timer) {
+        clearInterval(tracker.timer);
+        tracker.timer = null;
+      }
+      if (tracker.recheck) {
+        clearTimeout(tracker.recheck);
+        tracker.recheck = null;
+      }
+    };
+
+    function startPolling() {
+      tracker.timer = setInterval(function () {
+        poll()
+          .then(function (data) {
+            if (render(data)) tracker.stop();
+          })
+          .catch(function () {
+            tracker.stop();
+            render(null);
+          });
+      }, 3000);
+    }
+
+    function progress(status) {
+      return function (data) {
+        render({
+          status: status,
+          completed_count: data.completed_count || 0,
+          failed_count: data.failed_count || 0,
+          expected_count: data.expected_count,
+        });
+        if (status === "done") tracker.stop();
+      };
+    }
+
+    function recheckOnce() {
+      tracker.recheck = setTimeout(function () {
+        tracker.recheck = null;
+        poll()
+          .then(function (data) {
+            render(data);
+            if (data.status === "computing") subscribe();
+          })
+          .catch(function () {
+            render(null);
+          });
+      }, 3000);
+    }
+
+    function subscribe() {
+      tracker.source = watch({
+        status: function (data) {
+          render(data);
+          if (data.status === "done") {
+            tracker.stop();
+          } else if (data.status === "idle") {
+            tracker.stop();
+            recheckOnce();
+          }
+        },
+        started: progress("computing"),
+        progress: progress("computing"),
+        done: progress("done"),
+        reset: function () {
+          render({ status: "idle", completed_count: 0 });
+        },
+        error: function (data, source) {
+          // 计算中途服务端超时断开后 EventSource 会自动重连并重新推送快照，无需处理
+          if (data === null && source.readyState !== EventSource.CLOSED) return;
+          tracker.stop();
+          startPolling();
+        },
+      });
+      if (!tracker.source) startPolling();
+    }
+
+    subscribe();
+    return tracker;
+  }
+
+  function precomputeProgressText(label, data) {
+    if (!data.expected_count) return label + "施政预计算中...";
+    return label + "施政预计算中（" + data.completed_count + "/" + data.expected_count + "）";
+  }
+
+  var _precomputeTracker = null;
   function startPrecomputePolling(gameId) {
     stopPrecomputePolling();
     var statusEl = el("neighbor-precompute-status");
     if (statusEl) statusEl.textContent = "";
 
-    _precomputeTimer = setInterval(function () {
-      api.getPrecomputeStatus(gameId)
-        .then(function (data) {
-          if (data.status === "done") {
-            stopPrecomputePolling();
-            if (statusEl) statusEl.textContent = "各邻县施政决策已就绪";
-          }
-        })
-        .catch(function () {
-          stopPrecomputePolling();
-        });
-    }, 3000);
+    _precomputeTracker = trackPrecompute(
+      function (handlers) { return api.watchPrecomputeStatus(gameId, handlers); },
+      function () { return api.getPrecomputeStatus(gameId); },
+      function (data) {
+        if (!statusEl || !data) return true;
+        if (data.status === "done") {
+          statusEl.textContent = "各邻县施政决策已就绪";
+          return true;
+        }
+        statusEl.textContent = data.status === "computing" ? precomputeProgressText("邻县", data) : "";
+        return false;
+      }
+    );
   }
 
   function stopPrecomputePolling() {
-    if (_precomputeTimer) {
-      clearInterval(_precomputeTimer);
-      _precomputeTimer = null;
+    if (_precomputeTracker) {
+      _precomputeTracker.stop();
+      _precomputeTracker = null;
     }
   }
 
-  var _prefPrecomputeTimer = null;
+  var _prefPrecomputeTracker = null;
   function startPrefecturePrecomputePolling(gameId) {
     stopPrefecturePrecomputePolling();
     var statusEl = el("pref-precompute-status");
     if (statusEl) statusEl.textContent = "下辖州县施政预推演中...";
 
-    _prefPrecomputeTimer = setInterval(function () {
-      api.getPrefecturePrecomputeStatus(gameId)
-        .then(function (data) {
-          if (data.status === "done") {
-            stopPrefecturePrecomputePolling();
-            if (statusEl) statusEl.textContent = "下辖州县施政决策已就绪";
-          } else if (data.status === "idle") {
-            stopPrefecturePrecomputePolling();
-            if (statusEl) statusEl.textContent = "";
-          }
-        })
-        .catch(function () {
-          stopPrefecturePrecomputePolling();
+    _prefPrecomputeTracker = trackPrecompute(
+      function (handlers) { return api.watchPrefecturePrecomputeStatus(gameId, handlers); },
+      function () { return api.getPrefecturePrecomputeStatus(gameId); },
+      function (data) {
+        if (!data) {
           if (statusEl) statusEl.textContent = "";
-        });
-    }, 3000);
+          return true;
+        }
+        if (data.status === "done") {
+          if (statusEl) statusEl.textContent = "下辖州县施政决策已就绪";
+          return true;
+        }
+        if (data.status === "idle") {
+          if (statusEl) statusEl.textContent = "";
+          return true;
+        }
+        if (statusEl) statusEl.textContent = precomputeProgressText("下辖州县", data);
+        return false;
+      }
+    );
   }
 
   function stopPrefecturePrecomputePolling() {
-    if (_prefPrecomputeTimer) {
-      clearInterval(_prefPrecomputeTimer);
-      _prefPrecomputeTimer = null;
+    if (_prefPrecomputeTracker) {
+      _prefPrecomputeTracker.stop();
+      _prefPrecomputeTracker = null;
     }
   }
 
@@ -1256,7 +1351,7 @@
             Game.setGame(data);
             btn.disabled = false;
             btn.textContent = "推进月份";
-            api.precomputeNeighbors(g.id).catch(function () {});
+            // 推进后服务端已自动排队下月预计算，这里只跟踪进度
             startPrecomputePolling(g.id);
           });
         }
@@ -1482,10 +1577,11 @@
     });
     input.value = "";
 
-    api.sendNegotiationChat(g.id, session.id, message, speakerRole)
+    var reply = components.streamingNegotiationMessage();
+    api.streamNegotiationChat(g.id, session.id, message, speakerRole, reply.push)
       .then(function (result) {
-        // Show agent response
-        components.appendNegotiationMessage("agent", result.dialogue);
+        // Show agent response (final text replaces the streamed draft)
+        reply.finish(result.dialogue);
 
         // Update subtitle
         el("nego-subtitle").textContent =
@@ -1629,16 +1725,25 @@
   });
 
   // ==================== Event Logs (县志) ====================
-  function loadEventLogs() {
+  var eventLogsCursor = null;
+
+  function loadEventLogs(append) {
     var g = Game.state.currentGame;
     if (!g) return;
 
     var category = el("events-category-filter").value;
-    el("events-list").innerHTML = '<p class="hint">加载中...</p>';
+    var moreBtn = el("btn-more-events");
+    if (append !== true) {
+      eventLogsCursor = null;
+      el("events-list").innerHTML = '<p class="hint">加载中...</p>';
+    }
+    moreBtn.classList.add("hidden");
 
-    api.getEventLogs(g.id, category, null, 100)
-      .then(function (logs) {
-        components.renderEventLogs(logs);
+    api.getEventLogs(g.id, category, null, 50, append === true ? eventLogsCursor : null)
+      .then(function (page) {
+        components.renderEventLogs(page.results, append === true);
+        eventLogsCursor = page.next_cursor;
+        if (eventLogsCursor) moreBtn.classList.remove("hidden");
       })
       .catch(function (err) {
         el("events-list").innerHTML = '<p class="hint">加载失败</p>';
@@ -1647,6 +1752,7 @@
 
   el("events-category-filter").addEventListener("change", loadEventLogs);
   el("btn-refresh-events").addEventListener("click", loadEventLogs);
+  el("btn-more-events").addEventListener("click", function () { loadEventLogs(true); });
 
   // Auto-load when tab is activated
   var origShowTab = Game.screens.showTab;
@@ -1932,9 +2038,10 @@
     components.appendStaffChatMessage("player", message);
     input.value = "";
 
-    api.chatWithAgent(g.id, agentId, message)
+    var reply = components.streamingStaffChatMessage();
+    api.streamChatWithAgent(g.id, agentId, message, reply.push)
       .then(function (result) {
-        components.appendStaffChatMessage("agent", result.dialogue);
+        reply.finish(result.dialogue);
       })
       .catch(function (err) {
         components.showToast(err.message || "对话失败", "error");
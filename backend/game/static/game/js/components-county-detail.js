@@ -454,7 +454,8 @@
     if (normalized.source === "neighbor") {
       body.innerHTML = '<p class="hint">加载中...</p>';
       Game.api.getNeighborEvents(gameId, normalized.ref_id, 150)
-        .then(function (events) {
+        .then(function (page) {
+          var events = page.results;
           if (!events || !events.length) {
             body.innerHTML = '<p class="hint">暂无事件记录</p>';
             return;
@@ -218,6 +218,7 @@
       tsHtml);
     container.appendChild(div);
     container.scrollTop = container.scrollHeight;
+    return div.querySelector(".nego-msg-content");
   }
 
   function showNegotiationResolved(result) {
@@ -286,47 +287,29 @@
     PROMISE: "#8e44ad",
   };
 
-  function getSettlementPayload(logData) {
-    if (!logData) return null;
-    if (logData.settlement_report) return logData.settlement_report;
-    if (!logData.events && !logData.monthly_snapshot && !logData.autumn && !logData.winter_snapshot) {
-      return null;
-    }
-    var payload = {};
-    if (logData.events) payload.events = logData.events;
-    if (logData.monthly_snapshot) payload.monthly_snapshot = logData.monthly_snapshot;
-    if (logData.population_update) payload.population_update = logData.population_update;
-    if (logData.autumn) payload.autumn = logData.autumn;
-    if (logData.winter_snapshot) payload.winter_snapshot = logData.winter_snapshot;
-    return payload;
-  }
-
-  function renderEventLogs(logs) {
+  function renderEventLogs(logs, append) {
     var container = el("events-list");
-    container.innerHTML = "";
+    if (!append) container.innerHTML = "";
 
-    if (!logs || logs.length === 0) {
+    if (!append && (!logs || logs.length === 0)) {
       container.innerHTML = '<p class="hint">暂无事件记录</p>';
       return;
     }
 
-    logs.forEach(function (log) {
+    (logs || []).forEach(function (log) {
       var catLabel = CATEGORY_LABELS[log.category] || log.category;
       var catColor = CATEGORY_COLORS[log.category] || "#8a7a5a";
       var seasonText = Game.seasonName(log.season);
       var extraHtml = "";
 
-      if (log.category === "SETTLEMENT") {
-        var settlementPayload = getSettlementPayload(log.data);
-        if (settlementPayload) {
-          extraHtml =
-            '<details class="event-log-settlement-details">' +
-              "<summary>查看当月月报</summary>" +
-              '<pre class="event-log-settlement-json">' +
-                escapeHtml(JSON.stringify(settlementPayload, null, 2)) +
-              "</pre>" +
-            "</details>";
-        }
+      // 列表默认不带 data，月报展开时再按需拉取
+      var lazyReport = log.category === "SETTLEMENT" && log.event_type === "season_settlement";
+      if (lazyReport) {
+        extraHtml =
+          '<details class="event-log-settlement-details">' +
+            "<summary>查看当月月报</summary>" +
+            '<pre class="event-log-settlement-json">加载中...</pre>' +
+          "</details>";
       }
 
       var item = h("div", "event-log-item");
@@ -337,10 +320,29 @@
         '</div>' +
         '<div class="event-log-desc">' + escapeHtml(log.description || log.event_type) + '</div>' +
         extraHtml;
+      if (lazyReport) bindLazySettlementReport(item.querySelector("details"), log.id);
       container.appendChild(item);
     });
   }
 
+  function bindLazySettlementReport(details, logId) {
+    var loaded = false;
+    details.addEventListener("toggle", function () {
+      if (!details.open || loaded) return;
+      loaded = true;
+      var pre = details.querySelector("pre");
+      var g = Game.state.currentGame;
+      Game.api.getSettlementReport(g.id, logId)
+        .then(function (report) {
+          pre.textContent = JSON.stringify(report, null, 2);
+        })
+        .catch(function () {
+          loaded = false;
+          pre.textContent = "月报加载失败";
+        });
+    });
+  }
+
   // ==================== Relationships ====================
 
   function renderRelationships(agents) {
@@ -669,6 +671,26 @@
     );
     container.appendChild(div);
     container.scrollTop = container.scrollHeight;
+    return div.querySelector(".nego-msg-text");
+  }
+
+  // 流式回复：首个增量到达时插入气泡，之后逐段追加；返回 {push, finish}
+  function streamingMessage(append, containerId) {
+    var node = null;
+    function ensure() {
+      if (!node) node = append("agent", "");
+      return node;
+    }
+    return {
+      push: function (text) {
+        ensure().textContent += text;
+        var container = el(containerId);
+        container.scrollTop = container.scrollHeight;
+      },
+      finish: function (finalText) {
+        ensure().textContent = finalText;
+      },
+    };
   }
 
   // Export
@@ -685,4 +707,10 @@
   C.renderStaffTab = renderStaffTab;
   C.openStaffChat = openStaffChat;
   C.appendStaffChatMessage = appendStaffChatMessage;
+  C.streamingStaffChatMessage = function () {
+    return streamingMessage(appendStaffChatMessage, "staff-chat-messages");
+  };
+  C.streamingNegotiationMessage = function () {
+    return streamingMessage(appendNegotiationMessage, "nego-messages");
+  };
 })();
@@ -0,0 +1,60 @@
+"""Celery 任务 — AI 决策预计算
+
+编排任务按 (game, season) 幂等认领后，按县拆分为子任务并行执行；
+每个子任务独立写入 NeighborPrecompute，worker 丢失只影响单个县。
+"""
+
+import logging
+
+from celery import group, shared_task
+
+from .services.neighbor import NeighborService
+from .services.precompute import PrecomputeStore
+from .services.prefecture import PrefectureService
+
+logger = logging.getLogger('game')
+
+
+@shared_task(ignore_result=True)
+def precompute_neighbor_decisions(game_id, season):
+    """邻县预计算编排：认领后为每个邻县派发子任务"""
+    try:
+        neighbor_ids = NeighborService.start_precompute(game_id, season)
+    except Exception:
+        logger.warning("Neighbor precompute dispatch failed", exc_info=True)
+        # 标记完成以免 advance 永远等
+        key = PrecomputeStore.task_key(NeighborService.PRECOMPUTE_KIND, game_id, season)
+        PrecomputeStore.abandon(game_id, key)
+        return
+    if neighbor_ids:
+        group(
+            precompute_neighbor_decision.s(game_id, season, neighbor_id)
+            for neighbor_id in neighbor_ids
+        ).apply_async()
+
+
+@shared_task(ignore_result=True, acks_late=True)
+def precompute_neighbor_decision(game_id, season, neighbor_id):
+    NeighborService.precompute_single(game_id, season, neighbor_id)
+
+
+@shared_task(ignore_result=True)
+def precompute_prefecture_decisions(game_id, season):
+    """府级预推演编排：认领后为每个下辖县派发子任务"""
+    try:
+        unit_ids = PrefectureService.start_precompute(game_id, season)
+    except Exception:
+        logger.warning("Prefecture precompute dispatch failed", exc_info=True)
+        key = PrecomputeStore.task_key(PrefectureService.PRECOMPUTE_KIND, game_id, season)
+        PrecomputeStore.abandon(game_id, key, drop=True)
+        return
+    if unit_ids:
+        group(
+            precompute_prefecture_county.s(game_id, season, unit_id)
+            for unit_id in unit_ids
+        ).apply_async()
+
+
+@shared_task(ignore_result=True, acks_late=True)
+def precompute_prefecture_county(game_id, season, unit_id):
+    PrefectureService.precompute_single(game_id, season, unit_id)
@@ -0,0 +1,122 @@
+"""AI governor negotiation planning: LLM calls happen before settlement, never inside it."""
+
+from unittest.mock import patch
+
+import pytest
+
+from game.services.ai_negotiation import NEGOTIATION_PLAN_KEY, AIGovernorNegotiationService
+from game.services.county import CountyService
+from game.services.settlement import SettlementService
+from llm.client import AsyncLLMClient, LLMClient
+
+
+def _county():
+    county = CountyService.create_initial_county(county_type="fiscal_core")
+    county["bailiff_level"] = 1
+    county["active_investments"] = [{"action": "build_irrigation", "completion_season": 99}]
+    county["governor_meta"] = {"name": "测试知县", "county_name": "测试县"}
+    return county
+
+
+@pytest.fixture
+def llm_forbidden(monkeypatch):
+    def _forbidden(*args, **kwargs):
+        raise AssertionError("LLM must not be called during settlement")
+
+    monkeypatch.setattr(LLMClient, "_complete", _forbidden)
+    monkeypatch.setattr(AsyncLLMClient, "_complete", _forbidden)
+
+
+def test_plan_negotiations_many_batches_stances(settings, monkeypatch):
+    settings.AI_NEGOTIATION_ENABLED = True
+    calls = []
+
+    async def fake_turn(cls, client, meta, profile, village, event_type, *args):
+        calls.append((event_type, village["name"]))
+        return "press_hard"
+
+    monkeypatch.setattr(AIGovernorNegotiationService, "_governor_turn", classmethod(fake_turn))
+    counties = [_county(), _county()]
+
+    with patch.object(SettlementService, "_estimate_monthly_surplus_per_capita", return_value=0), \
+            patch("game.services.ai_negotiation.random.random", return_value=0.0):
+        AIGovernorNegotiationService.plan_negotiations_many(counties, month=3)
+
+    for county in counties:
+        plan = county[NEGOTIATION_PLAN_KEY]
+        assert set(plan) == {"annexation", "hidden_land"}
+        first_village = county["villages"][0]["name"]
+        assert plan["annexation"]["village"] == first_village
+        assert all(stance == "press_hard" for stance in plan["annexation"]["stances"] + plan["hidden_land"]["stances"])
+    # 策略针对掷中的村庄推演
+    assert {name for _, name in calls} == {c["villages"][0]["name"] for c in counties}
+    assert sum(event == "annexation" for event, _ in calls) >= 2
+    assert sum(event == "hidden_land" for event, _ in calls) >= 2
+
+
+def test_plan_skips_llm_when_no_event_triggers(settings, monkeypatch):
+    settings.AI_NEGOTIATION_ENABLED = True
+    monkeypatch.setattr(AIGovernorNegotiationService, "_plan_all", None)  # 不应被调用
+    county = _county()
+
+    with patch.object(SettlementService, "_estimate_monthly_surplus_per_capita", return_value=0), \
+            patch("game.services.ai_negotiation.random.random", return_value=0.99):
+        AIGovernorNegotiationService.plan_negotiations_many([county], month=3)
+
+    assert county[NEGOTIATION_PLAN_KEY] == {
+        "annexation": {"village": None, "stances": []},
+        "hidden_land": {"village": None, "stances": []},
+    }
+
+    # 结算沿用掷定结果：即便结算时的随机数必然命中也不再触发
+    report = {"season": 3, "events": []}
+    with patch.object(SettlementService, "_estimate_monthly_surplus_per_capita", return_value=0), \
+            patch("game.services.settlement.random.random", return_value=0.0):
+        SettlementService._check_annexation(county, 3, report)
+        SettlementService._check_hidden_land(county, report)
+    assert not any("兼并" in e or "隐" in e for e in report["events"])
+
+
+def test_plan_is_noop_when_ai_negotiation_disabled(settings):
+    settings.AI_NEGOTIATION_ENABLED = False
+    county = _county()
+
+    AIGovernorNegotiationService.plan_negotiations_many([county], month=3)
+
+    assert NEGOTIATION_PLAN_KEY not in county
+
+
+def test_negotiation_uses_planned_stances_without_llm(settings, llm_forbidden):
+    settings.AI_NEGOTIATION_ENABLED = True
+    county = _county()
+    village = county["villages"][0]
+    county[NEGOTIATION_PLAN_KEY] = {"annexation": {"village": village["name"], "stances": ["back_down", "back_down"]}}
+
+    stopped, events = AIGovernorNegotiationService.run_annexation_negotiation(county, village)
+
+    assert not stopped
+    assert all("退让示弱" in e for e in events)
+
+    # 计划针对的是别的村：不套用预定策略
+    _, events = AIGovernorNegotiationService.run_annexation_negotiation(county, county["villages"][1])
+    assert not any("退让示弱" in e for e in events)
+
+    # 未预定的事件类型回退规则引擎
+    ratio, events = AIGovernorNegotiationService.run_hidden_land_negotiation(
+        county, county["villages"][0], 100,
+    )
+    assert 0 < ratio <= 1
+    assert events
+
+
+def test_settle_county_makes_no_llm_calls_and_drops_plan(settings, llm_forbidden):
+    settings.AI_NEGOTIATION_ENABLED = True
+    county = _county()
+    county[NEGOTIATION_PLAN_KEY] = {
+        "hidden_land": {"village": county["villages"][0]["name"], "stances": ["persuade", "persuade"]},
+    }
+
+    for month in range(1, 4):
+        SettlementService.settle_county(county, month, {"season": month, "events": []})
+
+    assert NEGOTIATION_PLAN_KEY not in county
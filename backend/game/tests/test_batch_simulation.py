@@ -0,0 +1,43 @@
+"""Headless batch simulation tests (no database access)."""
+
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+from game.services.simulation import BatchSimulationService, simulate_county
+
+
+def test_simulate_county_is_deterministic_and_orm_free():
+    # 无 django_db 标记：任何 ORM 访问都会直接报错
+    rows = simulate_county(0, seed=42, months=12)
+    again = simulate_county(0, seed=42, months=12)
+
+    assert [r["season"] for r in rows] == list(range(1, 13))
+    assert rows == again
+    assert {"treasury", "total_population", "morale", "county_type"} <= set(rows[0])
+
+
+def test_batch_run_streams_jsonl(tmp_path):
+    out = tmp_path / "sim.jsonl"
+
+    stats = BatchSimulationService.run(counties=3, months=4, workers=1, output=str(out))
+
+    lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert stats["county_months"] == 12
+    assert len(lines) == 12
+    assert {row["county"] for row in lines} == {0, 1, 2}
+    assert stats["county_months_per_second"] > 0
+
+
+def test_simulate_counties_command_with_process_pool(tmp_path):
+    out = tmp_path / "sim.jsonl"
+    stdout = StringIO()
+
+    call_command(
+        "simulate_counties", "--counties", "4", "--months", "2", "--workers", "2",
+        "--output", str(out), stdout=stdout,
+    )
+
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 8
+    assert "county-months/s" in stdout.getvalue()
@@ -0,0 +1,100 @@
+"""Keyset pagination and field projection for event log endpoints."""
+
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from game.models import EventLog, GameState, NeighborCounty, NeighborEventLog
+from game.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def game(client):
+    user = get_user_model().objects.create_user(username=f"u_events_{uuid4().hex[:8]}", password="pw")
+    client.force_login(user)
+    return GameState.objects.create(user=user, current_season=37, county_data={})
+
+
+def _chronicle(game, months=36):
+    EventLog.objects.bulk_create([
+        EventLog(
+            game=game, season=month, event_type="season_settlement", category="SETTLEMENT",
+            description=f"{month}月结算", data={"events": [f"e{month}"] * 50},
+        )
+        for month in range(1, months + 1)
+    ])
+
+
+def _walk(client, url, limit):
+    pages, cursor = [], None
+    while True:
+        suffix = f"&cursor={cursor}" if cursor else ""
+        body = client.get(f"{url}?limit={limit}{suffix}").json()
+        pages.append(body["results"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def test_cursor_round_trip():
+    now = timezone.now()
+    assert decode_cursor(encode_cursor(now, 42)) == (now, 42)
+
+
+@pytest.mark.django_db
+def test_keyset_pages_cover_chronicle_newest_first(client, game):
+    _chronicle(game)
+
+    pages = _walk(client, f"/api/games/{game.id}/events/", 10)
+
+    assert [len(page) for page in pages] == [10, 10, 10, 6]
+    ids = [row["id"] for page in pages for row in page]
+    assert len(set(ids)) == 36
+    assert ids == sorted(ids, reverse=True)  # 同一时间戳内按 id 倒序
+    assert all("data" not in row for page in pages for row in page)
+
+
+@pytest.mark.django_db
+def test_page_cost_is_constant_and_data_is_deferred(client, game):
+    _chronicle(game)
+    first = client.get(f"/api/games/{game.id}/events/?limit=5").json()
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(f"/api/games/{game.id}/events/?limit=5&cursor={first['next_cursor']}")
+
+    list_sql = [q["sql"] for q in ctx.captured_queries if 'FROM "event_logs"' in q["sql"]]
+    assert len(list_sql) == 1
+    assert "OFFSET" not in list_sql[0]
+    assert '"event_logs"."data"' not in list_sql[0]
+
+
+@pytest.mark.django_db
+def test_fields_projection(client, game):
+    _chronicle(game, months=2)
+    url = f"/api/games/{game.id}/events/"
+
+    row = client.get(f"{url}?fields=season,data").json()["results"][0]
+    assert set(row) == {"id", "season", "data"}
+    assert row["data"]["events"][0] == "e2"
+    assert "category_display" in client.get(f"{url}?fields=all").json()["results"][0]
+    assert client.get(f"{url}?cursor=not-a-cursor").status_code == 400
+
+
+@pytest.mark.django_db
+def test_neighbor_events_are_paginated(client, game):
+    neighbor = NeighborCounty.objects.create(
+        game=game, county_name="邻县", governor_name="某", governor_style="minben", county_data={},
+    )
+    NeighborEventLog.objects.bulk_create([
+        NeighborEventLog(neighbor_county=neighbor, season=m, event_type="season_settlement", data={"x": m})
+        for m in range(1, 8)
+    ])
+
+    pages = _walk(client, f"/api/games/{game.id}/neighbors/{neighbor.id}/events/", 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [row["season"] for row in pages[0]] == [7, 6, 5]
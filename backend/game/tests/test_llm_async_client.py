@@ -0,0 +1,154 @@
+"""AsyncLLMClient concurrency limit and batch helper tests."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from game.models import GameState
+from game.services.ai_governor import AIGovernorService
+from game.services.county import CountyService
+from game.services.neighbor import NeighborService
+from llm import client as client_module
+from llm.client import AsyncLLMClient, run_sync
+from llm.exceptions import LLMJSONParseError
+from llm.providers import ProviderConfig
+
+
+def _fake_client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _response(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=1),
+    )
+
+
+@pytest.fixture
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(client_module, "_limiters", {})
+
+
+def _client(settings, limit):
+    settings.LLM_MAX_CONCURRENCY = limit
+    config = ProviderConfig(name="fake", base_url="http://localhost", api_key="k", default_model="m")
+    return AsyncLLMClient(config=config, max_retries=1)
+
+
+def test_gather_respects_provider_concurrency_limit(settings, fresh_limiters):
+    client = _client(settings, limit=2)
+    in_flight = {"now": 0, "peak": 0}
+
+    async def create(**kwargs):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return _response(kwargs["messages"][0]["content"])
+
+    client._client = _fake_client(create)
+    batch = [[{"role": "user", "content": str(i)}] for i in range(6)]
+
+    results = run_sync(client.gather_chat(batch))
+
+    assert results == [str(i) for i in range(6)]
+    assert in_flight["peak"] == 2
+
+
+def test_limiter_holds_across_event_loops_and_survives_cancellation():
+    import threading
+
+    limiter = client_module._ProviderLimiter(1)
+    in_flight = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    async def work():
+        async with limiter:
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            with lock:
+                in_flight["now"] -= 1
+
+    async def batch():
+        await asyncio.gather(*(work() for _ in range(3)))
+
+    threads = [threading.Thread(target=run_sync, args=(batch(),)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert in_flight["peak"] == 1
+
+    async def cancel_waiter():
+        async with limiter:
+            waiter = asyncio.ensure_future(work())
+            await asyncio.sleep(0)
+            waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        # 被取消的 waiter 不占名额
+        await asyncio.wait_for(work(), timeout=1)
+
+    run_sync(cancel_waiter())
+    assert limiter._available == 1 and not limiter._waiters
+
+
+def test_gather_chat_json_returns_exceptions_in_place(settings, fresh_limiters):
+    client = _client(settings, limit=4)
+
+    async def create(**kwargs):
+        content = kwargs["messages"][0]["content"]
+        return _response(content if content != "bad" else "not json")
+
+    client._client = _fake_client(create)
+    batch = [[{"role": "user", "content": json.dumps({"i": 1})}],
+             [{"role": "user", "content": "bad"}]]
+
+    results = run_sync(client.gather_chat_json(batch))
+
+    assert results[0] == {"i": 1}
+    assert isinstance(results[1], LLMJSONParseError)
+
+
+def test_run_sync_inside_running_loop():
+    async def inner():
+        return run_sync(asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(inner()) == "ok"
+
+
+@pytest.mark.django_db
+def test_make_decisions_many_issues_requests_concurrently(settings, fresh_limiters, monkeypatch):
+    user = get_user_model().objects.create_user(username="u_async_llm", password="pw")
+    game = GameState.objects.create(
+        user=user,
+        current_season=1,
+        county_data=CountyService.create_initial_county(county_type="fiscal_core"),
+    )
+    neighbors = NeighborService.create_neighbors(game)
+    settings.LLM_PROVIDERS = {
+        name: {**cfg, "api_key": "k"} for name, cfg in settings.LLM_PROVIDERS.items()
+    }
+    state = {"now": 0, "peak": 0}
+
+    async def fake_chat_json(self, messages, **kwargs):
+        state["now"] += 1
+        state["peak"] = max(state["peak"], state["now"])
+        await asyncio.sleep(0.01)
+        state["now"] -= 1
+        return {"analysis": "并发决策"}
+
+    monkeypatch.setattr(AsyncLLMClient, "chat_json", fake_chat_json)
+
+    results = AIGovernorService.make_decisions_many(neighbors, season=1)
+
+    assert set(results) == {n.id for n in neighbors}
+    assert state["peak"] == len(neighbors)
+    for neighbor in neighbors:
+        assert results[neighbor.id][0].endswith("并发决策")
+        assert neighbor.last_reasoning.startswith("并发决策")
@@ -0,0 +1,49 @@
+"""Shared LLM client registry tests."""
+
+import threading
+
+import pytest
+
+from llm import client as client_module
+from llm.client import LLMClient, get_pool_stats, reset_client_pool
+from llm.providers import ProviderConfig
+
+CONFIG = ProviderConfig(name="fake", base_url="http://localhost:9", api_key="k", default_model="m")
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    reset_client_pool()
+    yield
+    reset_client_pool()
+
+
+def test_clients_share_connection_pool_per_provider_and_timeout():
+    a = LLMClient(config=CONFIG, timeout=20.0)
+    b = LLMClient(config=CONFIG, timeout=20.0)
+    c = LLMClient(config=CONFIG, timeout=10.0)
+
+    assert a._client is b._client
+    assert a._client is not c._client
+
+    stats = {s["timeout"]: s for s in get_pool_stats()}
+    assert stats[20.0]["provider"] == "fake"
+    assert stats[20.0]["checkouts"] == 2
+    assert stats[10.0]["checkouts"] == 1
+    assert stats[20.0]["open_connections"] in (0, None)
+
+
+def test_registry_creates_one_client_under_concurrent_access():
+    clients = []
+
+    def _make():
+        clients.append(LLMClient(config=CONFIG)._client)
+
+    threads = [threading.Thread(target=_make) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(c) for c in clients}) == 1
+    assert len(client_module._client_pool) == 1
@@ -0,0 +1,159 @@
+"""LLM per-call metrics tests."""
+
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from openai import APITimeoutError
+from rest_framework.test import APIClient
+
+from llm import metrics
+from llm.client import LLMClient, reset_client_pool
+from llm.providers import ProviderConfig
+
+CONFIG = ProviderConfig(name="fake", base_url="http://localhost:9", api_key="k", default_model="m")
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics(settings):
+    settings.LLM_METRICS_PUBLISH_INTERVAL = 0
+    metrics.reset(all_processes=True)
+    reset_client_pool()
+    yield
+    metrics.reset(all_processes=True)
+    reset_client_pool()
+
+
+def _client(fail_first=0):
+    state = {"calls": 0}
+
+    def create(**kwargs):
+        state["calls"] += 1
+        if state["calls"] <= fail_first:
+            raise APITimeoutError(request=None)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"ok": 1}'))],
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=5, total_tokens=17),
+        )
+
+    client = LLMClient(config=CONFIG, max_retries=3)
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client
+
+
+def test_calls_are_aggregated_per_tag_and_template(monkeypatch):
+    monkeypatch.setattr("llm.client.time.sleep", lambda _s: None)
+    client = _client(fail_first=1)
+
+    client.chat_json(MESSAGES, tag="negotiation", template="negotiation_annexation")
+    client.chat_json(MESSAGES, tag="negotiation", template="negotiation_annexation", cache=True)
+    client.chat_json(MESSAGES, tag="negotiation", template="negotiation_annexation", cache=True)
+    client.chat(MESSAGES, tag="bio")
+
+    rows = {(r["tag"], r["template"]): r for r in metrics.collect()}
+    neg = rows[("negotiation", "negotiation_annexation")]
+    assert neg["calls"] == 3
+    assert neg["cache_hits"] == 1
+    assert neg["retries"] == 1
+    assert neg["prompt_tokens"] == 24
+    assert neg["completion_tokens"] == 10
+    assert neg["latency_p95"] is not None
+
+    bio = rows[("bio", "")]
+    assert bio["calls"] == 1
+    assert bio["total_tokens"] == 17
+
+
+def test_failed_call_is_counted_as_error(monkeypatch):
+    monkeypatch.setattr("llm.client.time.sleep", lambda _s: None)
+    client = _client(fail_first=10)
+
+    with pytest.raises(Exception):
+        client.chat(MESSAGES, tag="promise")
+
+    (row,) = metrics.collect()
+    assert row["errors"] == 1
+    assert row["retries"] == 2
+
+
+def test_collect_merges_published_process_metrics():
+    _client().chat(MESSAGES, tag="ai_governor")
+    metrics.metrics.publish()
+
+    other = metrics.LLMMetrics()
+    other.process_key = "other-host:1"
+    other.record(provider="fake", model="m", tag="ai_governor",
+                 prompt_tokens=100, completion_tokens=1, latency=0.5)
+    other.publish()
+
+    (row,) = metrics.collect()
+    assert row["calls"] == 2
+    assert row["prompt_tokens"] == 112
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_admin_only():
+    _client().chat(MESSAGES, tag="agent_chat")
+    api = APIClient()
+
+    user = get_user_model().objects.create_user(username="u_metrics", password="pw")
+    api.force_authenticate(user=user)
+    assert api.get("/api/llm/metrics/").status_code == 403
+
+    admin = get_user_model().objects.create_user(username="u_metrics_admin", password="pw", is_staff=True)
+    api.force_authenticate(user=admin)
+    resp = api.get("/api/llm/metrics/")
+    assert resp.status_code == 200
+    assert resp.data["rows"][0]["tag"] == "agent_chat"
+    assert "pool" in resp.data
+
+
+def test_llm_metrics_command_prints_table():
+    _client().chat(MESSAGES, tag="role_review", template="term_peer_review_json")
+    out = StringIO()
+
+    call_command("llm_metrics", stdout=out)
+
+    assert "role_review" in out.getvalue()
+    assert "Total tokens: 17" in out.getvalue()
+
+
+def test_provider_cached_prompt_tokens_give_cache_rate():
+    client = LLMClient(config=CONFIG)
+    usage = SimpleNamespace(
+        prompt_tokens=200, completion_tokens=5, total_tokens=205,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=150),
+    )
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=usage,
+    )
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: response,
+    )))
+
+    client.chat(MESSAGES, tag="ai_governor", template="ai_governor_decision")
+
+    (row,) = metrics.collect()
+    assert row["cached_prompt_tokens"] == 150
+    assert row["prompt_cache_rate"] == 0.75
+
+
+def test_prefix_lookups_are_published_and_printed():
+    metrics.record_prefix_lookup("agent_full_chat_json", hit=False)
+    metrics.record_prefix_lookup("agent_full_chat_json", hit=True)
+    metrics.metrics.publish()
+
+    other = metrics.LLMMetrics()
+    other.process_key = "other-host:2"
+    other.record_prefix("agent_full_chat_json", hit=True)
+    other.publish()
+
+    (row,) = metrics.collect_prefix()
+    assert (row["hits"], row["misses"], row["hit_rate"]) == (2, 1, 0.667)
+
+    out = StringIO()
+    call_command("llm_metrics", stdout=out)
+    assert "Prompt prefix memo" in out.getvalue()
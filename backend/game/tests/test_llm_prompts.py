@@ -0,0 +1,69 @@
+"""Compiled prompt templates: output parity and static prefix memo."""
+
+import string
+
+import pytest
+
+from llm import metrics
+from llm.prompts import PromptRegistry, compile_template
+
+
+@pytest.fixture(autouse=True)
+def clean_prefix_cache(settings):
+    settings.LLM_METRICS_PUBLISH_INTERVAL = 3600
+    PromptRegistry.clear_prefix_cache()
+    metrics.reset()
+    yield
+    PromptRegistry.clear_prefix_cache()
+    metrics.reset()
+
+
+def _sample_kwargs(template, tag=""):
+    kwargs = {}
+    for text in (template.system, template.user):
+        for _literal, name, spec, _conv in string.Formatter().parse(text):
+            if name:
+                kwargs[name] = 0.25 if spec else f"<{name}{tag}>"
+    return kwargs
+
+
+@pytest.mark.parametrize("name", sorted(PromptRegistry.list_templates()))
+def test_compiled_render_matches_str_format(name):
+    template = PromptRegistry.list_templates()[name]
+    kwargs = _sample_kwargs(template)
+    expected = (template.system.format(**kwargs), template.user.format(**kwargs))
+
+    assert PromptRegistry.render(name, **kwargs) == expected
+    assert PromptRegistry.render(name, **kwargs) == expected  # 命中前缀缓存后仍一致
+
+
+def test_compile_template_splits_at_first_dynamic_field():
+    compiled = compile_template('{{"k": 1}} {a}-{b:.0%}|{c}{a}', static_fields=("a", "b"))
+
+    assert compiled.prefix == '{{"k": 1}} {a}-{b:.0%}|'
+    assert compiled.prefix_fields == ("a", "b")
+    assert compiled.suffix == "{c}{a}"
+
+
+def test_prefix_is_reused_across_dynamic_changes_only():
+    template = PromptRegistry.list_templates()["agent_full_chat_json"]
+    kwargs = _sample_kwargs(template)
+
+    first, _ = PromptRegistry.render("agent_full_chat_json", **kwargs)
+    second, _ = PromptRegistry.render("agent_full_chat_json", **{**kwargs, "memory_desc": "新记忆", "season": 7})
+    PromptRegistry.render("agent_full_chat_json", **{**kwargs, "bio": "另一位师爷"})
+
+    static_end = first.index("【人际关系】")
+    assert second[:static_end] == first[:static_end]
+    (row,) = metrics.collect_prefix(all_processes=False)
+    assert (row["hits"], row["misses"]) == (1, 2)
+
+
+def test_prefix_cache_is_bounded(settings):
+    settings.LLM_PROMPT_PREFIX_CACHE_SIZE = 2
+    template = PromptRegistry.list_templates()["agent_light_chat"]
+
+    for idx in range(4):
+        PromptRegistry.render("agent_light_chat", **_sample_kwargs(template, tag=idx))
+
+    assert len(PromptRegistry._prefix_cache) == 2
@@ -0,0 +1,95 @@
+"""LLM response cache tests."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from llm.cache import LocMemResponseCache, make_cache_key, reset_response_cache
+from llm.client import LLMClient, reset_client_pool
+from llm.providers import ProviderConfig
+
+CONFIG = ProviderConfig(name="fake", base_url="http://localhost:9", api_key="k", default_model="m")
+MESSAGES = [{"role": "user", "content": "为知县写一句简介"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_response_cache()
+    reset_client_pool()
+    yield
+    reset_response_cache()
+    reset_client_pool()
+
+
+@pytest.fixture
+def fake_client():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        content = '{"n": %d}' % len(calls)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=1),
+        )
+
+    client = LLMClient(config=CONFIG, max_retries=1)
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client, calls
+
+
+def test_cache_is_opt_in_per_call(fake_client):
+    client, calls = fake_client
+
+    assert client.chat(MESSAGES) == '{"n": 1}'
+    assert client.chat(MESSAGES) == '{"n": 2}'
+    assert client.chat(MESSAGES, cache=True) == '{"n": 3}'
+    assert client.chat(MESSAGES, cache=True) == '{"n": 3}'
+    assert len(calls) == 3
+
+
+def test_cache_key_covers_request_parameters(fake_client):
+    client, calls = fake_client
+
+    client.chat(MESSAGES, cache=True)
+    client.chat(MESSAGES, cache=True, temperature=0.2)
+    client.chat(MESSAGES, cache=True, json_mode=True)
+    client.chat(MESSAGES, cache=True, model="other")
+    assert len(calls) == 4
+
+    assert client.chat_json(MESSAGES, cache=True) == {"n": 3}
+    assert len(calls) == 4
+
+
+def test_chat_json_caches_only_validated_replies(fake_client):
+    client, calls = fake_client
+
+    def is_even(result):
+        return result["n"] % 2 == 0
+
+    assert client.chat_json(MESSAGES, cache=True, validate=is_even) == {"n": 1}
+    assert client.chat_json(MESSAGES, cache=True, validate=is_even) == {"n": 2}
+    assert client.chat_json(MESSAGES, cache=True, validate=is_even) == {"n": 2}
+    assert len(calls) == 2
+
+
+def test_locmem_cache_ttl_and_lru(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("llm.cache.time.monotonic", lambda: now[0])
+    cache = LocMemResponseCache(ttl=10, max_entries=2)
+
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"  # a 变为最近使用
+    cache.set("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_cache_key_is_stable():
+    key = make_cache_key("p", "m", MESSAGES, 0.7, False, 100)
+    assert key == make_cache_key("p", "m", [dict(MESSAGES[0])], 0.7, False, 100)
+    assert key != make_cache_key("p", "m", MESSAGES, 0.7, True, 100)
@@ -0,0 +1,194 @@
+"""Streaming LLM replies: incremental JSON field decoding and SSE chat endpoints."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from game.models import DialogueMessage, GameState
+from game.services import AgentService, CountyService
+from game.services.negotiation import NegotiationService
+from llm import metrics
+from llm.client import LLMClient, reset_client_pool
+from llm.providers import ProviderConfig, get_all_providers, get_provider
+from llm.streaming import JSONFieldStream, drain
+
+CONFIG = ProviderConfig(name="fake", base_url="http://localhost:9", api_key="k", default_model="m")
+REPLY = {
+    "reasoning": "先探口风 \"dialogue\": 不是这个",
+    "meta": {"dialogue": "嵌套字段不算"},
+    "dialogue": "大人明鉴，\"水利\"之事\n小人愿出资 五十两。",
+    "attitude_change": 2,
+    "new_memory": "",
+}
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _stream_chunks(text, size=3, include_usage=True):
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))], usage=None)
+        for part in _chunks(text, size)
+    ]
+    if include_usage:
+        # 与 OpenAI 兼容接口一致：只有请求 stream_options.include_usage 时才有 usage 块
+        chunks.append(SimpleNamespace(
+            choices=[], usage=SimpleNamespace(prompt_tokens=40, completion_tokens=12, total_tokens=52),
+        ))
+    return chunks
+
+
+def _fake_shared_client(text):
+    def create(**kwargs):
+        assert kwargs["stream"] is True
+        include_usage = (kwargs.get("stream_options") or {}).get("include_usage", False)
+        return iter(_stream_chunks(text, include_usage=include_usage))
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics(settings):
+    settings.LLM_METRICS_PUBLISH_INTERVAL = 3600
+    metrics.reset()
+    reset_client_pool()
+    yield
+    metrics.reset()
+    reset_client_pool()
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+def test_json_field_stream_decodes_across_chunk_boundaries(size):
+    raw = "```json\n" + json.dumps(REPLY) + "\n```"  # ensure_ascii 转义中文
+    extractor = JSONFieldStream("dialogue")
+
+    streamed = "".join(extractor.feed(part) for part in _chunks(raw, size))
+
+    assert streamed == REPLY["dialogue"]
+    assert extractor.text == REPLY["dialogue"]
+
+
+def test_chat_json_stream_yields_dialogue_and_returns_dict():
+    client = LLMClient(config=CONFIG)
+    client._client = _fake_shared_client(json.dumps(REPLY, ensure_ascii=False))
+
+    gen = client.chat_json_stream([{"role": "user", "content": "hi"}], tag="agent_chat")
+    deltas = []
+    try:
+        while True:
+            deltas.append(next(gen))
+    except StopIteration as stop:
+        result = stop.value
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == REPLY["dialogue"]
+    assert result == REPLY
+    (row,) = metrics.collect(all_processes=False)
+    assert row["prompt_tokens"] == 40
+    assert row["completion_tokens"] == 12
+    assert row["ttft_p50"] is not None
+
+
+def _sse_events(response):
+    body = b"".join(response.streaming_content).decode("utf-8")
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _game(client):
+    user = get_user_model().objects.create_user(username=f"u_stream_{uuid4().hex[:8]}", password="pw")
+    client.force_login(user)
+    county = CountyService.create_initial_county(county_type="fiscal_core")
+    game = GameState.objects.create(user=user, current_season=3, county_data=county)
+    AgentService.initialize_agents(game)
+    return game
+
+
+# 前端 streamRequest 同时带 ?stream=1 与 Accept: text/event-stream
+@pytest.mark.django_db
+@pytest.mark.parametrize("headers", [{}, {"HTTP_ACCEPT": "text/event-stream"}])
+def test_agent_chat_streams_sse_and_persists_reply(client, headers):
+    game = _game(client)
+    agent = game.agents.filter(tier="FULL").exclude(role="ADVISOR").first()
+
+    with patch("llm.client.get_shared_client",
+               return_value=_fake_shared_client(json.dumps(REPLY, ensure_ascii=False))):
+        response = client.post(
+            f"/api/games/{game.id}/agents/{agent.id}/chat/?stream=1",
+            {"message": "近来可好"}, content_type="application/json", **headers,
+        )
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        events = _sse_events(response)
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "done" and kinds.count("delta") > 1
+    assert "".join(data["text"] for kind, data in events if kind == "delta") == REPLY["dialogue"]
+    assert events[-1][1]["dialogue"] == REPLY["dialogue"]
+    saved = DialogueMessage.objects.filter(game=game, agent=agent, role="agent").get()
+    assert saved.content == REPLY["dialogue"]
+
+
+@pytest.mark.django_db
+def test_negotiation_round_stream_matches_sync_result(client):
+    game = _game(client)
+    gentry = game.agents.filter(role="GENTRY", role_title="地主").first()
+    village = gentry.attributes.get("village_name") or game.county_data["villages"][0]["name"]
+    session, err = NegotiationService.start_negotiation(
+        game, gentry, "ANNEXATION",
+        {"village_name": village, "current_pct": 0.35, "proposed_pct_increase": 0.05},
+    )
+    assert err is None
+    reply = {**REPLY, "willingness_to_stop": 0.4, "final_decision": None}
+
+    with patch("llm.client.get_shared_client",
+               return_value=_fake_shared_client(json.dumps(reply, ensure_ascii=False))), \
+            patch("game.services.promise.PromiseService.extract_and_save"):
+        events = _sse_events(client.post(
+            f"/api/games/{game.id}/negotiations/{session.id}/chat/?stream=1",
+            {"message": "此事再议"}, content_type="application/json", HTTP_ACCEPT="text/event-stream",
+        ))
+
+    done = events[-1][1]
+    assert events[-1][0] == "done"
+    assert done["dialogue"] == REPLY["dialogue"]
+    assert done["round"] == 1 and done["status"] == "active"
+
+
+@pytest.mark.django_db
+def test_stream_request_errors_render_as_sse_event(client):
+    game = _game(client)
+    response = client.post(
+        f"/api/games/{game.id}/agents/999999/chat/?stream=1",
+        {"message": "近来可好"}, content_type="application/json", HTTP_ACCEPT="text/event-stream",
+    )
+    assert response.status_code == 404
+    assert response["Content-Type"].startswith("text/event-stream")
+    assert response.content.decode("utf-8").startswith("event: error\n")
+
+
+def test_drain_returns_generator_result():
+    def gen():
+        yield "a"
+        return {"ok": True}
+
+    assert drain(gen()) == {"ok": True}
+
+
+def test_stream_usage_flag_survives_every_provider_lookup(settings):
+    settings.LLM_PROVIDERS = {
+        "compat": {
+            "base_url": "http://localhost", "api_key": "k", "default_model": "m",
+            "stream_usage": False,
+        },
+    }
+
+    assert get_provider("compat").stream_usage is False
+    assert get_all_providers()["compat"] == get_provider("compat")
@@ -4,8 +4,12 @@ from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from game.models import GameState, NeighborCounty, NeighborEventLog
+from game.models import GameState, NeighborCounty, NeighborEventLog, NeighborPrecompute, TermMonthMetric
+from game.services.ai_governor import AIGovernorService
+from game.services import precompute_events
 from game.services.county import CountyService
 from game.services.neighbor import NeighborService
 
@@ -59,7 +63,7 @@ def test_create_neighbors_persists_initial_baseline_fields():
 
 
 @pytest.mark.django_db
-@patch("game.services.neighbor.AIGovernorService.make_decisions", return_value=[])
+@patch("game.services.neighbor.AIGovernorService.make_decisions_many", return_value={})
 def test_advance_all_persists_structured_monthly_snapshot(_mock_decisions):
     game = _build_game()
     NeighborService.create_neighbors(game)
@@ -101,7 +105,7 @@ def test_advance_all_persists_structured_monthly_snapshot(_mock_decisions):
 
 
 @pytest.mark.django_db
-@patch("game.services.neighbor.AIGovernorService.make_decisions", return_value=[])
+@patch("game.services.neighbor.AIGovernorService.make_decisions_many", return_value={})
 def test_advance_all_backfills_missing_neighbor_baseline_for_old_saves(_mock_decisions):
     game = _build_game()
     county_data = CountyService.create_initial_county(county_type="coastal")
@@ -122,3 +126,170 @@ def test_advance_all_backfills_missing_neighbor_baseline_for_old_saves(_mock_dec
 
     assert neighbor.county_data.get("initial_villages"), "old saves should be backfilled"
     assert neighbor.county_data.get("initial_snapshot"), "old saves should be backfilled"
+
+
+@pytest.mark.django_db
+@patch("game.services.neighbor.AIGovernorService.make_decisions", return_value=[])
+def test_precompute_task_results_are_consumed_by_advance(mock_decisions):
+    from game.tasks import precompute_neighbor_decisions
+
+    game = _build_game()
+    NeighborService.create_neighbors(game)
+
+    precompute_neighbor_decisions.delay(game.id, 1)
+    precompute_neighbor_decisions.delay(game.id, 1)
+    assert mock_decisions.call_count == 5
+
+    status = NeighborService.get_precompute_status(game.id, 1)
+    assert status["status"] == "done"
+    assert status["completed_count"] == 5
+
+    with patch.object(AIGovernorService, "make_decisions_many", side_effect=AssertionError("should not compute")):
+        NeighborService.advance_all(game, season=1)
+    assert mock_decisions.call_count == 5
+    assert not NeighborPrecompute.objects.filter(game=game).exists()
+
+
+@pytest.mark.django_db
+@patch("game.services.neighbor.AIGovernorService.make_decisions", return_value=[])
+def test_advance_recomputes_only_neighbors_changed_after_precompute(_mock_decisions):
+    game = _build_game()
+    NeighborService.create_neighbors(game)
+    NeighborService.precompute_decisions(game.id, 1)
+
+    changed = NeighborCounty.objects.filter(game=game).order_by("id").first()
+    changed.county_data["peasant_grain_reserve"] = 1.0  # 例如玩家借粮
+    changed.save(update_fields=["county_data"])
+
+    with patch.object(AIGovernorService, "make_decisions_many", return_value={}) as mock_many:
+        NeighborService.advance_all(game, season=1)
+
+    recomputed = mock_many.call_args.args[0]
+    assert [n.id for n in recomputed] == [changed.id]
+
+
+@pytest.mark.django_db
+@patch("game.services.neighbor.AIGovernorService.make_decisions", return_value=[])
+def test_advance_view_schedules_next_month_precompute(mock_decisions, django_capture_on_commit_callbacks):
+    from rest_framework.test import APIClient
+
+    from game.models import PlayerProfile
+
+    game = _build_game()
+    PlayerProfile.objects.create(game=game, background="HUMBLE")
+    NeighborService.create_neighbors(game)
+    client = APIClient()
+    client.force_authenticate(user=game.user)
+
+    with patch.object(AIGovernorService, "make_decisions_many", return_value={}):
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = client.post(f"/api/games/{game.id}/advance/", {}, format="json")
+
+    assert resp.status_code == 200
+    precompute = NeighborPrecompute.objects.get(game=game)
+    assert precompute.season == 2
+    assert precompute.status == "done"
+    assert mock_decisions.call_count == 5
+    assert all(entry["input_digest"] for entry in precompute.results.values())
+
+
+@pytest.mark.django_db
+@patch("game.services.neighbor.AIGovernorService.make_decisions", return_value=[])
+def test_advance_consumes_partial_precompute_after_wait_timeout(mock_decisions, settings):
+    from game.services.precompute import PrecomputeStore
+
+    settings.PRECOMPUTE_ADVANCE_WAIT_SECONDS = 0.05
+    game = _build_game()
+    NeighborService.create_neighbors(game)
+    neighbor_ids = NeighborService.start_precompute(game.id, 1)
+    for neighbor_id in neighbor_ids[:3]:
+        NeighborService.precompute_single(game.id, 1, neighbor_id)
+
+    with CaptureQueriesContext(connection) as ctx:
+        results = PrecomputeStore.ready(game.id, 1, NeighborService.PRECOMPUTE_KIND)
+    assert sorted(results) == sorted(str(i) for i in neighbor_ids[:3])
+    # 等待期间只查状态，results 在结束等待后读取一次
+    assert sum('"results"' in q["sql"] for q in ctx.captured_queries) == 1
+
+    with patch.object(AIGovernorService, "make_decisions_many", return_value={}) as mock_many:
+        NeighborService.advance_all(game, season=1)
+    assert [n.id for n in mock_many.call_args.args[0]] == neighbor_ids[3:]
+
+    # 推进已消费本轮预计算：迟到的子任务不再调用 LLM
+    NeighborService.precompute_single(game.id, 1, neighbor_ids[4])
+    assert mock_decisions.call_count == 3
+
+
+@pytest.mark.django_db
+@patch("game.services.neighbor.AIGovernorService.make_decisions", return_value=[])
+def test_invalidate_precompute_notifies_progress_subscribers(_mock_decisions):
+    game = _build_game()
+    NeighborService.create_neighbors(game)
+    subscription = precompute_events.get_broker().subscribe(precompute_events.channel_for(game.id))
+    try:
+        NeighborService.precompute_decisions(game.id, 1)
+        NeighborService.invalidate_precompute(game, reschedule=False)
+        events = []
+        while (message := subscription.get(timeout=0)) is not None:
+            events.append(message["event"])
+    finally:
+        subscription.close()
+
+    assert events == ["started"] + ["progress"] * 5 + ["done", "reset"]
+    assert NeighborService.get_precompute_status(game.id, 1)["status"] == "idle"
+
+
+def _settle_query_count(username, neighbor_count):
+    user = get_user_model().objects.create_user(username=username, password="pw")
+    game = GameState.objects.create(
+        user=user,
+        current_season=1,
+        county_data=CountyService.create_initial_county(county_type="fiscal_core"),
+    )
+    neighbors = [
+        NeighborCounty.objects.create(
+            game=game,
+            county_name=f"邻县{idx}",
+            governor_name=f"知县{idx}",
+            governor_style="minben",
+            county_data=CountyService.create_initial_county(county_type="coastal"),
+        )
+        for idx in range(neighbor_count)
+    ]
+    decisions = {n.id: ["修缮水利"] for n in neighbors}
+
+    with CaptureQueriesContext(connection) as ctx:
+        NeighborService._settle_and_save(neighbors, 1, decisions, player_county_data=game.county_data)
+
+    assert NeighborEventLog.objects.filter(
+        neighbor_county__game=game, event_type="ai_decision",
+    ).count() == neighbor_count
+    assert TermMonthMetric.objects.filter(game=game, season=1).count() == neighbor_count
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_settle_and_save_query_count_is_independent_of_neighbor_count():
+    few = _settle_query_count("u_settle_few", 2)
+    many = _settle_query_count("u_settle_many", 6)
+
+    assert few == many
+    assert many <= 5  # SAVEPOINT/RELEASE + bulk_update + 日志与任期指标各一次 bulk_create
+
+
+@pytest.mark.django_db
+def test_new_term_view_invalidates_neighbor_precompute():
+    from rest_framework.test import APIClient
+
+    from game.services.new_term import NewTermService
+
+    game = _build_game()
+    client = APIClient()
+    client.force_authenticate(user=game.user)
+
+    with patch.object(NewTermService, "start_new_term", return_value={"term_index": 2, "pool_level": 2}), \
+            patch.object(NeighborService, "invalidate_precompute") as mock_invalidate:
+        resp = client.post(f"/api/games/{game.id}/new-term/", {}, format="json")
+
+    assert resp.status_code == 200
+    mock_invalidate.assert_called_once_with(game)
@@ -2,9 +2,12 @@ import uuid
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from game.models import AdminUnit, GameState
 from game.services.prefecture import PrefectureService
+from game.services.unit_projection import project_units
 
 
 def _create_prefecture_game():
@@ -100,6 +103,71 @@ def test_prefecture_overview_includes_todos_and_water_infra():
     assert "洪灾" in disaster_item["title"]
 
 
+@pytest.mark.django_db
+def test_unit_projection_keeps_only_requested_keys_and_latest_report():
+    game = _create_prefecture_game()
+    unit = AdminUnit.objects.get(game=game, unit_data__county_name="华亭县")
+    unit.unit_data["subordinate_reports"].append({"month": 14, "indicators": {}})
+    unit.unit_data["villages"] = [{"name": "甲村", "population": 900}]
+    unit.save(update_fields=["unit_data"])
+
+    projected = project_units(
+        AdminUnit.objects.filter(game=game, unit_type="COUNTY").order_by("id"),
+        keys=("county_name", "disaster_this_year"),
+        last_keys=("subordinate_reports",),
+    )
+
+    assert [item.id for item in projected] == list(
+        AdminUnit.objects.filter(game=game, unit_type="COUNTY").order_by("id").values_list("id", flat=True)
+    )
+    assert projected[0].unit_data == {
+        "county_name": "华亭县",
+        "disaster_this_year": {"type": "flood", "severity": 0.4, "relieved": False},
+        "subordinate_reports": [{"month": 14, "indicators": {}}],
+    }
+    # 空列表与 null 都不出现在投影中
+    assert projected[1].unit_data == {"county_name": "上海县"}
+
+    overview = PrefectureService.get_prefecture_overview(game)
+    latest = {item["county_name"]: item["latest_report"] for item in overview["counties"]}
+    assert latest == {"华亭县": {"month": 14, "indicators": {}}, "上海县": None}
+
+
+@pytest.mark.django_db
+def test_admin_unit_denormalized_columns_follow_unit_data():
+    game = _create_prefecture_game()
+    huating = AdminUnit.objects.get(game=game, name="华亭县")
+    assert huating.governor_archetype == "VIRTUOUS"
+    assert huating.has_disaster is True
+    assert str(game.player_unit).endswith("应天府 - Game#%d" % game.id)
+
+    huating.unit_data["disaster_this_year"] = None
+    huating.unit_data["annual_reviews"] = [
+        {"year": 2, "state": "submitted"},
+        {"year": 1, "state": "finalized"},
+    ]
+    huating.save(update_fields=["unit_data"])
+    huating.refresh_from_db()
+    assert huating.has_disaster is False
+    assert (huating.review_year, huating.review_state) == (2, "submitted")
+
+    units = list(AdminUnit.objects.filter(game=game, unit_type="COUNTY"))
+    for unit in units:
+        unit.unit_data["disaster_this_year"] = {"type": "drought", "severity": 0.3}
+    AdminUnit.objects.bulk_update(units, AdminUnit.prepare_bulk_update(units, ["unit_data"]))
+    assert set(AdminUnit.objects.filter(game=game, unit_type="COUNTY").values_list("has_disaster", flat=True)) == {True}
+
+    # 府情总览的灾情待办按 has_disaster 列在库内筛选
+    with CaptureQueriesContext(connection) as ctx:
+        overview = PrefectureService.get_prefecture_overview(game)
+    assert any('"has_disaster"' in q["sql"] and "WHERE" in q["sql"] for q in ctx.captured_queries)
+    disaster_item = next(item for item in overview["todo_items"] if item["type"] == "county_disaster")
+    assert sorted(disaster_item["county_names"]) == ["上海县", "华亭县"]
+    assert "旱灾" in disaster_item["title"]
+    assert {c["disaster_type"] for c in overview["counties"]} == {"drought"}
+    assert {c["governor_archetype"] for c in overview["counties"]} >= {"VIRTUOUS"}
+
+
 @pytest.mark.django_db
 def test_prefecture_invest_status_uses_new_display_labels():
     game = _create_prefecture_game()
@@ -0,0 +1,128 @@
+import copy
+import random
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from game.models import AdminUnit, GameState
+from game.services import prefecture_settlement
+from game.services.county import CountyService
+from game.services.prefecture import PrefectureService
+from game.services.prefecture_settlement import settle_subordinates
+
+PREFECTURE_CTX = {"road_level": 1, "river_level": 0, "granary": True}
+
+
+@pytest.fixture
+def shutdown_pool():
+    yield
+    prefecture_settlement.reset_pool()
+
+
+def _jobs(count=3):
+    random.seed(5)
+    return [(idx, CountyService.create_initial_county()) for idx in range(count)]
+
+
+def test_parallel_settlement_matches_serial(shutdown_pool):
+    jobs = _jobs()
+    serial_jobs = copy.deepcopy(jobs)
+
+    random.seed(42)
+    parallel = settle_subordinates(jobs, 5, PREFECTURE_CTX, workers=2)
+    random.seed(42)
+    serial = settle_subordinates(serial_jobs, 5, PREFECTURE_CTX, workers=1)
+
+    assert parallel == serial
+    assert all(remit > 0 for _, remit in serial.values())  # 五月征收徭役
+    # 并行路径不改动父进程中的原字典
+    assert jobs != serial_jobs
+
+
+def test_serial_settlement_preserves_global_random_state():
+    jobs = _jobs(2)
+
+    random.seed(1)
+    settle_subordinates(jobs, 3, PREFECTURE_CTX, workers=1)
+    after = random.random()
+
+    random.seed(1)
+    for _ in jobs:
+        random.getrandbits(64)
+    assert random.random() == after
+
+
+def test_pool_failure_falls_back_to_serial(shutdown_pool):
+    jobs = _jobs(2)
+
+    with patch.object(prefecture_settlement, "_get_pool", side_effect=OSError("no fork")):
+        results = settle_subordinates(jobs, 3, PREFECTURE_CTX, workers=2)
+
+    assert set(results) == {0, 1}
+    assert results[0][0] is jobs[0][1]  # 串行回退原地修改
+
+
+def _prefecture_game(username):
+    user = get_user_model().objects.create_user(username=username, password="pw")
+    game = GameState.objects.create(user=user, current_season=5, county_data={}, player_role="PREFECT")
+    prefecture = AdminUnit.objects.create(
+        game=game, unit_type="PREFECTURE", is_player_controlled=True,
+        unit_data={"treasury": 800, "treasury_collected": 0, "construction_queue": []},
+    )
+    game.player_unit = prefecture
+    game.save(update_fields=["player_unit"])
+    for idx in range(3):
+        county = CountyService.create_initial_county(county_type="fiscal_core")
+        county["county_name"] = f"测试县{idx + 1}"
+        AdminUnit.objects.create(game=game, unit_type="COUNTY", parent=prefecture, unit_data=county)
+    return game
+
+
+@pytest.mark.django_db
+@patch.object(PrefectureService, "_compute_ai_decisions", return_value={})
+@patch("game.services.prefecture.AIGovernorNegotiationService.plan_negotiations_many")
+def test_advance_month_persists_subordinates_with_one_update(_mock_plan, _mock_decisions):
+    game = _prefecture_game("pref_parallel_u")
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = PrefectureService.advance_month(game)
+
+    unit_updates = [
+        q["sql"] for q in ctx.captured_queries
+        if q["sql"].startswith('UPDATE "admin_units"')
+    ]
+    # 下辖县结算与汇报一次 bulk_update + 府级单位一次 save
+    assert len(unit_updates) == 2
+    remits = [
+        unit.unit_data["last_remit"]
+        for unit in AdminUnit.objects.filter(game=game, unit_type="COUNTY")
+    ]
+    assert all(remit > 0 for remit in remits)
+    assert all(unit.unit_data["subordinate_reports"] for unit in AdminUnit.objects.filter(game=game, unit_type="COUNTY"))
+    assert result["remit_total"] == pytest.approx(sum(remits), abs=0.2)
+
+
+@pytest.mark.django_db
+@patch.object(PrefectureService, "_compute_ai_decisions", return_value={})
+@patch("game.services.prefecture.AIGovernorNegotiationService.plan_negotiations_many")
+def test_advance_month_persist_phase_is_atomic(_mock_plan, _mock_decisions):
+    game = _prefecture_game("pref_atomic_u")
+    before = {
+        unit.id: unit.unit_data
+        for unit in AdminUnit.objects.filter(game=game, unit_type="COUNTY")
+    }
+
+    with patch(
+        "game.services.prefecture.AnnualReviewService.handle_prefecture_transition",
+        side_effect=RuntimeError("boom"),
+    ), pytest.raises(RuntimeError):
+        PrefectureService.advance_month(game)
+
+    # 下辖县的 bulk_update 随事务回滚
+    for unit in AdminUnit.objects.filter(game=game, unit_type="COUNTY"):
+        assert unit.unit_data == before[unit.id]
+    game.refresh_from_db()
+    assert game.current_season == 5
@@ -1,10 +1,17 @@
+import json
+import time
 from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
 from game.models import AdminUnit, GameState, NeighborPrecompute
+from game.services import precompute_events
 from game.services.prefecture import PrefectureService
+from game.tasks import precompute_prefecture_decisions
 
 
 def _build_prefecture_game():
@@ -99,7 +106,7 @@ def test_prefecture_precompute_persists_results(_mock_decisions):
 
 
 @pytest.mark.django_db
-@patch("game.services.prefecture.SettlementService.settle_county", return_value=None)
+@patch("game.services.settlement.SettlementService.settle_county", return_value=None)
 @patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["缓存施政"])
 def test_advance_month_uses_prefecture_precompute(_mock_decisions, _mock_settle):
     game = _build_prefecture_game()
@@ -121,3 +128,203 @@ def test_prefecture_precompute_failure_clears_cache(_mock_decisions):
     PrefectureService.precompute_ai_decisions(game.id, game.current_season)
 
     assert not NeighborPrecompute.objects.filter(game=game).exists()
+
+
+@pytest.mark.django_db
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["测试施政"])
+def test_prefecture_precompute_task_is_idempotent(mock_decisions):
+    game = _build_prefecture_game()
+
+    precompute_prefecture_decisions.delay(game.id, game.current_season)
+    precompute_prefecture_decisions.delay(game.id, game.current_season)
+
+    # 每县一个子任务；同一 (game, season) 第二次派发直接跳过
+    assert mock_decisions.call_count == 2
+    precompute = NeighborPrecompute.objects.get(game=game)
+    assert precompute.status == "done"
+    assert precompute.task_key == f"prefecture:{game.id}:1"
+    assert precompute.expected_count == 2
+    assert len(precompute.results) == 2
+
+
+@pytest.mark.django_db
+@patch("game.services.prefecture.AIGovernorService.make_decisions")
+def test_prefecture_precompute_records_partial_failure(mock_decisions):
+    game = _build_prefecture_game()
+    mock_decisions.side_effect = [["测试施政"], RuntimeError("boom")]
+
+    precompute_prefecture_decisions.delay(game.id, game.current_season)
+
+    status = PrefectureService.get_precompute_status(game.id, game.current_season)
+    assert status["status"] == "done"
+    assert status["completed_count"] == 1
+    assert status["failed_count"] == 1
+    assert status["expected_count"] == 2
+
+
+@pytest.mark.django_db
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["测试施政"])
+def test_prefecture_precompute_view_dispatches_task(_mock_decisions):
+    game = _build_prefecture_game()
+    client = APIClient()
+    client.force_authenticate(user=game.user)
+
+    resp = client.post(f"/api/prefecture/{game.id}/precompute/", {}, format="json")
+    assert resp.status_code == 202
+    assert resp.data == {"status": "started", "season": 1}
+
+    status = client.get(f"/api/prefecture/{game.id}/precompute/").data
+    assert status["status"] == "done"
+    assert status["completed_count"] == 2
+
+
+@pytest.mark.django_db
+def test_prefecture_precompute_view_reports_unreachable_broker():
+    game = _build_prefecture_game()
+    client = APIClient()
+    client.force_authenticate(user=game.user)
+
+    with patch.object(precompute_prefecture_decisions, "delay", side_effect=ConnectionError("broker down")):
+        resp = client.post(f"/api/prefecture/{game.id}/precompute/", {}, format="json")
+
+    assert resp.status_code == 503
+    assert "error" in resp.data
+    assert not NeighborPrecompute.objects.filter(game=game).exists()
+
+
+@pytest.mark.django_db
+@patch("game.services.settlement.SettlementService.settle_county", return_value=None)
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["缓存施政"])
+def test_advance_month_speculatively_precomputes_next_month(mock_decisions, _mock_settle,
+                                                            django_capture_on_commit_callbacks):
+    game = _build_prefecture_game()
+    PrefectureService.precompute_ai_decisions(game.id, game.current_season)
+
+    with patch.object(PrefectureService, "_compute_ai_decisions", side_effect=AssertionError("should not compute")):
+        with django_capture_on_commit_callbacks(execute=True):
+            PrefectureService.advance_month(game)
+
+    precompute = NeighborPrecompute.objects.get(game=game)
+    assert precompute.season == 2
+    assert precompute.status == "done"
+    assert mock_decisions.call_count == 4
+
+
+@pytest.mark.django_db
+@patch("game.services.settlement.SettlementService.settle_county", return_value=None)
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["缓存施政"])
+def test_advance_month_recomputes_counties_changed_after_precompute(_mock_decisions, _mock_settle):
+    game = _build_prefecture_game()
+    PrefectureService.precompute_ai_decisions(game.id, game.current_season)
+
+    first, second = AdminUnit.objects.filter(game=game, unit_type="COUNTY").order_by("id")
+    first.unit_data["pending_directives"] = [{"season": 1, "directive": "劝课农桑"}]
+    first.save(update_fields=["unit_data"])
+    # 评议记录不影响 AI 施政，改动后仍命中缓存且保留新值
+    second.unit_data["annual_reviews"] = [{"year": 1, "state": "submitted"}]
+    second.save(update_fields=["unit_data"])
+
+    with patch.object(PrefectureService, "_compute_ai_decisions", return_value={}) as mock_compute:
+        PrefectureService.advance_month(game)
+
+    assert [unit.id for unit in mock_compute.call_args.args[0]] == [first.id]
+    second.refresh_from_db()
+    assert second.unit_data["annual_reviews"] == [{"year": 1, "state": "submitted"}]
+
+
+@pytest.mark.django_db
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["测试施政"])
+def test_invalidate_precompute_reschedules(mock_decisions, django_capture_on_commit_callbacks):
+    game = _build_prefecture_game()
+    PrefectureService.precompute_ai_decisions(game.id, game.current_season)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PrefectureService.invalidate_precompute(game)
+
+    assert mock_decisions.call_count == 4
+    assert NeighborPrecompute.objects.get(game=game).status == "done"
+
+
+def _sse_events(response):
+    body = b"".join(response.streaming_content).decode("utf-8")
+    events = []
+    for frame in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.django_db
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["测试施政"])
+def test_precompute_publishes_per_county_progress(_mock_decisions):
+    game = _build_prefecture_game()
+    subscription = precompute_events.get_broker().subscribe(precompute_events.channel_for(game.id))
+    try:
+        PrefectureService.precompute_ai_decisions(game.id, game.current_season)
+        messages = []
+        while (message := subscription.get(timeout=0)) is not None:
+            messages.append(message)
+    finally:
+        subscription.close()
+
+    assert [m["event"] for m in messages] == ["started", "progress", "progress", "done"]
+    progress = [m["data"] for m in messages if m["event"] == "progress"]
+    assert [p["completed_count"] for p in progress] == [1, 2]
+    assert {p["county_name"] for p in progress} == {"测试县1", "测试县2"}
+    assert all(p["unit_id"] and p["ok"] and p["season"] == 1 for p in progress)
+
+
+@pytest.mark.django_db
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["测试施政"])
+def test_precompute_status_never_reads_results(_mock_decisions):
+    game = _build_prefecture_game()
+    PrefectureService.precompute_ai_decisions(game.id, game.current_season)
+
+    with CaptureQueriesContext(connection) as ctx:
+        status = PrefectureService.get_precompute_status(game.id, game.current_season)
+
+    assert status["status"] == "done"
+    assert sorted(item["county_name"] for item in status["completed"]) == ["测试县1", "测试县2"]
+    assert all('"results"' not in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+@patch("game.services.prefecture.AIGovernorService.make_decisions", return_value=["测试施政"])
+def test_precompute_status_stream(_mock_decisions, settings):
+    settings.PRECOMPUTE_STREAM_TIMEOUT_SECONDS = 30
+    game = _build_prefecture_game()
+    client = APIClient()
+    client.force_authenticate(user=game.user)
+
+    url = f"/api/prefecture/{game.id}/precompute/"
+    started = time.monotonic()
+    idle = _sse_events(client.get(url, {"stream": 1}))
+    # 尚未开始：推送 idle 快照后立即结束，不挂到超时
+    assert idle == [("status", {"status": "idle", "completed": [], "completed_count": 0})]
+    assert time.monotonic() - started < 5
+
+    PrefectureService.precompute_ai_decisions(game.id, game.current_season)
+    response = client.get(url, HTTP_ACCEPT="text/event-stream")
+    assert response["Content-Type"] == "text/event-stream"
+    events = _sse_events(response)
+    assert [kind for kind, _ in events] == ["status"]
+    assert events[0][1]["status"] == "done"
+    assert events[0][1]["completed_count"] == 2
+
+
+@pytest.mark.django_db
+def test_precompute_stream_ends_after_snapshot_when_broker_unavailable(settings):
+    settings.PRECOMPUTE_STREAM_TIMEOUT_SECONDS = 30
+    game = _build_prefecture_game()
+    NeighborPrecompute.objects.create(
+        game=game, season=game.current_season, task_key=f"prefecture:{game.id}:{game.current_season}",
+        status="computing", expected_count=2,
+    )
+    client = APIClient()
+    client.force_authenticate(user=game.user)
+
+    with patch.object(precompute_events.MemoryBroker, "subscribe", side_effect=ConnectionError("down")):
+        events = _sse_events(client.get(f"/api/prefecture/{game.id}/precompute/", {"stream": 1}))
+
+    assert [(kind, data["status"]) for kind, data in events] == [("status", "computing")]
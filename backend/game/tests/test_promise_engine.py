@@ -0,0 +1,94 @@
+"""Batch promise evaluation against the live settlement state."""
+
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from game.models import Agent, EventLog, GameState, PlayerProfile, Promise
+from game.services.county import CountyService
+from game.services.promise import PromiseService
+
+
+def _create_game(season=6):
+    user = get_user_model().objects.create_user(username=f"u_promise_{uuid4().hex[:8]}", password="pw")
+    county = CountyService.create_initial_county(county_type="fiscal_core")
+    game = GameState.objects.create(user=user, current_season=season, county_data=county)
+    PlayerProfile.objects.create(game=game, background="HUMBLE", integrity=50)
+    agent = Agent.objects.create(game=game, name="张员外", role="GENTRY", role_title="地主", tier="FULL")
+    return game, agent, county
+
+
+def _promise(game, agent, promise_type, deadline, **context):
+    return Promise.objects.create(
+        game=game, agent=agent, promise_type=promise_type, description=f"{promise_type}-{deadline}",
+        season_made=1, deadline_season=deadline, context=context,
+    )
+
+
+@pytest.mark.django_db
+def test_check_promises_evaluates_against_passed_county():
+    game, agent, county = _create_game()
+    village = county["villages"][0]
+    county["tax_rate"] = 0.08
+    village["has_school"] = True
+    county["active_investments"] = [{"action": "build_irrigation", "target_village": village["name"]}]
+
+    tax = _promise(game, agent, "LOWER_TAX", 12, target_value=0.1)
+    school = _promise(game, agent, "BUILD_SCHOOL", 12, target_village=village["name"])
+    irrigation = _promise(game, agent, "BUILD_IRRIGATION", 6, initial_irrigation_level=99)
+    roads = _promise(game, agent, "REPAIR_ROADS", 6)
+    other = _promise(game, agent, "OTHER", 12)
+
+    events = PromiseService.check_promises(game, county=county)
+
+    assert events == [
+        f"承诺已履行：{tax.description}（清名+3）",
+        f"承诺已履行：{school.description}（清名+3）",
+        f"承诺延期：{irrigation.description}（项目建设中，暂不计为违约）",
+        f"承诺已违约：{roads.description}（清名-5）",
+    ]
+    statuses = dict(Promise.objects.filter(game=game).values_list("id", "status"))
+    assert statuses == {
+        tax.id: "FULFILLED", school.id: "FULFILLED", irrigation.id: "PENDING",
+        roads.id: "BROKEN", other.id: "PENDING",
+    }
+    assert PlayerProfile.objects.get(game=game).integrity == 50 + 3 + 3 - 5
+    logs = EventLog.objects.filter(game=game, category="PROMISE").order_by("id")
+    assert [log.data["integrity_change"] for log in logs] == [3, 3, -5]
+    assert logs[2].description == f"承诺已违约：{roads.description}（清名-5）"
+
+
+@pytest.mark.django_db
+def test_check_promises_query_count_is_flat():
+    game, agent, county = _create_game()
+    county["tax_rate"] = 0.05
+
+    def run(count):
+        Promise.objects.filter(game=game).delete()
+        for idx in range(count):
+            _promise(game, agent, "LOWER_TAX", 12, target_value=0.1)
+            _promise(game, agent, "BUILD_GRANARY", 6)
+        with CaptureQueriesContext(connection) as ctx:
+            PromiseService.check_promises(game, county=county)
+        return len(ctx.captured_queries)
+
+    assert run(2) == run(20)
+    assert not Promise.objects.filter(game=game, status="PENDING").exists()
+
+
+@pytest.mark.django_db
+def test_integrity_is_clamped_per_promise():
+    game, agent, county = _create_game()
+    PlayerProfile.objects.filter(game=game).update(integrity=4)
+    game = GameState.objects.get(pk=game.pk)
+    for _ in range(2):
+        _promise(game, agent, "BUILD_GRANARY", 6)
+    _promise(game, agent, "LOWER_TAX", 12, target_value=1.0)
+
+    PromiseService.check_promises(game, county=county)
+
+    # 4 → 0 → 0 → 3，与逐条结算相同
+    assert PlayerProfile.objects.get(game=game).integrity == 3
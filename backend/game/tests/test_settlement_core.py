@@ -103,3 +103,29 @@ class TestCountyTypes:
             SettlementService.settle_county(county, month, report)
         total_pop = sum(v["population"] for v in county["villages"])
         assert total_pop > 0
+
+
+@pytest.mark.django_db(databases=[])
+class TestHiddenLandDiscovery:
+    """AI 知县修水利发现隐田：未启用 AI 交涉时走确定性回退比例。"""
+
+    def test_irrigation_discovers_hidden_land_via_fallback(self, county, settings, monkeypatch):
+        from game.services.bribery import BriberyService
+
+        settings.AI_NEGOTIATION_ENABLED = False
+        monkeypatch.setattr(SettlementService, "_hidden_land_probability", staticmethod(lambda v: 1.0))
+        monkeypatch.setattr(BriberyService, "generate_hidden_land_bribe", classmethod(lambda cls, v, h: None))
+        county["bailiff_level"] = 1
+        county["active_investments"] = [{"action": "build_irrigation", "completion_season": 99}]
+        village = county["villages"][0]
+        village["gentry_ledger"]["hidden_farmland"] = 200
+        registered = village["gentry_ledger"]["registered_farmland"]
+
+        report = {"season": 3, "events": []}
+        SettlementService.settle_county(county, 3, report)
+
+        assert village["hidden_land_discovered"] is True
+        discovered = village["gentry_ledger"]["registered_farmland"] - registered
+        assert 100 <= discovered <= 170
+        assert village["gentry_ledger"]["hidden_farmland"] == 200 - discovered
+        assert any("【隐匿土地】" in e for e in report["events"])
@@ -5,9 +5,10 @@ from uuid import uuid4
 import pytest
 from django.contrib.auth import get_user_model
 
-from game.models import EventLog, GameState, PlayerProfile
+from game.models import EventLog, GameState, PlayerProfile, SettlementReport, TermMonthMetric
 from game.services.county import CountyService
 from game.services.settlement import SettlementService
+from game.services.settlement_reports import decode_report, encode_report, load_report
 
 
 @pytest.mark.django_db
@@ -27,10 +28,70 @@ def test_advance_season_persists_full_settlement_report_payload():
         event_type="season_settlement",
     )
 
-    payload = log.data.get("settlement_report")
+    # 完整月报拆到旁表，EventLog.data 只留标记
+    assert "settlement_report" not in log.data
+    assert log.data.get("has_settlement_report") is True
+    stored = SettlementReport.objects.get(event_log=log)
+    assert stored.encoding == "zlib"
+    assert len(bytes(stored.payload)) < stored.size
+
+    payload = load_report(log)
     assert isinstance(payload, dict)
     assert payload.get("season") == 1
     assert payload.get("next_season") == 2
     assert payload.get("game_over") is False
     assert payload.get("events") == report.get("events")
     assert "monthly_snapshot" in log.data
+
+    metric = TermMonthMetric.objects.get(game=game, neighbor_county__isnull=True, season=1)
+    assert metric.snapshot == log.data["monthly_snapshot"]
+
+
+def test_encode_report_round_trip_with_and_without_compression():
+    report = {"season": 3, "events": ["春耕", {"村": "张家村", "变化": 1.5}]}
+
+    for compress, expected in ((True, "zlib"), (False, "json")):
+        encoding, payload, size = encode_report(report, compress=compress)
+        assert encoding == expected
+        assert size == len(encode_report(report, compress=False)[1])
+        assert decode_report(encoding, payload) == report
+
+
+def _login_client(client, username):
+    user = get_user_model().objects.create_user(username=username, password="pw")
+    client.force_login(user)
+    return user
+
+
+@pytest.mark.django_db
+def test_settlement_report_endpoint_fetches_on_demand(client):
+    user = _login_client(client, f"u_settle_report_{uuid4().hex[:8]}")
+    county_data = CountyService.create_initial_county(county_type="fiscal_core")
+    game = GameState.objects.create(user=user, current_season=1, county_data=county_data)
+    PlayerProfile.objects.create(game=game, background="HUMBLE")
+    report = SettlementService.advance_season(game)
+    log = EventLog.objects.get(game=game, event_type="season_settlement")
+
+    listing = client.get(f"/api/games/{game.id}/events/?fields=all").json()["results"]
+    settlement_row = next(row for row in listing if row["id"] == log.id)
+    assert "settlement_report" not in settlement_row["data"]
+
+    resp = client.get(f"/api/games/{game.id}/events/{log.id}/settlement-report/")
+    assert resp.status_code == 200
+    assert resp.json()["events"] == report["events"]
+
+
+@pytest.mark.django_db
+def test_settlement_report_endpoint_reads_legacy_inline_payload(client):
+    user = _login_client(client, f"u_settle_legacy_{uuid4().hex[:8]}")
+    game = GameState.objects.create(user=user, current_season=2, county_data={})
+    log = EventLog.objects.create(
+        game=game, season=1, event_type="season_settlement", category="SETTLEMENT",
+        data={"events": [], "settlement_report": {"season": 1, "events": []}},
+    )
+    other = EventLog.objects.create(game=game, season=1, event_type="tax", category="TAX")
+
+    resp = client.get(f"/api/games/{game.id}/events/{log.id}/settlement-report/")
+    assert resp.status_code == 200
+    assert resp.json() == {"season": 1, "events": []}
+    assert client.get(f"/api/games/{game.id}/events/{other.id}/settlement-report/").status_code == 404
@@ -2,6 +2,8 @@ from unittest.mock import patch
 
 from django.test import SimpleTestCase
 
+from game.services.emergency import EmergencyService
+from game.services.peers import PeerSummary
 from game.services.settlement import SettlementService
 
 
@@ -168,3 +170,40 @@ class PopulationMigrationCompetitionTests(SimpleTestCase):
         self.assertEqual(pair["direction"], "inflow")
         self.assertAlmostEqual(pair["rate"], 0.015, places=6)
         self.assertEqual(report["population_update"]["migration"]["inflow_total"], 15)
+
+
+class PeerSummaryTests(SimpleTestCase):
+    _build_county = staticmethod(PopulationMigrationCompetitionTests._build_county)
+
+    def test_summary_matches_dict_peer_migration(self):
+        own = self._build_county(morale=70, security=70, commercial=70, education=70, population=1000)
+        peer = self._build_county(morale=50, security=50, commercial=63, education=63, population=1200)
+        peer["_peer_name"] = "甲县"
+
+        from_dict = SettlementService._calculate_competitive_migration(own, [peer])
+        summary = PeerSummary.from_county(peer)
+        from_summary = SettlementService._calculate_competitive_migration(own, [summary])
+
+        self.assertEqual(from_dict, from_summary)
+        self.assertEqual(summary.registered_population, 1200)
+        self.assertEqual(summary.name, "甲县")
+
+    def test_summary_is_immutable_and_detached_from_county(self):
+        peer = self._build_county(morale=50)
+        summary = PeerSummary.from_county(peer, name="乙县")
+
+        peer["morale"] = 90.0
+        peer["villages"][0]["population"] = 0
+        self.assertEqual(summary.morale, 50.0)
+        self.assertEqual(summary.registered_population, 1000)
+        with self.assertRaises(AttributeError):
+            summary.morale = 1.0
+
+    def test_riot_wave_exposure_reads_summary(self):
+        peer = self._build_county()
+        peer["emergency"] = {"riot": {"active": True, "start_season": 4}}
+        summary = PeerSummary.from_county(peer)
+
+        self.assertTrue(EmergencyService._is_riot_exposed_to_peer_wave(5, [summary]))
+        self.assertFalse(EmergencyService._is_riot_exposed_to_peer_wave(6, [summary]))
+        self.assertFalse(EmergencyService._is_riot_exposed_to_peer_wave(5, [PeerSummary.from_county(self._build_county())]))
@@ -125,3 +125,213 @@ def test_game_detail_serializer_reads_canonical_player_state():
     data = GameDetailSerializer(game).data
 
     assert data["county_data"]["treasury"] == 90
+
+
+@pytest.mark.django_db
+def test_load_county_state_does_not_leak_mutations_into_stored_state():
+    user = _create_user("cow")
+    county_data = CountyService.create_initial_county()
+    game = GameState.objects.create(
+        user=user,
+        current_season=1,
+        county_data=copy.deepcopy(county_data),
+        player_role="COUNTY_MAGISTRATE",
+    )
+
+    state = load_county_state(game)
+    state["villages"][0]["morale"] = -1
+    state.setdefault("pending_land_surveys", []).append("某村")
+
+    assert game.county_data["villages"][0]["morale"] == county_data["villages"][0]["morale"]
+    assert "pending_land_surveys" not in game.county_data
+    assert copy.deepcopy(state)["villages"][0]["morale"] == -1
+
+
+@pytest.mark.django_db
+def test_save_player_state_reuses_untouched_and_unchanged_subtrees():
+    user = _create_user("cow_save")
+    county_data = CountyService.create_initial_county()
+    game = GameState.objects.create(
+        user=user,
+        current_season=1,
+        county_data=copy.deepcopy(county_data),
+        player_role="COUNTY_MAGISTRATE",
+    )
+    stored = game.county_data
+
+    state = load_county_state(game)
+    names = [v["name"] for v in state["villages"]]
+    state.setdefault("pending_land_surveys", []).append(names[0])
+    payload = save_player_state(game, state)
+
+    assert payload["markets"] is stored["markets"]
+    assert payload["villages"] is stored["villages"]
+    assert payload["pending_land_surveys"] == [names[0]]
+
+    state["pending_land_surveys"].append(names[1])
+    assert game.county_data["pending_land_surveys"] == [names[0]]
+
+    game.refresh_from_db()
+    assert game.county_data["pending_land_surveys"] == [names[0]]
+    assert game.county_data["villages"] == county_data["villages"]
+
+
+@pytest.mark.django_db
+def test_mutate_player_state_persists_mutator_changes():
+    from game.services.state import mutate_player_state
+
+    user = _create_user("mutate")
+    game = GameState.objects.create(
+        user=user,
+        current_season=1,
+        county_data={"treasury": 10, "villages": [{"name": "甲村", "morale": 50}]},
+        player_role="COUNTY_MAGISTRATE",
+    )
+
+    def _mutator(state):
+        state["treasury"] += 5
+        state["villages"][0]["morale"] = 60
+
+    mutate_player_state(game, _mutator)
+
+    game.refresh_from_db()
+    assert game.county_data == {"treasury": 15, "villages": [{"name": "甲村", "morale": 60}]}
+
+
+def test_player_state_build_patch_reports_changed_and_removed_keys():
+    from game.services.state import PlayerState
+
+    source = {
+        "treasury": 10,
+        "villages": [{"name": "甲村"}],
+        "markets": [{"name": "集"}],
+        "pending_land_surveys": ["甲村"],
+    }
+    state = PlayerState(source)
+    state["treasury"] = 12
+    _ = state["villages"][0]["name"]
+    state.pop("pending_land_surveys")
+
+    payload, changed, removed = state.build_patch()
+
+    assert changed == {"treasury": 12}
+    assert removed == ["pending_land_surveys"]
+    assert payload["villages"] is source["villages"]
+    assert payload["markets"] is source["markets"]
+
+
+def test_jsonb_patch_expression_sql_shape():
+    from game.services.state import _JSONBPatch
+
+    class _Compiler:
+        def compile(self, node):
+            return ("col", []) if node is expr.source_expressions[0] else ("%s", ["{}"])
+
+    expr = _JSONBPatch("unit_data", {"treasury": 1}, ["pending_land_surveys"])
+    sql, params = expr.as_sql(_Compiler(), connection=None)
+
+    assert sql == "((col || %s::jsonb) - %s::text[])"
+    assert params == ["{}", ["pending_land_surveys"]]
+
+
+@pytest.mark.django_db
+def test_county_game_state_is_stored_only_on_player_unit():
+    user = _create_user("single")
+    county_data = CountyService.create_initial_county()
+    game = GameState.objects.create(user=user, current_season=1, player_role="COUNTY_MAGISTRATE")
+    player_unit = AdminUnit.objects.create(
+        game=game,
+        unit_type="COUNTY",
+        is_player_controlled=True,
+        unit_data=copy.deepcopy(county_data),
+    )
+    game.player_unit = player_unit
+    game.save(update_fields=["player_unit"])
+
+    state = load_county_state(game)
+    state["treasury"] = 777
+    save_player_state(game, state)
+
+    game = GameState.objects.get(pk=game.pk)
+    assert game.legacy_county_data == {}
+    assert game.county_data["treasury"] == 777
+
+
+@pytest.mark.django_db
+def test_legacy_county_data_migration_moves_blob_into_player_unit():
+    from importlib import import_module
+
+    from django.apps import apps
+
+    migration = import_module("game.migrations.0017_gamestate_legacy_county_data")
+    user = _create_user("migrate")
+    with_unit = GameState.objects.create(user=user, current_season=3, player_role="COUNTY_MAGISTRATE")
+    unit = AdminUnit.objects.create(
+        game=with_unit, unit_type="COUNTY", is_player_controlled=True, unit_data={"treasury": 5},
+    )
+    with_unit.player_unit = unit
+    with_unit.legacy_county_data = {"treasury": 5}
+    with_unit.save(update_fields=["player_unit", "legacy_county_data"])
+    orphan = GameState.objects.create(
+        user=user, current_season=2, county_data={"county_name": "旧档县", "treasury": 9},
+    )
+
+    migration.move_county_data_to_units(apps, None)
+
+    with_unit = GameState.objects.get(pk=with_unit.pk)
+    orphan = GameState.objects.get(pk=orphan.pk)
+    assert with_unit.legacy_county_data == {}
+    assert with_unit.county_data == {"treasury": 5}
+    assert orphan.legacy_county_data == {}
+    assert orphan.player_unit.unit_type == "COUNTY"
+    assert orphan.county_data == {"county_name": "旧档县", "treasury": 9}
+
+
+@pytest.mark.django_db
+def test_game_detail_serializer_loads_player_state_once(monkeypatch):
+    user = _create_user("once")
+    county_data = CountyService.create_initial_county()
+    game = GameState.objects.create(user=user, current_season=9, player_role="COUNTY_MAGISTRATE")
+    player_unit = AdminUnit.objects.create(
+        game=game, unit_type="COUNTY", is_player_controlled=True, unit_data=county_data,
+    )
+    game.player_unit = player_unit
+    game.save(update_fields=["player_unit"])
+
+    calls = []
+    original = GameState.get_unit_data
+
+    def _counting(self):
+        calls.append(self.pk)
+        return original(self)
+
+    monkeypatch.setattr(GameState, "get_unit_data", _counting)
+    data = GameDetailSerializer(game).data
+
+    assert len(calls) == 1
+    assert data["county_data"]["treasury"] == county_data["treasury"]
+    assert data["available_investments"]
+    assert getattr(game, "_shared_player_state", None) is None
+
+
+@pytest.mark.django_db
+def test_game_detail_county_data_is_snapshot_of_shared_state(monkeypatch):
+    from game.services import SettlementService
+
+    user = _create_user("snapshot")
+    game = GameState.objects.create(user=user, current_season=9, player_role="COUNTY_MAGISTRATE")
+    player_unit = AdminUnit.objects.create(
+        game=game, unit_type="COUNTY", is_player_controlled=True,
+        unit_data=CountyService.create_initial_county(),
+    )
+    game.player_unit = player_unit
+    game.save(update_fields=["player_unit"])
+
+    def _mutating_advice(county, season=None):
+        county["_touched_by_advice"] = True
+        return {}
+
+    monkeypatch.setattr(SettlementService, "compute_relief_advice", staticmethod(_mutating_advice))
+    data = GameDetailSerializer(game).data
+
+    assert "_touched_by_advice" not in data["county_data"]
@@ -6,7 +6,15 @@ import uuid
 import pytest
 from django.contrib.auth import get_user_model
 
-from game.models import Agent, EventLog, GameState, NeighborCounty, NeighborEventLog, PlayerProfile
+from game.models import (
+    Agent,
+    EventLog,
+    GameState,
+    NeighborCounty,
+    NeighborEventLog,
+    PlayerProfile,
+    TermMonthMetric,
+)
 from game.services.constants import MAX_MONTH
 from game.services.county import CountyService
 from game.services.settlement import SettlementService
@@ -463,3 +471,54 @@ def test_neighbor_term_summary_can_be_generated_on_demand():
     assert "rank" in report["scores"]
     assert isinstance(report.get("yearly_reports"), list)
     assert isinstance(report.get("recent_events"), list)
+
+
+def _copy_logs_to_term_metrics(game):
+    """按结算写入口径把测试日志转存为任期月度指标行"""
+    for row in EventLog.objects.filter(game=game, category="SETTLEMENT"):
+        TermMonthMetric.objects.create(
+            game=game,
+            season=row.season,
+            snapshot=row.data["monthly_snapshot"],
+            autumn=row.data.get("autumn"),
+            winter_snapshot=row.data.get("winter_snapshot"),
+        )
+    for row in NeighborEventLog.objects.filter(neighbor_county__game=game, event_type="season_snapshot"):
+        TermMonthMetric.objects.create(
+            game=game,
+            neighbor_county_id=row.neighbor_county_id,
+            season=row.season,
+            snapshot=row.data["monthly_snapshot"],
+            autumn=row.data.get("autumn"),
+            winter_snapshot=row.data.get("winter_snapshot"),
+            disaster=row.data.get("disaster_before_settlement"),
+        )
+
+
+@pytest.mark.django_db
+def test_summary_v2_from_term_metrics_matches_log_scan():
+    game = _create_completed_game()
+    _seed_player_settlement_logs(game, y1_tax=100.0, y3_tax=115.0)
+    n_county = CountyService.create_initial_county(county_type="fiscal_core")
+    n_county["morale"] = 62
+    _attach_initial_snapshot(n_county)
+    neighbor = NeighborCounty.objects.create(
+        game=game,
+        county_name="西邻县",
+        governor_name="李知县",
+        governor_style="zhengji",
+        governor_bio="测试邻县",
+        county_data=n_county,
+    )
+    _seed_neighbor_snapshots(neighbor, y1_tax=100.0, y3_tax=125.0, disaster_entries=[(6, "flood", 0.5)])
+
+    from_logs = SettlementService.get_summary_v2(game)
+    neighbor_from_logs = SettlementService.get_neighbor_summary_v2(game, neighbor)
+
+    _copy_logs_to_term_metrics(game)
+    # 指标表就绪后不再读取结算 JSON：清空结算日志中的快照以确认读取来源
+    EventLog.objects.filter(game=game, category="SETTLEMENT").update(data={})
+    NeighborEventLog.objects.filter(neighbor_county=neighbor, event_type="season_snapshot").update(data={})
+
+    assert SettlementService.get_summary_v2(game) == from_logs
+    assert SettlementService.get_neighbor_summary_v2(game, neighbor) == neighbor_from_logs
@@ -21,6 +21,7 @@ urlpatterns = [
     path("games/<int:game_id>/agents/<int:agent_id>/chat/", views.AgentChatView.as_view(), name="agent-chat"),
     # Event logs
     path("games/<int:game_id>/events/", views.EventLogListView.as_view(), name="game-events"),
+    path("games/<int:game_id>/events/<int:log_id>/settlement-report/", views.EventLogSettlementReportView.as_view(), name="game-event-settlement-report"),
     # Promises
     path("games/<int:game_id>/promises/", views.PromiseListView.as_view(), name="game-promises"),
     # Negotiation endpoints
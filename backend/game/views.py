@@ -1,13 +1,19 @@
+import logging
+
 from django.contrib.auth import authenticate, login, logout
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from .models import (
     AdminUnit, Agent, EventLog, GameState, NeighborCounty, NeighborEventLog,
     NegotiationSession, PlayerProfile, Promise,
 )
+from .pagination import InvalidCursor, keyset_page
 from .serializers import (
     AnnualReviewSubmitSerializer,
     ChatMessageSerializer,
@@ -38,12 +44,39 @@ from .services import (
 )
 from .services.annual_review import AnnualReviewService
 from .services.bribery import BriberyService
+from .services.settlement_reports import load_report
 from .services.career_track import CareerTrackService
 from .services.constants import MAX_MONTH
 from .services.magistrate_service import MagistrateService
 from .services.new_term import NewTermService, TERMINAL_REASONS
+from .services.precompute import PrecomputeStore
+from .services.precompute_events import stream_progress
 from .services.promotion_event import PromotionEventService
 from .services.state import load_county_state, save_player_state
+from llm.streaming import format_sse
+
+logger = logging.getLogger('game')
+
+
+class EventStreamRenderer(BaseRenderer):
+    """让 Accept: text/event-stream 通过内容协商
+
+    前端 streamRequest（对话 / 议价）与 EventSource（预计算进度）都发送该请求头，
+    只有 JSON 渲染器时 DRF 会在进入视图前返回 406。
+
+    正常的流式响应是 StreamingHttpResponse，不经过渲染器；这里只负责把
+    404 等普通 Response 渲染为一条 error 事件。
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse('error', data).encode(self.charset)
+
+
+# JSON 仍排在首位：未声明 Accept 的请求照常返回 JSON
+STREAMING_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
 
 
 def _blocked_by_takeover(game):
@@ -135,10 +168,10 @@ class GameListCreateView(APIView):
         flavor = MagistrateService.generate_player_flavor(background)
         county_data['player_profile_flavor'] = flavor
 
+        # county_data 只存入玩家 AdminUnit，GameState 不再保留副本
         game = GameState.objects.create(
             user=request.user,
             current_season=1,
-            county_data=county_data,
         )
 
         # Create player profile with background-specific defaults
@@ -405,9 +438,11 @@ class AdvanceSeasonView(APIView):
         try:
             NeighborService.advance_all(game, season)
         except Exception:
-            import logging
-            logging.getLogger('game').warning(
-                "Neighbor advance failed (non-fatal)", exc_info=True)
+            logger.warning("Neighbor advance failed (non-fatal)", exc_info=True)
+
+        # 投机预计算下个月的邻县AI决策，下次推进直接命中
+        if "error" not in report and _check_game_playable(game) is None:
+            NeighborService.schedule_precompute(game)
 
         return Response(report)
 
@@ -417,9 +452,10 @@ class NeighborPrecomputeView(APIView):
     POST /api/games/{id}/neighbors/precompute/  — 后台预计算邻县AI决策
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = STREAMING_RENDERER_CLASSES
 
     def post(self, request, game_id):
-        import threading
+        from .tasks import precompute_neighbor_decisions
         try:
             game = GameState.objects.get(id=game_id, user=request.user)
         except GameState.DoesNotExist:
@@ -429,23 +465,26 @@ class NeighborPrecomputeView(APIView):
             return Response({"status": "game_over"})
 
         next_season = game.current_season
-        threading.Thread(
-            target=NeighborService.precompute_decisions,
-            args=(game.id, next_season),
-            daemon=True,
-        ).start()
+        if not PrecomputeStore.dispatch(precompute_neighbor_decisions, game.id, next_season):
+            return Response({"error": "预计算服务暂不可用"},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response({"status": "started", "season": next_season},
                         status=status.HTTP_202_ACCEPTED)
 
     def get(self, request, game_id):
-        """GET — 查询预计算进度"""
+        """GET — 查询预计算进度；Accept: text/event-stream 时推送逐县完成事件"""
         try:
             game = GameState.objects.get(id=game_id, user=request.user)
         except GameState.DoesNotExist:
             return Response({"error": "游戏不存在"}, status=status.HTTP_404_NOT_FOUND)
 
-        result = NeighborService.get_precompute_status(game.id, game.current_season)
+        game_id, season = game.id, game.current_season
+        if _wants_stream(request):
+            return _event_stream_response(stream_progress(
+                game_id, season, lambda: NeighborService.get_precompute_status(game_id, season),
+            ))
+        result = NeighborService.get_precompute_status(game_id, season)
         return Response(result)
 
 
@@ -714,12 +753,50 @@ class StaffInfoView(APIView):
         })
 
 
+def _wants_stream(request):
+    """?stream=1 或 Accept: text/event-stream 时以 SSE 流式返回"""
+    if request.query_params.get('stream') in ('1', 'true'):
+        return True
+    return 'text/event-stream' in request.META.get('HTTP_ACCEPT', '')
+
+
+def _sse_response(gen, build_payload):
+    """把"yield 台词增量、return 结果字典"的服务生成器包装为 SSE 响应
+
+    事件：delta {"text"} 逐段台词；done 为与非流式接口相同的结果；error {"error"}。
+    """
+    def events():
+        try:
+            while True:
+                yield format_sse('delta', {'text': next(gen)})
+        except StopIteration as stop:
+            result = stop.value
+        except Exception as e:
+            logger.exception("Streaming chat failed: %s", e)
+            yield format_sse('error', {'error': '对话中断，请重试'})
+            return
+        if 'error' in result:
+            yield format_sse('error', {'error': result['error']})
+        else:
+            yield format_sse('done', build_payload(result))
+
+    return _event_stream_response(events())
+
+
+def _event_stream_response(frames):
+    response = StreamingHttpResponse(frames, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 class AgentChatView(APIView):
     """
     POST /api/games/{id}/agents/{agent_id}/chat/  — send message to NPC
     GET  /api/games/{id}/agents/{agent_id}/chat/  — get dialogue history
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = STREAMING_RENDERER_CLASSES
 
     def _get_game_and_agent(self, request, game_id, agent_id):
         try:
@@ -757,6 +834,11 @@ class AgentChatView(APIView):
         serializer.is_valid(raise_exception=True)
 
         player_message = serializer.validated_data["message"]
+        if _wants_stream(request):
+            return _sse_response(
+                AgentService.iter_chat_with_agent(game, agent, player_message),
+                lambda result: self._chat_payload(game, agent, result),
+            )
         result = AgentService.chat_with_agent(game, agent, player_message)
 
         if 'error' in result:
@@ -765,12 +847,16 @@ class AgentChatView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        return Response({
+        return Response(self._chat_payload(game, agent, result))
+
+    @staticmethod
+    def _chat_payload(game, agent, result):
+        return {
             "agent_name": agent.name,
             "agent_role_title": agent.role_title,
             "dialogue": result["dialogue"],
             "season": game.current_season,
-        })
+        }
 
 
 class ActiveNegotiationView(APIView):
@@ -819,6 +905,7 @@ class NegotiationChatView(APIView):
     GET  /api/games/{id}/negotiations/{session_id}/chat/  — get negotiation history
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = STREAMING_RENDERER_CLASSES
 
     def _get_game_and_session(self, request, game_id, session_id):
         try:
@@ -869,6 +956,13 @@ class NegotiationChatView(APIView):
 
         player_message = serializer.validated_data["message"]
         speaker_role = serializer.validated_data.get("speaker_role", "PLAYER")
+        if _wants_stream(request):
+            return _sse_response(
+                NegotiationService.iter_negotiate_round(
+                    game, session, player_message, speaker_role=speaker_role,
+                ),
+                lambda result: result,
+            )
         result = NegotiationService.negotiate_round(
             game, session, player_message, speaker_role=speaker_role,
         )
@@ -882,10 +976,32 @@ class NegotiationChatView(APIView):
         return Response(result)
 
 
+def _keyset_event_response(request, qs, serializer_class):
+    """事件日志列表的键集分页 + 字段投影（玩家县志与邻县县志共用）"""
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 50)), 200))
+    except (ValueError, TypeError):
+        limit = 50
+
+    fields = serializer_class.resolve_fields(request.query_params.get('fields'))
+    if 'data' not in fields:
+        qs = qs.defer('data')
+
+    try:
+        rows, next_cursor = keyset_page(qs, request.query_params.get('cursor'), limit)
+    except InvalidCursor:
+        return Response({"error": "无效的分页游标"}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = serializer_class(rows, many=True, fields=','.join(fields))
+    return Response({"results": serializer.data, "next_cursor": next_cursor})
+
+
 class EventLogListView(APIView):
     """
     GET /api/games/{id}/events/  — list event logs
-    Query params: category, season, limit (default 50, max 200)
+    Query params: category, season, limit (default 50, max 200),
+                  cursor (上一页返回的 next_cursor), fields (逗号分隔；默认不含 data，all 为全部)
+    Response: {"results": [...], "next_cursor": str|null}
     """
     permission_classes = [IsAuthenticated]
 
@@ -895,7 +1011,7 @@ class EventLogListView(APIView):
         except GameState.DoesNotExist:
             return Response({"error": "游戏不存在"}, status=status.HTTP_404_NOT_FOUND)
 
-        qs = EventLog.objects.filter(game=game).order_by('-created_at')
+        qs = EventLog.objects.filter(game=game)
 
         category = request.query_params.get('category')
         if category:
@@ -908,11 +1024,30 @@ class EventLogListView(APIView):
             except (ValueError, TypeError):
                 pass
 
-        limit = min(int(request.query_params.get('limit', 50)), 200)
-        qs = qs[:limit]
+        return _keyset_event_response(request, qs, EventLogSerializer)
 
-        serializer = EventLogSerializer(qs, many=True)
-        return Response(serializer.data)
+
+class EventLogSettlementReportView(APIView):
+    """
+    GET /api/games/{id}/events/{log_id}/settlement-report/  — 县志"查看当月月报"按需读取完整月报
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, game_id, log_id):
+        try:
+            game = GameState.objects.get(id=game_id, user=request.user)
+        except GameState.DoesNotExist:
+            return Response({"error": "游戏不存在"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            log = EventLog.objects.get(id=log_id, game=game, category='SETTLEMENT')
+        except EventLog.DoesNotExist:
+            return Response({"error": "事件不存在"}, status=status.HTTP_404_NOT_FOUND)
+
+        report = load_report(log)
+        if report is None:
+            return Response({"error": "该月无月报记录"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(report)
 
 
 class PromiseListView(APIView):
@@ -1064,6 +1199,7 @@ class NeighborDetailView(APIView):
 class NeighborEventsView(APIView):
     """
     GET /api/games/{id}/neighbors/{nid}/events/  — neighbor event logs
+    Query params / response: 同 EventLogListView（limit、cursor、fields 键集分页）
     """
     permission_classes = [IsAuthenticated]
 
@@ -1078,15 +1214,8 @@ class NeighborEventsView(APIView):
         except NeighborCounty.DoesNotExist:
             return Response({"error": "邻县不存在"}, status=status.HTTP_404_NOT_FOUND)
 
-        qs = NeighborEventLog.objects.filter(
-            neighbor_county=neighbor,
-        ).order_by('-created_at')
-
-        limit = min(int(request.query_params.get('limit', 50)), 200)
-        qs = qs[:limit]
-
-        serializer = NeighborEventLogSerializer(qs, many=True)
-        return Response(serializer.data)
+        qs = NeighborEventLog.objects.filter(neighbor_county=neighbor)
+        return _keyset_event_response(request, qs, NeighborEventLogSerializer)
 
 
 class NeighborSummaryV2View(APIView):
@@ -1281,6 +1410,8 @@ class EmergencyBorrowNeighborView(APIView):
         )
         if result.get("success") is False:
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        # 借粮改动了邻县存粮，本月邻县预计算作废
+        NeighborService.invalidate_precompute(game)
         return Response(result)
 
 
@@ -1429,6 +1560,8 @@ class NewTermView(APIView):
 
         # 刷新 game 数据返回前端
         game.refresh_from_db()
+        # 调任会移除接管的邻县且月份重置，旧预计算作废，按新任期首月重新排队
+        NeighborService.invalidate_precompute(game)
         from .serializers import GameDetailSerializer
         return Response({
             "ok": True,
@@ -1,7 +1,5 @@
 """知府游戏 API 视图"""
 
-import threading
-
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -11,6 +9,10 @@ from .models import AdminUnit, GameState
 from .services import PrefectureService
 from .services.annual_review import AnnualReviewService
 from .services.constants import month_of_year
+from .services.precompute import PrecomputeStore
+from .services.precompute_events import stream_progress
+from .tasks import precompute_prefecture_decisions
+from .views import STREAMING_RENDERER_CLASSES, _event_stream_response, _wants_stream
 
 
 def _get_prefect_game(request, game_id):
@@ -123,6 +125,7 @@ class PrefecturePrecomputeView(APIView):
     后台预推演下辖州县 AI 施政，供下次推进复用
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = STREAMING_RENDERER_CLASSES
 
     def post(self, request, game_id):
         game, err = _get_prefect_game(request, game_id)
@@ -132,19 +135,23 @@ class PrefecturePrecomputeView(APIView):
             return Response({"status": "game_over"})
 
         next_season = game.current_season
-        threading.Thread(
-            target=PrefectureService.precompute_ai_decisions,
-            args=(game.id, next_season),
-            daemon=True,
-        ).start()
+        if not PrecomputeStore.dispatch(precompute_prefecture_decisions, game.id, next_season):
+            return Response({"error": "预计算服务暂不可用"},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
         return Response({"status": "started", "season": next_season},
                         status=status.HTTP_202_ACCEPTED)
 
     def get(self, request, game_id):
+        """GET — 查询预推演进度；Accept: text/event-stream 时推送逐县完成事件"""
         game, err = _get_prefect_game(request, game_id)
         if err:
             return err
-        return Response(PrefectureService.get_precompute_status(game.id, game.current_season))
+        game_id, season = game.id, game.current_season
+        if _wants_stream(request):
+            return _event_stream_response(stream_progress(
+                game_id, season, lambda: PrefectureService.get_precompute_status(game_id, season),
+            ))
+        return Response(PrefectureService.get_precompute_status(game_id, season))
 
 
 class PrefectureCountyListView(APIView):
@@ -375,6 +382,9 @@ class PrefectureJudicialDecideView(APIView):
         result = PrefectureService.decide_judicial_case(game, case_id, action)
         if 'error' in result:
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        if (result.get('applied_state') or {}).get('prefect_affinity') is not None:
+            # 改动了下辖县对知府的好感，本月预推演作废
+            PrefectureService.invalidate_precompute(game)
         return Response(result)
 
 
@@ -0,0 +1,144 @@
+"""LLM response cache, content-addressed by the request that produced it.
+
+Backends share a tiny interface (``get``/``set``). The backend is configured by
+``settings.LLM_RESPONSE_CACHE``:
+
+    LLM_RESPONSE_CACHE = {
+        'BACKEND': 'llm.cache.DjangoCacheResponseCache',
+        'OPTIONS': {'alias': 'default', 'ttl': 86400},
+    }
+
+Caching is opt-in per call (``LLMClient.chat(..., cache=True)``) because most
+game prompts are sampled at temperature > 0 and callers expect variety.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('llm')
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def make_cache_key(provider, model, messages, temperature, json_mode, max_tokens):
+    """sha256 over a canonical JSON encoding of the request."""
+    payload = json.dumps(
+        [provider, model, messages, temperature, bool(json_mode), max_tokens],
+        ensure_ascii=False, sort_keys=True, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LocMemResponseCache:
+    """In-process cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheResponseCache:
+    """Store responses in a Django cache alias (Redis in production).
+
+    Expiry uses the cache TTL. LRU eviction is left to the Redis server
+    (``maxmemory-policy allkeys-lru``).
+    """
+
+    KEY_PREFIX = 'llm:resp:'
+
+    def __init__(self, alias='default', ttl=DEFAULT_TTL):
+        self.alias = alias
+        self.ttl = ttl
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key):
+        return self._cache.get(self.KEY_PREFIX + key)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(self.KEY_PREFIX + key, value, self.ttl if ttl is None else ttl)
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the configured backend, or None when caching is disabled."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                conf = getattr(settings, 'LLM_RESPONSE_CACHE', None)
+                if not conf:
+                    return None
+                backend = import_string(conf['BACKEND'])
+                _response_cache = backend(**conf.get('OPTIONS', {}))
+    return _response_cache
+
+
+def reset_response_cache():
+    """Drop the configured backend instance (tests, or after settings change)."""
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = None
+
+
+def cache_lookup(key):
+    """Fetch a cached response; cache failures are logged and treated as misses."""
+    cache = get_response_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning("LLM response cache read failed: %s", e)
+        return None
+
+
+def cache_store(key, value):
+    cache = get_response_cache()
+    if cache is None or value is None:
+        return
+    try:
+        cache.set(key, value)
+    except Exception as e:
+        logger.warning("LLM response cache write failed: %s", e)
@@ -1,10 +1,17 @@
+import asyncio
+import collections
 import json
 import logging
+import threading
 import time
 
-from openai import OpenAI, APIConnectionError, APITimeoutError, RateLimitError
+from django.conf import settings
+from openai import AsyncOpenAI, OpenAI, APIConnectionError, APITimeoutError, RateLimitError
 
+from .cache import cache_lookup, cache_store, make_cache_key
 from .exceptions import LLMJSONParseError, LLMRequestError
+from .metrics import record_call
+from .streaming import JSONFieldStream
 from .providers import ProviderConfig, get_provider
 
 logger = logging.getLogger('llm')
@@ -13,10 +20,165 @@ DEFAULT_MAX_RETRIES = 3
 DEFAULT_TIMEOUT = 60.0
 BACKOFF_BASE = 1  # seconds
 BACKOFF_CAP = 30  # seconds
+DEFAULT_MAX_CONCURRENCY = 8  # in-flight requests per provider, per process
+
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError)
+
+
+def _backoff_delay(attempt):
+    return min(BACKOFF_BASE * (2 ** (attempt - 1)), BACKOFF_CAP)
+
+
+def _build_request(config, messages, json_mode, model, temperature, max_tokens):
+    kwargs = {
+        'model': model or config.default_model,
+        'messages': messages,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+    }
+    if json_mode:
+        kwargs['response_format'] = {'type': 'json_object'}
+    return kwargs
+
+
+def _response_cache_key(config, kwargs):
+    return make_cache_key(
+        config.name, kwargs['model'], kwargs['messages'], kwargs['temperature'],
+        'response_format' in kwargs, kwargs['max_tokens'],
+    )
+
+
+def _cached_json(key, validate=None):
+    """Parsed JSON for a cached response, or None on a miss/unparseable/rejected entry."""
+    content = cache_lookup(key)
+    if content is None:
+        return None
+    try:
+        result = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if validate is not None and not validate(result):
+        return None
+    return result
+
+
+def _cached_prompt_tokens(usage):
+    """Prompt tokens the provider served from its prefix cache.
+
+    OpenAI-compatible APIs report usage.prompt_tokens_details.cached_tokens;
+    DeepSeek reports usage.prompt_cache_hit_tokens.
+    """
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached = getattr(details, 'cached_tokens', None) if details is not None else None
+    if cached is None:
+        cached = getattr(usage, 'prompt_cache_hit_tokens', 0)
+    return cached or 0
+
+
+def _record(config, kwargs, tag, template, started=None, retries=0,
+            response=None, ok=True, cache_hit=False, usage=None, ttft=None):
+    usage = usage if usage is not None else getattr(response, 'usage', None)
+    record_call(
+        provider=config.name,
+        model=kwargs['model'],
+        tag=tag,
+        template=template,
+        prompt_tokens=getattr(usage, 'prompt_tokens', 0) or 0,
+        cached_prompt_tokens=_cached_prompt_tokens(usage),
+        completion_tokens=getattr(usage, 'completion_tokens', 0) or 0,
+        latency=time.monotonic() - started if started is not None else 0.0,
+        retries=retries,
+        ok=ok,
+        cache_hit=cache_hit,
+        ttft=ttft,
+    )
+
+
+def _parse_json(content):
+    try:
+        return json.loads(content)
+    except (json.JSONDecodeError, TypeError) as e:
+        raise LLMJSONParseError(content, e)
+
+
+class _PooledClient:
+    """One shared OpenAI client (and httpx keep-alive pool) plus usage counters."""
+
+    __slots__ = ('client', 'created_at', 'checkouts')
+
+    def __init__(self, client):
+        self.client = client
+        self.created_at = time.time()
+        self.checkouts = 0
+
+
+_client_pool = {}
+_client_pool_lock = threading.Lock()
+
+
+def get_shared_client(config, timeout=None):
+    """Return the process-wide OpenAI client for (provider config, timeout).
+
+    The underlying HTTP client is thread-safe, so LLMClient instances on
+    request and precompute threads all reuse the same keep-alive connections.
+    """
+    key = (config, timeout or DEFAULT_TIMEOUT)
+    with _client_pool_lock:
+        entry = _client_pool.get(key)
+        if entry is None:
+            client = OpenAI(
+                base_url=config.base_url,
+                api_key=config.api_key,
+                timeout=key[1],
+            )
+            entry = _client_pool[key] = _PooledClient(client)
+        entry.checkouts += 1
+        return entry.client
+
+
+def _connection_counts(client):
+    """Best-effort open/idle connection counts from the transport pool (None if unavailable)."""
+    try:
+        connections = client._client._transport._pool.connections
+    except AttributeError:
+        return None, None
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return len(connections), idle
+
+
+def get_pool_stats():
+    """Snapshot of the shared client registry, one dict per (provider, timeout)."""
+    with _client_pool_lock:
+        items = list(_client_pool.items())
+    stats = []
+    for (config, timeout), entry in items:
+        open_count, idle_count = _connection_counts(entry.client)
+        stats.append({
+            'provider': config.name,
+            'timeout': timeout,
+            'checkouts': entry.checkouts,
+            'age_seconds': round(time.time() - entry.created_at, 1),
+            'open_connections': open_count,
+            'idle_connections': idle_count,
+        })
+    return stats
+
+
+def reset_client_pool():
+    """Close and drop every shared client (tests, or after provider settings change)."""
+    with _client_pool_lock:
+        entries = list(_client_pool.values())
+        _client_pool.clear()
+    for entry in entries:
+        entry.client.close()
 
 
 class LLMClient:
-    """Unified LLM client that works with any OpenAI-compatible provider."""
+    """Unified LLM client that works with any OpenAI-compatible provider.
+
+    Instances are cheap: the OpenAI client and its connection pool are shared
+    per (provider, timeout) via ``get_shared_client``.
+    """
 
     def __init__(self, provider=None, config=None, timeout=None, max_retries=None):
         """Initialize client.
@@ -33,70 +195,404 @@ class LLMClient:
             self.config = get_provider(provider)
 
         self.max_retries = max_retries if max_retries is not None else DEFAULT_MAX_RETRIES
-        self._client = OpenAI(
-            base_url=self.config.base_url,
-            api_key=self.config.api_key,
-            timeout=timeout or DEFAULT_TIMEOUT,
-        )
+        self._client = get_shared_client(self.config, timeout)
 
     def chat(self, messages, json_mode=False, model=None,
-             temperature=0.7, max_tokens=1024):
+             temperature=0.7, max_tokens=1024, cache=False, tag=None, template=None):
         """Send a chat completion request.
 
-        Returns the response content as a string.
+        Returns the response content as a string. With ``cache=True`` an
+        identical earlier request is answered from the response cache
+        (``llm.cache``) without calling the provider. ``tag`` (calling
+        feature) and ``template`` (prompt name) label the call in
+        ``llm.metrics``.
         """
-        model = model or self.config.default_model
-        kwargs = {
-            'model': model,
-            'messages': messages,
-            'temperature': temperature,
-            'max_tokens': max_tokens,
-        }
-        if json_mode:
-            kwargs['response_format'] = {'type': 'json_object'}
+        kwargs = _build_request(self.config, messages, json_mode, model,
+                                temperature, max_tokens)
+        key = _response_cache_key(self.config, kwargs) if cache else None
+        if key is not None:
+            content = cache_lookup(key)
+            if content is not None:
+                logger.debug("LLM cache hit: provider=%s model=%s",
+                             self.config.name, kwargs['model'])
+                _record(self.config, kwargs, tag, template, cache_hit=True)
+                return content
+
+        content = self._complete(kwargs, tag, template)
+        if key is not None:
+            cache_store(key, content)
+        return content
 
+    def _complete(self, kwargs, tag=None, template=None):
+        model = kwargs['model']
         logger.debug(
             "LLM request: provider=%s model=%s messages=%d json_mode=%s",
-            self.config.name, model, len(messages), json_mode,
+            self.config.name, model, len(kwargs['messages']),
+            'response_format' in kwargs,
         )
 
+        started = time.monotonic()
         last_error = None
         for attempt in range(1, self.max_retries + 1):
             try:
                 response = self._client.chat.completions.create(**kwargs)
-                content = response.choices[0].message.content
-                logger.debug(
-                    "LLM response: provider=%s model=%s tokens=%s",
-                    self.config.name, model,
-                    getattr(response.usage, 'total_tokens', 'N/A'),
-                )
-                return content
-            except (APIConnectionError, APITimeoutError, RateLimitError) as e:
+            except RETRYABLE_ERRORS as e:
                 last_error = e
                 if attempt < self.max_retries:
-                    delay = min(BACKOFF_BASE * (2 ** (attempt - 1)), BACKOFF_CAP)
+                    delay = _backoff_delay(attempt)
                     logger.warning(
                         "LLM request attempt %d/%d failed (%s), "
                         "retrying in %.1fs...",
                         attempt, self.max_retries, type(e).__name__, delay,
                     )
                     time.sleep(delay)
+                continue
+            except Exception:
+                _record(self.config, kwargs, tag, template, started,
+                        retries=attempt - 1, ok=False)
+                raise
+
+            _record(self.config, kwargs, tag, template, started,
+                    retries=attempt - 1, response=response)
+            logger.debug(
+                "LLM response: provider=%s model=%s tokens=%s",
+                self.config.name, model,
+                getattr(response.usage, 'total_tokens', 'N/A'),
+            )
+            return response.choices[0].message.content
 
+        _record(self.config, kwargs, tag, template, started,
+                retries=self.max_retries - 1, ok=False)
         raise LLMRequestError(self.config.name, last_error)
 
-    def chat_json(self, messages, model=None, temperature=0.7, max_tokens=1024):
+    def chat_json(self, messages, model=None, temperature=0.7, max_tokens=1024,
+                  cache=False, tag=None, template=None, validate=None):
         """Send a chat request and parse the response as JSON.
 
-        Returns a dict.
+        Returns a dict. With ``cache=True`` only responses that parse are
+        cached; when ``validate`` (a predicate on the parsed dict) is given,
+        only responses it accepts are cached or served from the cache.
+        """
+        kwargs = _build_request(self.config, messages, True, model,
+                                temperature, max_tokens)
+        key = _response_cache_key(self.config, kwargs) if cache else None
+        if key is not None:
+            result = _cached_json(key, validate)
+            if result is not None:
+                _record(self.config, kwargs, tag, template, cache_hit=True)
+                return result
+
+        content = self._complete(kwargs, tag, template)
+        result = _parse_json(content)
+        if key is not None and (validate is None or validate(result)):
+            cache_store(key, content)
+        return result
+
+    def chat_stream(self, messages, json_mode=False, model=None,
+                    temperature=0.7, max_tokens=1024, tag=None, template=None):
+        """Stream a chat completion, yielding content deltas as they arrive.
+
+        Connection/timeout errors before the stream opens are retried like
+        ``chat``; once tokens have been yielded errors propagate. The call is
+        recorded in ``llm.metrics`` with its time to first token.
+        """
+        kwargs = _build_request(self.config, messages, json_mode, model,
+                                temperature, max_tokens)
+        kwargs['stream'] = True
+        if self.config.stream_usage:
+            # 否则 OpenAI 兼容接口不在流末尾返回 usage，llm.metrics 只能记 0 token
+            kwargs['stream_options'] = {'include_usage': True}
+        started = time.monotonic()
+        stream = self._open_stream(kwargs, tag, template, started)
+
+        ttft = None
+        usage = None
+        try:
+            for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = getattr(chunk.choices[0].delta, 'content', None)
+                if delta:
+                    if ttft is None:
+                        ttft = time.monotonic() - started
+                    yield delta
+        except Exception:
+            _record(self.config, kwargs, tag, template, started, ok=False, ttft=ttft)
+            raise
+        _record(self.config, kwargs, tag, template, started, usage=usage, ttft=ttft)
+
+    def _open_stream(self, kwargs, tag, template, started):
+        last_error = None
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return self._client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                if attempt < self.max_retries:
+                    delay = _backoff_delay(attempt)
+                    logger.warning(
+                        "LLM stream attempt %d/%d failed (%s), retrying in %.1fs...",
+                        attempt, self.max_retries, type(e).__name__, delay,
+                    )
+                    time.sleep(delay)
+            except Exception:
+                _record(self.config, kwargs, tag, template, started,
+                        retries=attempt - 1, ok=False)
+                raise
+        _record(self.config, kwargs, tag, template, started,
+                retries=self.max_retries - 1, ok=False)
+        raise LLMRequestError(self.config.name, last_error)
+
+    def chat_json_stream(self, messages, field='dialogue', model=None,
+                         temperature=0.7, max_tokens=1024, tag=None, template=None):
+        """Stream a JSON-mode reply.
+
+        Generator: yields the decoded characters of the top-level string
+        ``field`` as they arrive and returns the parsed dict (raises
+        ``LLMJSONParseError`` like ``chat_json`` if the full reply is not JSON).
         """
-        content = self.chat(
-            messages,
-            json_mode=True,
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        extractor = JSONFieldStream(field)
+        parts = []
+        for delta in self.chat_stream(messages, json_mode=True, model=model,
+                                      temperature=temperature, max_tokens=max_tokens,
+                                      tag=tag, template=template):
+            parts.append(delta)
+            text = extractor.feed(delta)
+            if text:
+                yield text
+        return _parse_json(''.join(parts))
+
+
+def _grant(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+
+class _ProviderLimiter:
+    """Process-wide cap on in-flight requests to one provider.
+
+    The limit has to hold across event loops (each sync caller runs its own
+    loop via ``run_sync``, possibly on several request threads at once), so
+    an ``asyncio.Semaphore`` -- bound to a single loop -- will not do.
+    Slots are counted under a threading lock; a waiter parks on a future of
+    its own loop and ``release`` hands the freed slot straight to the oldest
+    waiter with ``call_soon_threadsafe``, so nobody polls.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._available = limit
+        self._waiters = collections.deque()
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._available > 0 and not self._waiters:
+                self._available -= 1
+                return self
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over:
+                # 名额已移交给本 waiter，取消时须还回去
+                self.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+        return False
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, fut = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(_grant, fut)
+                    return
+                except RuntimeError:
+                    continue  # 等待方的事件循环已关闭
+            self._available += 1
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_provider_limiter(config):
+    """Return the shared limiter for a provider.
+
+    The limit comes from ``LLM_PROVIDERS[name]['max_concurrency']``, falling
+    back to ``settings.LLM_MAX_CONCURRENCY``.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(config.name)
+        if limiter is None:
+            provider_cfg = getattr(settings, 'LLM_PROVIDERS', {}).get(config.name, {})
+            limit = provider_cfg.get('max_concurrency') or getattr(
+                settings, 'LLM_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)
+            limiter = _limiters[config.name] = _ProviderLimiter(limit)
+        return limiter
+
+
+class AsyncLLMClient:
+    """asyncio counterpart of LLMClient.
+
+    Requests to the same provider share one process-wide concurrency limit,
+    so callers can fan out freely with ``gather_chat``/``gather_chat_json``.
+    httpx async pools are bound to the event loop that opened them, so each
+    instance owns its client; create one per batch and ``aclose`` it.
+    """
+
+    def __init__(self, provider=None, config=None, timeout=None, max_retries=None):
+        if config is not None:
+            self.config = config
+        else:
+            self.config = get_provider(provider)
+
+        self.max_retries = max_retries if max_retries is not None else DEFAULT_MAX_RETRIES
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        self._client = AsyncOpenAI(
+            base_url=self.config.base_url,
+            api_key=self.config.api_key,
+            timeout=self.timeout,
+        )
+        self._limiter = get_provider_limiter(self.config)
+
+    async def chat(self, messages, json_mode=False, model=None,
+                   temperature=0.7, max_tokens=1024, cache=False, tag=None, template=None):
+        """Send a chat completion request. Returns the response content."""
+        kwargs = _build_request(self.config, messages, json_mode, model,
+                                temperature, max_tokens)
+        key = _response_cache_key(self.config, kwargs) if cache else None
+        if key is not None:
+            content = cache_lookup(key)
+            if content is not None:
+                _record(self.config, kwargs, tag, template, cache_hit=True)
+                return content
+
+        content = await self._complete(kwargs, tag, template)
+        if key is not None:
+            cache_store(key, content)
+        return content
+
+    async def _complete(self, kwargs, tag=None, template=None):
+        model = kwargs['model']
+        logger.debug(
+            "LLM async request: provider=%s model=%s messages=%d json_mode=%s",
+            self.config.name, model, len(kwargs['messages']),
+            'response_format' in kwargs,
+        )
+
+        started = time.monotonic()
+        last_error = None
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                # 退避等待期间不占用并发名额
+                async with self._limiter:
+                    response = await self._client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                if attempt < self.max_retries:
+                    delay = _backoff_delay(attempt)
+                    logger.warning(
+                        "LLM async request attempt %d/%d failed (%s), "
+                        "retrying in %.1fs...",
+                        attempt, self.max_retries, type(e).__name__, delay,
+                    )
+                    await asyncio.sleep(delay)
+                continue
+            except Exception:
+                _record(self.config, kwargs, tag, template, started,
+                        retries=attempt - 1, ok=False)
+                raise
+
+            _record(self.config, kwargs, tag, template, started,
+                    retries=attempt - 1, response=response)
+            logger.debug(
+                "LLM async response: provider=%s model=%s tokens=%s",
+                self.config.name, model,
+                getattr(response.usage, 'total_tokens', 'N/A'),
+            )
+            return response.choices[0].message.content
+
+        _record(self.config, kwargs, tag, template, started,
+                retries=self.max_retries - 1, ok=False)
+        raise LLMRequestError(self.config.name, last_error)
+
+    async def chat_json(self, messages, model=None, temperature=0.7, max_tokens=1024,
+                        cache=False, tag=None, template=None, validate=None):
+        """Send a chat request and parse the response as JSON (see ``LLMClient.chat_json``)."""
+        kwargs = _build_request(self.config, messages, True, model,
+                                temperature, max_tokens)
+        key = _response_cache_key(self.config, kwargs) if cache else None
+        if key is not None:
+            result = _cached_json(key, validate)
+            if result is not None:
+                _record(self.config, kwargs, tag, template, cache_hit=True)
+                return result
+
+        content = await self._complete(kwargs, tag, template)
+        result = _parse_json(content)
+        if key is not None and (validate is None or validate(result)):
+            cache_store(key, content)
+        return result
+
+    async def gather_chat(self, batch, return_exceptions=True, **kwargs):
+        """Run ``chat`` for every message list in ``batch`` concurrently.
+
+        Results keep the input order. With ``return_exceptions`` (default) a
+        failed request yields its exception instead of cancelling the batch.
+        """
+        return await asyncio.gather(
+            *(self.chat(messages, **kwargs) for messages in batch),
+            return_exceptions=return_exceptions,
+        )
+
+    async def gather_chat_json(self, batch, return_exceptions=True, **kwargs):
+        """``gather_chat`` for JSON responses."""
+        return await asyncio.gather(
+            *(self.chat_json(messages, **kwargs) for messages in batch),
+            return_exceptions=return_exceptions,
         )
+
+    async def aclose(self):
+        await self._client.close()
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    Uses ``asyncio.run`` on the calling thread; when that thread already has
+    a running loop, the coroutine runs on a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def _target():
         try:
-            return json.loads(content)
-        except (json.JSONDecodeError, TypeError) as e:
-            raise LLMJSONParseError(content, e)
+            result['value'] = asyncio.run(coro)
+        except BaseException as e:  # noqa: BLE001 - re-raised below
+            result['error'] = e
+
+    worker = threading.Thread(target=_target)
+    worker.start()
+    worker.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
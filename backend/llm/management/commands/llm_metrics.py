@@ -0,0 +1,70 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from llm import metrics
+
+
+class Command(BaseCommand):
+    help = 'Show aggregated LLM token/latency usage per caller tag and template'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            dest='as_json',
+            help='Print raw rows as JSON',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Clear published metrics after printing',
+        )
+
+    def handle(self, *args, **options):
+        rows = metrics.collect()
+        prefix_rows = metrics.collect_prefix()
+
+        if options['as_json']:
+            payload = {'rows': rows, 'prompt_prefix': prefix_rows}
+            self.stdout.write(json.dumps(payload, ensure_ascii=False, indent=2))
+        else:
+            if rows:
+                self._print_table(rows)
+            else:
+                self.stdout.write("No LLM calls recorded.")
+            if prefix_rows:
+                self._print_prefix_table(prefix_rows)
+
+        if options['reset']:
+            metrics.reset(all_processes=True)
+            self.stdout.write(self.style.WARNING("LLM metrics reset."))
+
+    def _print_table(self, rows):
+        header = (
+            f"{'tag':<16}{'template':<28}{'provider':<10}{'calls':>7}{'err':>5}"
+            f"{'hit':>5}{'retry':>6}{'prompt':>10}{'cached%':>8}{'compl':>9}{'p50(s)':>8}{'p95(s)':>8}{'ttft50':>8}"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for r in rows:
+            p50 = f"{r['latency_p50']:.2f}" if r['latency_p50'] is not None else '-'
+            p95 = f"{r['latency_p95']:.2f}" if r['latency_p95'] is not None else '-'
+            cached = f"{r['prompt_cache_rate']:.0%}" if r['prompt_cache_rate'] is not None else '-'
+            ttft = f"{r['ttft_p50']:.2f}" if r['ttft_p50'] is not None else '-'
+            self.stdout.write(
+                f"{r['tag']:<16}{r['template'][:27]:<28}{r['provider']:<10}"
+                f"{r['calls']:>7}{r['errors']:>5}{r['cache_hits']:>5}{r['retries']:>6}"
+                f"{r['prompt_tokens']:>10}{cached:>8}{r['completion_tokens']:>9}{p50:>8}{p95:>8}{ttft:>8}"
+            )
+        total = sum(r['total_tokens'] for r in rows)
+        self.stdout.write(f"\nTotal tokens: {total}")
+
+    def _print_prefix_table(self, rows):
+        self.stdout.write("\nPrompt prefix memo:")
+        header = f"{'template':<28}{'hits':>8}{'misses':>8}{'hit%':>7}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for r in rows:
+            rate = f"{r['hit_rate']:.0%}" if r['hit_rate'] is not None else '-'
+            self.stdout.write(f"{r['template'][:27]:<28}{r['hits']:>8}{r['misses']:>8}{rate:>7}")
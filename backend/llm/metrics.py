@@ -0,0 +1,239 @@
+"""Per-call LLM usage accounting.
+
+Every request made through ``LLMClient``/``AsyncLLMClient`` is recorded with
+its provider, model, caller tag and prompt template. Calls are aggregated in
+process per (tag, template, provider, model). Each process also publishes its
+aggregate to the Django cache every ``LLM_METRICS_PUBLISH_INTERVAL`` seconds,
+so the ``llm_metrics`` command and the admin endpoint can see web and worker
+processes together.
+
+Prompt caching is tracked on both sides: ``cached_prompt_tokens`` is what the
+provider reports as served from its prefix cache, and the prefix counters
+record how often ``PromptRegistry.render`` reused a memoized static prefix.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger('llm')
+
+LATENCY_SAMPLES = 500  # per aggregate row, most recent calls
+DEFAULT_PUBLISH_INTERVAL = 10.0  # seconds
+PUBLISHED_TTL = 24 * 3600
+
+_CACHE_PREFIX = 'llm:metrics:'
+_PREFIX_CACHE_PREFIX = _CACHE_PREFIX + 'prefix:'
+_PROCESS_INDEX_KEY = _CACHE_PREFIX + 'processes'
+
+COUNTER_FIELDS = (
+    'calls', 'errors', 'cache_hits', 'retries',
+    'prompt_tokens', 'cached_prompt_tokens', 'completion_tokens', 'latency_total',
+)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class LLMMetrics:
+    """Thread-safe in-process aggregate of LLM calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._prefix = {}  # template -> [hits, misses]
+        self._last_publish = 0.0
+        self.process_key = f"{socket.gethostname()}:{os.getpid()}"
+
+    def record(self, *, provider, model, tag=None, template=None,
+               prompt_tokens=0, cached_prompt_tokens=0, completion_tokens=0,
+               latency=0.0, retries=0, ok=True, cache_hit=False, ttft=None):
+        key = (tag or 'untagged', template or '', provider, model)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = {f: 0 for f in COUNTER_FIELDS}
+                row['latencies'] = deque(maxlen=LATENCY_SAMPLES)
+                row['ttfts'] = deque(maxlen=LATENCY_SAMPLES)
+            row['calls'] += 1
+            row['errors'] += 0 if ok else 1
+            row['cache_hits'] += 1 if cache_hit else 0
+            row['retries'] += retries
+            row['prompt_tokens'] += prompt_tokens or 0
+            row['cached_prompt_tokens'] += cached_prompt_tokens or 0
+            row['completion_tokens'] += completion_tokens or 0
+            if not cache_hit:
+                row['latency_total'] += latency
+                row['latencies'].append(latency)
+            if ttft is not None:  # streamed call: time to first token
+                row['ttfts'].append(ttft)
+        self._maybe_publish()
+
+    def raw(self):
+        """Serializable copy of the aggregate (latency samples as lists)."""
+        with self._lock:
+            return [
+                {'key': list(key), **{f: row[f] for f in COUNTER_FIELDS},
+                 'latencies': list(row['latencies']), 'ttfts': list(row['ttfts'])}
+                for key, row in self._rows.items()
+            ]
+
+    def record_prefix(self, template, hit):
+        """Count one static-prefix lookup in ``PromptRegistry.render``."""
+        with self._lock:
+            counts = self._prefix.setdefault(template, [0, 0])
+            counts[0 if hit else 1] += 1
+        self._maybe_publish()
+
+    def raw_prefix(self):
+        with self._lock:
+            return {template: list(counts) for template, counts in self._prefix.items()}
+
+    def reset(self):
+        with self._lock:
+            self._rows.clear()
+            self._prefix.clear()
+
+    def _maybe_publish(self):
+        interval = getattr(settings, 'LLM_METRICS_PUBLISH_INTERVAL', DEFAULT_PUBLISH_INTERVAL)
+        now = time.monotonic()
+        if now - self._last_publish < interval:
+            return
+        self._last_publish = now
+        self.publish()
+
+    def publish(self):
+        """Write this process's aggregate to the shared Django cache."""
+        from django.core.cache import cache
+        try:
+            cache.set(_CACHE_PREFIX + self.process_key, self.raw(), PUBLISHED_TTL)
+            cache.set(_PREFIX_CACHE_PREFIX + self.process_key, self.raw_prefix(), PUBLISHED_TTL)
+            index = set(cache.get(_PROCESS_INDEX_KEY) or [])
+            if self.process_key not in index:
+                index.add(self.process_key)
+                cache.set(_PROCESS_INDEX_KEY, sorted(index), PUBLISHED_TTL)
+        except Exception as e:
+            logger.warning("LLM metrics publish failed: %s", e)
+
+
+metrics = LLMMetrics()
+
+
+def record_call(**kwargs):
+    metrics.record(**kwargs)
+
+
+def record_prefix_lookup(template, hit):
+    metrics.record_prefix(template, hit)
+
+
+def _published_raw(prefix=_CACHE_PREFIX, empty=list):
+    from django.core.cache import cache
+    try:
+        keys = cache.get(_PROCESS_INDEX_KEY) or []
+        return {k: cache.get(prefix + k) or empty() for k in keys}
+    except Exception as e:
+        logger.warning("LLM metrics read failed: %s", e)
+        return {}
+
+
+def collect(all_processes=True):
+    """Aggregate rows, sorted by total tokens (descending).
+
+    With ``all_processes`` the published aggregates of other processes are
+    merged with this process's live numbers.
+    """
+    sources = {}
+    if all_processes:
+        sources.update(_published_raw())
+    sources[metrics.process_key] = metrics.raw()
+
+    merged = {}
+    for raw_rows in sources.values():
+        for raw_row in raw_rows:
+            key = tuple(raw_row['key'])
+            row = merged.setdefault(
+                key, {**{f: 0 for f in COUNTER_FIELDS}, 'latencies': [], 'ttfts': []},
+            )
+            for f in COUNTER_FIELDS:
+                row[f] += raw_row.get(f, 0)
+            row['latencies'].extend(raw_row.get('latencies', []))
+            row['ttfts'].extend(raw_row.get('ttfts', []))
+
+    rows = []
+    for (tag, template, provider, model), row in merged.items():
+        latencies = sorted(row.pop('latencies'))
+        ttfts = sorted(row.pop('ttfts'))
+        requests = row['calls'] - row['cache_hits']
+        row['latency_total'] = round(row['latency_total'], 3)
+        rows.append({
+            'tag': tag,
+            'template': template,
+            'provider': provider,
+            'model': model,
+            **row,
+            'total_tokens': row['prompt_tokens'] + row['completion_tokens'],
+            'prompt_cache_rate': (
+                round(row['cached_prompt_tokens'] / row['prompt_tokens'], 3)
+                if row['prompt_tokens'] else None
+            ),
+            'latency_avg': round(row['latency_total'] / requests, 3) if requests else None,
+            'latency_p50': _percentile(latencies, 50),
+            'latency_p95': _percentile(latencies, 95),
+            'ttft_p50': _percentile(ttfts, 50),
+            'ttft_p95': _percentile(ttfts, 95),
+        })
+    rows.sort(key=lambda r: (-r['total_tokens'], -r['calls']))
+    return rows
+
+
+def collect_prefix(all_processes=True):
+    """Static-prefix memo hit rate per prompt template, busiest first."""
+    sources = {}
+    if all_processes:
+        sources.update(_published_raw(_PREFIX_CACHE_PREFIX, dict))
+    sources[metrics.process_key] = metrics.raw_prefix()
+
+    merged = {}
+    for raw_prefix in sources.values():
+        for template, (hits, misses) in raw_prefix.items():
+            counts = merged.setdefault(template, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    rows = [
+        {
+            'template': template,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+        for template, (hits, misses) in merged.items()
+    ]
+    rows.sort(key=lambda r: -(r['hits'] + r['misses']))
+    return rows
+
+
+def reset(all_processes=False):
+    """Clear this process's aggregate (and the published copies if requested)."""
+    metrics.reset()
+    if all_processes:
+        from django.core.cache import cache
+        try:
+            keys = cache.get(_PROCESS_INDEX_KEY) or []
+            cache.delete_many(
+                [_CACHE_PREFIX + k for k in keys]
+                + [_PREFIX_CACHE_PREFIX + k for k in keys]
+                + [_PROCESS_INDEX_KEY]
+            )
+        except Exception as e:
+            logger.warning("LLM metrics reset failed: %s", e)
@@ -1,5 +1,27 @@
+"""Prompt template registry.
+
+Templates are compiled once at registration: the system prompt is split into
+a static prefix (literal text plus ``static_fields`` that stay fixed for a
+given agent/county, e.g. persona and game rules) and a dynamic suffix. The
+rendered prefix is memoized per (template, static field values), so repeated
+renders only format the suffix, and the prefix stays byte-identical from call
+to call, which is what provider-side prompt caching keys on.
+"""
+
+import re
+import string
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 
+from django.conf import settings
+
+from .metrics import record_prefix_lookup
+
+DEFAULT_PREFIX_CACHE_SIZE = 512
+
+_FORMATTER = string.Formatter()
+
 
 @dataclass
 class PromptTemplate:
@@ -7,44 +29,154 @@ class PromptTemplate:
     system: str
     user: str
     description: str = ''
+    static_fields: tuple = ()
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """System prompt split into a memoizable prefix and a per-call suffix."""
+    prefix: str          # format string, only references prefix_fields
+    prefix_fields: tuple  # field names that key the prefix memo
+    suffix: str          # format string for the rest of the system prompt
+
+
+def _field_format(name, spec, conversion):
+    return (
+        '{' + name
+        + (f'!{conversion}' if conversion else '')
+        + (f':{spec}' if spec else '')
+        + '}'
+    )
+
+
+def _escape_literal(text):
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def compile_template(system, static_fields=()):
+    """Split ``system`` at the first field that is not in ``static_fields``."""
+    static = set(static_fields)
+    segments = list(_FORMATTER.parse(system))
+    prefix, prefix_fields = [], []
+    for idx, (literal, name, spec, conversion) in enumerate(segments):
+        prefix.append(_escape_literal(literal))
+        if name is None:
+            continue
+        root = re.split(r'[.\[]', name, maxsplit=1)[0]
+        if root not in static or '{' in (spec or ''):
+            suffix = [_field_format(name, spec, conversion)]
+            for literal, name, spec, conversion in segments[idx + 1:]:
+                suffix.append(_escape_literal(literal))
+                if name is not None:
+                    suffix.append(_field_format(name, spec, conversion))
+            return CompiledTemplate(''.join(prefix), tuple(dict.fromkeys(prefix_fields)), ''.join(suffix))
+        prefix.append(_field_format(name, spec, conversion))
+        prefix_fields.append(root)
+    return CompiledTemplate(''.join(prefix), tuple(dict.fromkeys(prefix_fields)), '')
 
 
 class PromptRegistry:
     """Class-level prompt template registry."""
 
     _templates: dict[str, PromptTemplate] = {}
+    _compiled: dict[str, CompiledTemplate] = {}
+    _prefix_cache: OrderedDict = OrderedDict()
+    _prefix_lock = threading.Lock()
 
     @classmethod
-    def register(cls, name, system='', user='', description=''):
-        """Register a prompt template."""
+    def register(cls, name, system='', user='', description='', static_fields=()):
+        """Register a prompt template.
+
+        static_fields: system-prompt fields that are constant for one agent /
+        county across calls; the system prompt up to the first other field is
+        memoized.
+        """
         cls._templates[name] = PromptTemplate(
             name=name,
             system=system,
             user=user,
             description=description,
+            static_fields=tuple(static_fields),
         )
+        cls._compiled[name] = compile_template(system, static_fields)
+        cls._drop_prefixes(name)
 
     @classmethod
     def render(cls, name, **kwargs):
         """Render a template, returning (system_str, user_str).
 
-        Uses str.format() for interpolation.
+        Uses str.format() for interpolation; the static system prefix is
+        served from the memo when its field values were seen before.
         """
         template = cls._templates[name]
-        return (
-            template.system.format(**kwargs),
-            template.user.format(**kwargs),
-        )
+        compiled = cls._compiled[name]
+        system = cls._render_prefix(name, compiled, kwargs)
+        if compiled.suffix:
+            system += compiled.suffix.format(**kwargs)
+        return system, template.user.format(**kwargs)
+
+    @classmethod
+    def _render_prefix(cls, name, compiled, kwargs):
+        key = (name,) + tuple(kwargs[field] for field in compiled.prefix_fields)
+        try:
+            with cls._prefix_lock:
+                prefix = cls._prefix_cache.get(key)
+                if prefix is not None:
+                    cls._prefix_cache.move_to_end(key)
+        except TypeError:  # unhashable field value: render without memo
+            return compiled.prefix.format(**kwargs)
+
+        record_prefix_lookup(name, prefix is not None)
+        if prefix is None:
+            prefix = compiled.prefix.format(**kwargs)
+            limit = getattr(settings, 'LLM_PROMPT_PREFIX_CACHE_SIZE', DEFAULT_PREFIX_CACHE_SIZE)
+            with cls._prefix_lock:
+                cls._prefix_cache[key] = prefix
+                while len(cls._prefix_cache) > limit:
+                    cls._prefix_cache.popitem(last=False)
+        return prefix
+
+    @classmethod
+    def _drop_prefixes(cls, name):
+        with cls._prefix_lock:
+            for key in [k for k in cls._prefix_cache if k[0] == name]:
+                del cls._prefix_cache[key]
+
+    @classmethod
+    def get_compiled(cls, name):
+        return cls._compiled[name]
 
     @classmethod
     def list_templates(cls):
         """Return a dict of all registered templates."""
         return dict(cls._templates)
 
+    @classmethod
+    def clear_prefix_cache(cls):
+        with cls._prefix_lock:
+            cls._prefix_cache.clear()
+
     @classmethod
     def clear(cls):
         """Remove all registered templates."""
         cls._templates = {}
+        cls._compiled = {}
+        cls.clear_prefix_cache()
+
+
+# 同一 FULL agent 跨多次对话不变的人设字段（人际关系、记忆、县情逐次变化）
+AGENT_PERSONA_FIELDS = (
+    'agent_name', 'role_title', 'bio', 'personality_desc', 'ideology_desc', 'goals_desc',
+)
+# 乡绅谈判：人设 + 所在村庄
+NEGOTIATION_PERSONA_FIELDS = (
+    'agent_name', 'role_title', 'village_name', 'bio', 'personality_desc', 'ideology_desc',
+)
+# AI 知县：治县要略 + 知县人设，同一知县 36 个月不变
+GOVERNOR_PERSONA_FIELDS = (
+    'game_knowledge', 'governor_name', 'county_name', 'governor_bio',
+    'governor_instruction', 'personality_desc', 'ideology_desc', 'goals_desc',
+)
 
 
 # ---------------------------------------------------------------------------
@@ -54,6 +186,7 @@ class PromptRegistry:
 PromptRegistry.register(
     name='agent_full_system',
     description='FULL agent 基础系统提示 (可复用)',
+    static_fields=AGENT_PERSONA_FIELDS,
     system=(
         '你是"{agent_name}"，{role_title}。这是一个中国古代县治模拟游戏。\n'
         '\n'
@@ -84,6 +217,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='agent_full_chat_json',
     description='FULL agent 对话 (JSON响应格式)',
+    static_fields=AGENT_PERSONA_FIELDS,
     system=(
         '你是"{agent_name}"，{role_title}。这是一个中国古代县治模拟游戏。\n'
         '\n'
@@ -130,6 +264,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='advisor_chat_json',
     description='师爷问策对话 (JSON响应格式，只提供定性分析)',
+    static_fields=AGENT_PERSONA_FIELDS,
     system=(
         '你是"{agent_name}"，{role_title}。这是一个中国古代县治模拟游戏。\n'
         '\n'
@@ -189,6 +324,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='negotiation_annexation',
     description='地主兼并谈判 (JSON响应格式)',
+    static_fields=NEGOTIATION_PERSONA_FIELDS,
     system=(
         '你是"{agent_name}"，{role_title}，{village_name}的大地主。这是一个中国古代县治模拟游戏。\n'
         '\n'
@@ -233,6 +369,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='negotiation_irrigation',
     description='兴建水利谈判 (JSON响应格式)',
+    static_fields=NEGOTIATION_PERSONA_FIELDS,
     system=(
         '你是"{agent_name}"，{role_title}，{village_name}的大地主。这是一个中国古代县治模拟游戏。\n'
         '\n'
@@ -276,6 +413,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='negotiation_hidden_land',
     description='隐匿土地交涉 (JSON响应格式)',
+    static_fields=NEGOTIATION_PERSONA_FIELDS,
     system=(
         '你是"{agent_name}"，{role_title}，{village_name}的大地主。这是一个中国古代县治模拟游戏。\n'
         '\n'
@@ -365,6 +503,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='ai_governor_decision',
     description='AI知县月度施政决策（含三层属性+记忆）',
+    static_fields=GOVERNOR_PERSONA_FIELDS,
     system=(
         # ── 静态块（游戏规则+约束+输出格式）── 放最前，最大化前缀缓存命中
         '{game_knowledge}\n'
@@ -445,6 +584,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='ai_governor_negotiation',
     description='AI知县处理乡绅事务的谈判立场决策（JSON响应）',
+    static_fields=GOVERNOR_PERSONA_FIELDS,
     system=(
         # ── 静态块（策略说明+输出格式）──
         '【可选策略】\n'
@@ -482,6 +622,7 @@ PromptRegistry.register(
 PromptRegistry.register(
     name='agent_light_chat',
     description='LIGHT agent 简化对话',
+    static_fields=AGENT_PERSONA_FIELDS,
     system=(
         '你是"{agent_name}"，{role_title}。这是一个中国古代县治模拟游戏。\n'
         '\n'
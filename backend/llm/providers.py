@@ -11,6 +11,18 @@ class ProviderConfig:
     base_url: str
     api_key: str
     default_model: str
+    # 流式请求是否带 stream_options.include_usage（不支持该参数的兼容服务可关闭）
+    stream_usage: bool = True
+
+
+def _build_config(name, cfg):
+    return ProviderConfig(
+        name=name,
+        base_url=cfg['base_url'],
+        api_key=cfg['api_key'],
+        default_model=cfg['default_model'],
+        stream_usage=cfg.get('stream_usage', True),
+    )
 
 
 def get_provider(name=None):
@@ -25,24 +37,10 @@ def get_provider(name=None):
     if name not in providers:
         raise LLMProviderNotFound(name)
 
-    cfg = providers[name]
-    return ProviderConfig(
-        name=name,
-        base_url=cfg['base_url'],
-        api_key=cfg['api_key'],
-        default_model=cfg['default_model'],
-    )
+    return _build_config(name, providers[name])
 
 
 def get_all_providers():
     """Return a dict of all configured providers."""
     providers = getattr(settings, 'LLM_PROVIDERS', {})
-    return {
-        name: ProviderConfig(
-            name=name,
-            base_url=cfg['base_url'],
-            api_key=cfg['api_key'],
-            default_model=cfg['default_model'],
-        )
-        for name, cfg in providers.items()
-    }
+    return {name: _build_config(name, cfg) for name, cfg in providers.items()}
@@ -0,0 +1,129 @@
+"""Helpers for streamed LLM responses.
+
+``JSONFieldStream`` pulls one top-level string field (e.g. ``dialogue``) out
+of a JSON object while it is still arriving, so JSON-mode replies can be shown
+token by token. Services that support streaming are written as generators that
+yield text deltas and ``return`` their final result; ``drain`` runs such a
+generator to completion for the non-streaming code path.
+"""
+
+import json
+
+
+class JSONFieldStream:
+    """Incrementally decode the value of one top-level string field.
+
+    ``feed(chunk)`` returns the newly available characters of the field value
+    (escape sequences decoded), or '' if none. Text outside the outermost
+    object (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self._buf = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_is_key = False
+        self._capturing = False
+        self._after_colon = False
+        self._key_chars = []
+        self._current_key = None
+        self.text = ''
+
+    def feed(self, chunk):
+        self._buf += chunk
+        out = []
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf):
+            c = buf[pos]
+            if self._in_string:
+                if c == '\\':
+                    if pos + 1 >= len(buf):
+                        break  # 等待转义字符到齐
+                    length = 6 if buf[pos + 1] == 'u' else 2
+                    if pos + length > len(buf):
+                        break
+                    try:
+                        c = json.loads('"' + buf[pos:pos + length] + '"')
+                    except ValueError:
+                        c = buf[pos + 1]
+                    pos += length
+                    self._string_char(c, out)
+                    continue
+                if c == '"':
+                    self._end_string()
+                else:
+                    self._string_char(c, out)
+            elif c == '"':
+                if self._depth == 1:
+                    self._in_string = True
+                    self._string_is_key = not self._after_colon
+                    self._capturing = self._after_colon and self._current_key == self.field
+                    self._key_chars = []
+                elif self._depth > 1:
+                    self._in_string = True
+                    self._string_is_key = False
+                    self._capturing = False
+            elif c in '{[':
+                self._depth += 1
+            elif c in '}]':
+                self._depth -= 1
+            elif self._depth == 1 and c == ':':
+                self._after_colon = True
+            elif self._depth == 1 and c == ',':
+                self._after_colon = False
+            pos += 1
+        self._pos = pos
+        delta = ''.join(out)
+        self.text += delta
+        return delta
+
+    def _string_char(self, c, out):
+        if self._string_is_key:
+            self._key_chars.append(c)
+        elif self._capturing:
+            out.append(c)
+
+    def _end_string(self):
+        self._in_string = False
+        if self._depth != 1:
+            return
+        if self._string_is_key:
+            self._current_key = ''.join(self._key_chars)
+        else:
+            self._capturing = False
+            self._after_colon = False
+
+
+def drain(gen):
+    """Run a delta-yielding generator to completion and return its result."""
+    try:
+        while True:
+            next(gen)
+    except StopIteration as stop:
+        return stop.value
+
+
+def chat_deltas(client, messages, stream, **kwargs):
+    """Generator: plain-text chat that yields deltas when ``stream``; returns the full text."""
+    if not stream:
+        return client.chat(messages, **kwargs)
+    parts = []
+    for delta in client.chat_stream(messages, **kwargs):
+        parts.append(delta)
+        yield delta
+    return ''.join(parts)
+
+
+def chat_json_deltas(client, messages, stream, field='dialogue', **kwargs):
+    """Generator: JSON chat that yields ``field`` deltas when ``stream``; returns the parsed dict."""
+    if not stream:
+        return client.chat_json(messages, **kwargs)
+    return (yield from client.chat_json_stream(messages, field=field, **kwargs))
+
+
+def format_sse(event, data):
+    """One Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("metrics/", views.LLMMetricsView.as_view(), name="llm-metrics"),
+]
@@ -0,0 +1,22 @@
+"""LLM 运维 API 视图"""
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import metrics
+from .client import get_pool_stats
+
+
+class LLMMetricsView(APIView):
+    """
+    GET /api/llm/metrics/  — 按调用方/模板汇总的 token 与延迟（仅管理员）
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "rows": metrics.collect(),
+            "prompt_prefix": metrics.collect_prefix(),
+            "pool": get_pool_stats(),
+        })